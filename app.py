@@ -3,6 +3,7 @@ HTV · Publicador Inteligente
 UI wizard paso-a-paso con file watcher automático.
 """
 
+import asyncio
 import os
 import queue
 import shutil
@@ -13,6 +14,9 @@ from datetime import datetime
 from tkinter import filedialog, ttk
 
 import ui.splash as splash_loader
+from core.async_runtime import bridge_to_tk, get_background_loop
+from core.progress import TranscriptionCancelled
+from core.speculative import SpeculativeVerifier
 from ui.dialogs import SettingsDialog, VerificationDialog
 from ui.settings import load_settings as _load_settings
 from ui.theme import (
@@ -45,6 +49,11 @@ from ui.widgets import (
     rounded_rect as _rounded_rect,
 )
 
+# Intervalo mínimo entre refrescos del progreso de transcripción
+_PROGRESS_REFRESH_MS = 250
+# Campos de la redacción que se muestran en cuanto llegan
+_DRAFT_FIELDS = ("titulo", "entradilla", "contenido", "etiquetas")
+
 
 class PublicadorApp(tk.Tk):
     STEP_AUDIO   = 0
@@ -62,6 +71,7 @@ class PublicadorApp(tk.Tk):
 
         self.archivo_audio = None
         self.original_filename = None
+        self._transcripcion = None
         self._html_contenido = ""
         self._toast_job = None
         self._toast_frame = None
@@ -72,6 +82,27 @@ class PublicadorApp(tk.Tk):
         self._auto_publish_pending = False
         self._progress_anim_id = None
         self._edit_scroll_bound = False
+        # Progreso de la transcripción: el hilo deja el último valor y la UI
+        # lo recoge como mucho cada _PROGRESS_REFRESH_MS.
+        self._cancel_event = threading.Event()
+        self._progress_lock = threading.Lock()
+        self._progress_latest = None
+        self._progress_flush_pending = False
+        # Redacción en streaming: campos ya mostrados en el paso de edición
+        self._draft_streaming = False
+        self._draft_received = set()
+        # Regenerar: borrador anterior, que se restaura si la nueva redacción falla o se cancela
+        self._regenerating = False
+        self._draft_backup = None
+        # Verificación o publicación en curso: Regenerar no puede solaparse con ellas
+        self._verifying = False
+        self._publishing = False
+        # Las etapas corren como corrutinas en un único bucle de fondo
+        self._bg_loop = get_background_loop()
+        self._job = None
+        # Verificación lanzada en cuanto hay borrador, reutilizable si no se edita
+        self._speculative = SpeculativeVerifier(
+            lambda news_data: self._bg_loop.submit(self.verification_svr.verify(news_data)))
 
         self._build_ui()
         self._show_step(self.STEP_AUDIO)
@@ -112,18 +143,18 @@ class PublicadorApp(tk.Tk):
         try:
             if not all(
                 [
-                    splash_loader.TranscriptionService,
-                    splash_loader.WriterService,
-                    splash_loader.PublisherService,
-                    splash_loader.VerificationService,
+                    splash_loader.AsyncTranscriptionService,
+                    splash_loader.AsyncWriterService,
+                    splash_loader.AsyncPublisherService,
+                    splash_loader.AsyncVerificationService,
                 ]
             ):
                 raise RuntimeError("Servicios no cargados. Reinicia la aplicación.")
 
-            self.transcription_svr = splash_loader.TranscriptionService()
-            self.writer_svr = splash_loader.WriterService()
-            self.publisher_svr = splash_loader.PublisherService()
-            self.verification_svr = splash_loader.VerificationService()
+            self.transcription_svr = splash_loader.AsyncTranscriptionService(_load_settings())
+            self.writer_svr = splash_loader.AsyncWriterService()
+            self.publisher_svr = splash_loader.AsyncPublisherService()
+            self.verification_svr = splash_loader.AsyncVerificationService()
         except Exception as e:
             self.after(200, lambda err=e: self._toast(f"Error de configuración: {err}", kind="error"))
 
@@ -308,6 +339,14 @@ class PublicadorApp(tk.Tk):
                                          highlightthickness=0, width=320)
         self.progress_canvas.pack(pady=(16, 0))
 
+        self.lbl_proc_partial = tk.Label(center, text="", bg=BG_DARK, fg=FG_MUTED,
+                                         font=(FONT_FAMILY, 9, "italic"),
+                                         wraplength=520, justify=tk.LEFT)
+        self.lbl_proc_partial.pack(pady=(14, 0))
+        self.btn_cancel = ttk.Button(center, text="✖  Cancelar", style="Red.TButton",
+                                     command=self._cancelar_procesamiento)
+        self.btn_cancel.pack(pady=(14, 0))
+
     def _build_step_edit(self, parent):
         """Paso 3 — Editar y verificar la noticia."""
         # Canvas scrollable para el formulario largo
@@ -389,6 +428,9 @@ class PublicadorApp(tk.Tk):
         self.btn_publish = ttk.Button(btn_row, text="🚀  Publicar",
                                       style="Green.TButton", command=self._publicar)
         self.btn_publish.pack(side=tk.LEFT, padx=(0, 8))
+        self.btn_regenerate = ttk.Button(btn_row, text="♻  Regenerar",
+                                         command=self._regenerar_borrador)
+        self.btn_regenerate.pack(side=tk.LEFT, padx=(0, 8))
         ttk.Button(btn_row, text="🗑  Limpiar", style="Red.TButton",
                    command=self._limpiar_todo).pack(side=tk.RIGHT)
 
@@ -460,9 +502,13 @@ class PublicadorApp(tk.Tk):
         """Vuelve al paso 1 y limpia estado interno."""
         self.archivo_audio = None
         self.original_filename = None
+        self._transcripcion = None
         self._html_contenido = ""
         self._processing = False
         self._auto_publish_pending = False
+        self._regenerating = False
+        self._draft_backup = None
+        self._speculative.discard()
         self.step_indicator.reset()
 
         # Limpiar campos
@@ -477,8 +523,11 @@ class PublicadorApp(tk.Tk):
         self.lbl_proc_title.config(text="Procesando…")
         self.lbl_proc_detail.config(text="Transcribiendo y redactando con IA")
         self.lbl_proc_file.config(text="")
+        self.lbl_proc_partial.config(text="")
+        self.btn_cancel.config(state=tk.NORMAL)
         self.btn_verify.config(state=tk.NORMAL)
         self.btn_publish.config(state=tk.NORMAL)
+        self.btn_regenerate.config(state=tk.NORMAL)
 
         self._show_step(self.STEP_AUDIO)
         self._update_audio_view()
@@ -586,7 +635,7 @@ class PublicadorApp(tk.Tk):
         self._show_step(self.STEP_PROCESS)
         self.lbl_proc_file.config(text=f"📁 {self.original_filename}")
         self._start_progress_anim()
-        threading.Thread(target=self._hilo_procesamiento, daemon=True).start()
+        self._iniciar_procesamiento()
 
     # ══════════════════════════════════════════════════════════════
     #  PASO 1 — Selección manual de audio
@@ -609,7 +658,7 @@ class PublicadorApp(tk.Tk):
         self._show_step(self.STEP_PROCESS)
         self.lbl_proc_file.config(text=f"📁 {self.original_filename}")
         self._start_progress_anim()
-        threading.Thread(target=self._hilo_procesamiento, daemon=True).start()
+        self._iniciar_procesamiento()
 
     # ══════════════════════════════════════════════════════════════
     #  PASO 2 — Procesamiento (transcripción + redacción)
@@ -635,27 +684,129 @@ class PublicadorApp(tk.Tk):
             self.after_cancel(self._progress_anim_id)
             self._progress_anim_id = None
 
-    def _hilo_procesamiento(self):
+    def _on_transcription_progress(self, percent, partial):
+        """Llamado desde el hilo de transcripción: agrupa las actualizaciones."""
+        with self._progress_lock:
+            self._progress_latest = (percent, partial)
+            if self._progress_flush_pending:
+                return
+            self._progress_flush_pending = True
+        self.after(_PROGRESS_REFRESH_MS, self._flush_transcription_progress)
+
+    def _flush_transcription_progress(self):
+        with self._progress_lock:
+            latest = self._progress_latest
+            self._progress_flush_pending = False
+        if latest is None or self._cancel_event.is_set():
+            return
+        percent, partial = latest
+        if percent is None:
+            self.lbl_proc_detail.config(text="Transcribiendo audio con IA…")
+        else:
+            self.lbl_proc_detail.config(text=f"Transcribiendo audio con IA… {percent:.0f}%")
+        self.lbl_proc_partial.config(text=f"…{partial}" if partial else "")
+
+    def _cancelar_procesamiento(self):
+        self._cancel_event.set()
+        if self._job is not None:
+            self._job.cancel()  # corta la redacción en curso sin esperar al siguiente trozo
+        self.btn_cancel.config(state=tk.DISABLED)
+        self.lbl_proc_detail.config(text="Cancelando…")
+
+    def _regenerar_borrador(self):
+        """Vuelve a redactar la misma transcripción sin pasar por la caché."""
+        if not self._transcripcion or self._regenerating or self._verifying or self._publishing:
+            return
+        self._processing = True
+        self._regenerating = True
+        self._draft_backup = self._current_news_data()
+        self._auto_publish_pending = False
+        self._speculative.discard()
+        self.btn_verify.config(state=tk.DISABLED)
+        self.btn_publish.config(state=tk.DISABLED)
+        self.btn_regenerate.config(state=tk.DISABLED)
+        self.lbl_proc_icon.config(text="⏳", fg=ACCENT_BLUE)
+        self.lbl_proc_title.config(text="Procesando…")
+        self.lbl_proc_partial.config(text="")
+        self.btn_cancel.config(state=tk.NORMAL)
+        self._show_step(self.STEP_PROCESS)
+        self._start_progress_anim()
+        self._iniciar_procesamiento(regenerar=True)
+
+    def _iniciar_procesamiento(self, regenerar=False):
+        self._cancel_event = threading.Event()
+        self._draft_streaming = False
+        self._draft_received = set()
+        self._job = self._bg_loop.submit(self._procesar(regenerar))
+
+    async def _procesar(self, regenerar=False):
         try:
-            self.after(0, lambda: self.lbl_proc_detail.config(
-                text="Transcribiendo audio con IA…"))
-            texto, motor = self.transcription_svr.transcribe(self.archivo_audio)
+            if regenerar:
+                texto = self._transcripcion
+            else:
+                self.after(0, lambda: self.lbl_proc_detail.config(
+                    text="Transcribiendo audio con IA…"))
+                texto, motor = await self.transcription_svr.transcribe(
+                    self.archivo_audio,
+                    on_progress=self._on_transcription_progress,
+                    cancel_event=self._cancel_event,
+                )
+                if self._cancel_event.is_set():
+                    raise TranscriptionCancelled("Transcripción cancelada.")
+                self._transcripcion = texto
 
             self.after(0, lambda: self.lbl_proc_detail.config(
                 text="Redactando noticia con IA…"))
             nombre_base, _ = os.path.splitext(self.original_filename or "")
             video_filename = f"{nombre_base}.mp4"
-            noticia = self.writer_svr.write_news(texto, video_filename)
+            noticia = await self.writer_svr.write_news_stream(
+                texto, video_filename,
+                on_field=lambda key, value: self.after(0, self._on_draft_field, key, value),
+                force=regenerar,
+            )
+            if self._cancel_event.is_set():
+                raise TranscriptionCancelled("Procesamiento cancelado.")
 
             self.after(0, self._procesamiento_ok, noticia)
+        except asyncio.CancelledError:
+            self.after(0, self._procesamiento_error, "Procesamiento cancelado.")
+            raise
         except Exception as e:
             self.after(0, self._procesamiento_error, str(e))
 
+    def _on_draft_field(self, key, value):
+        """Muestra cada campo de la redacción en cuanto llega, sin esperar al resto."""
+        if key not in _DRAFT_FIELDS or self._cancel_event.is_set():
+            return
+        if not self._draft_streaming:
+            self._draft_streaming = True
+            self._stop_progress_anim()
+            self._fill_draft({})
+            self.btn_verify.config(state=tk.DISABLED)
+            self.btn_publish.config(state=tk.DISABLED)
+            self.btn_regenerate.config(state=tk.DISABLED)
+            self._set_status("Redactando… los campos aparecen según se completan.", ACCENT_CYAN)
+            self._show_step(self.STEP_EDIT)
+        self._fill_field(key, value)
+        self._draft_received.add(key)
+
     def _procesamiento_ok(self, noticia):
         self._stop_progress_anim()
-        self._fill_draft(noticia)
+        if self._draft_streaming:
+            # No pisar lo que el editor ya haya empezado a retocar
+            for key in _DRAFT_FIELDS:
+                if key not in self._draft_received:
+                    self._fill_field(key, noticia.get(key, [] if key == "etiquetas" else ""))
+            self._draft_streaming = False
+        else:
+            self._fill_draft(noticia)
+        self._regenerating = False
+        self._draft_backup = None
+        self._enable_edit_actions()
         self._set_status("Borrador generado.", ACCENT_GREEN)
         self._toast("Borrador generado correctamente.", kind="success")
+        if _load_settings().get("verificacion_anticipada", True):
+            self._speculative.start(self._current_news_data())
 
         self._show_step(self.STEP_EDIT)
 
@@ -665,6 +816,12 @@ class PublicadorApp(tk.Tk):
 
     def _procesamiento_error(self, msg):
         self._stop_progress_anim()
+        if self._regenerating:
+            self._regeneracion_fallida(msg)
+            return
+        if self._draft_streaming:
+            self._draft_streaming = False
+            self._show_step(self.STEP_PROCESS)
         self._processing = False
         self._auto_publish_pending = False
         self.lbl_proc_icon.config(text="❌", fg=ACCENT_RED)
@@ -674,14 +831,47 @@ class PublicadorApp(tk.Tk):
         self._toast(msg, kind="error", duration=8000)
         self.after(5000, self._reset_flow)
 
+    def _regeneracion_fallida(self, msg):
+        """Regenerar falló o se canceló: se vuelve a editar el borrador que había."""
+        self._regenerating = False
+        self._draft_streaming = False
+        self._fill_draft(self._draft_backup or {})
+        self._draft_backup = None
+        self._enable_edit_actions()
+        self._show_step(self.STEP_EDIT)
+        self._set_status("Regeneración no completada: se conserva el borrador anterior.", ACCENT_RED)
+        self._toast(msg, kind="error", duration=8000)
+
+    def _enable_edit_actions(self):
+        self.btn_verify.config(state=tk.NORMAL)
+        self.btn_publish.config(state=tk.NORMAL)
+        self.btn_regenerate.config(state=tk.NORMAL)
+
     def _fill_draft(self, noticia):
-        self.txt_titulo.text.delete("1.0", tk.END)
-        self.txt_titulo.text.insert(tk.END, noticia.get("titulo", ""))
-        self.txt_entradilla.text.delete("1.0", tk.END)
-        self.txt_entradilla.text.insert(tk.END, noticia.get("entradilla", ""))
-        self._set_html_contenido(noticia.get("contenido", ""))
-        self.txt_etiquetas.text.delete("1.0", tk.END)
-        self.txt_etiquetas.text.insert(tk.END, ", ".join(noticia.get("etiquetas", [])))
+        for key in _DRAFT_FIELDS:
+            self._fill_field(key, noticia.get(key, [] if key == "etiquetas" else ""))
+
+    def _fill_field(self, key, value):
+        if key == "contenido":
+            self._set_html_contenido(value)
+            return
+        widget = {"titulo": self.txt_titulo, "entradilla": self.txt_entradilla,
+                  "etiquetas": self.txt_etiquetas}[key]
+        if key == "etiquetas":
+            value = ", ".join(value) if isinstance(value, list) else str(value)
+        widget.text.delete("1.0", tk.END)
+        widget.text.insert(tk.END, value)
+
+    def _current_news_data(self):
+        """Campos del borrador tal como están ahora en el editor."""
+        return {
+            "titulo": self.txt_titulo.text.get("1.0", tk.END).strip(),
+            "entradilla": self.txt_entradilla.text.get("1.0", tk.END).strip(),
+            "contenido": self._html_contenido,
+            "etiquetas": [t.strip() for t in
+                          self.txt_etiquetas.text.get("1.0", tk.END).split(",")
+                          if t.strip()],
+        }
 
     def _set_html_contenido(self, html):
         self._html_contenido = html
@@ -691,30 +881,19 @@ class PublicadorApp(tk.Tk):
     #  PASO 3 — Verificación
     # ══════════════════════════════════════════════════════════════
     def _iniciar_verificacion(self, auto_publish=False):
+        self._verifying = True
         self.btn_verify.config(state=tk.DISABLED)
         self.btn_publish.config(state=tk.DISABLED)
+        self.btn_regenerate.config(state=tk.DISABLED)
         self._set_status("Verificando con IA y búsqueda web…", ACCENT_PURPLE)
-        threading.Thread(target=self._hilo_verificacion,
-                         args=(auto_publish,), daemon=True).start()
-
-    def _hilo_verificacion(self, auto_publish=False):
-        try:
-            news_data = {
-                "titulo": self.txt_titulo.text.get("1.0", tk.END).strip(),
-                "entradilla": self.txt_entradilla.text.get("1.0", tk.END).strip(),
-                "contenido": self._html_contenido,
-                "etiquetas": [t.strip() for t in
-                              self.txt_etiquetas.text.get("1.0", tk.END).split(",")
-                              if t.strip()],
-            }
-            resultado = self.verification_svr.verify(news_data)
-            self.after(0, self._mostrar_verificacion, resultado, auto_publish)
-        except Exception as e:
-            self.after(0, self._verificacion_error, str(e))
+        # Si el borrador no ha cambiado, la verificación anticipada ya está en marcha o lista
+        bridge_to_tk(self, self._speculative.result_for(self._current_news_data()),
+                     lambda resultado: self._mostrar_verificacion(resultado, auto_publish),
+                     lambda exc: self._verificacion_error(str(exc)))
 
     def _mostrar_verificacion(self, resultado, auto_publish=False):
-        self.btn_verify.config(state=tk.NORMAL)
-        self.btn_publish.config(state=tk.NORMAL)
+        self._verifying = False
+        self._enable_edit_actions()
         correcciones = resultado.get("correcciones", [])
         texto_corregido = resultado.get("texto_corregido", {})
         fuentes = resultado.get("fuentes_consultadas", [])
@@ -727,14 +906,7 @@ class PublicadorApp(tk.Tk):
                 self.after(600, self._publicar)
             return
 
-        texto_original = {
-            "titulo": self.txt_titulo.text.get("1.0", tk.END).strip(),
-            "entradilla": self.txt_entradilla.text.get("1.0", tk.END).strip(),
-            "contenido": self._html_contenido,
-            "etiquetas": [t.strip() for t in
-                          self.txt_etiquetas.text.get("1.0", tk.END).split(",")
-                          if t.strip()],
-        }
+        texto_original = self._current_news_data()
         VerificationDialog(
             self, correcciones, texto_corregido, fuentes, aviso,
             lambda tc: self._aplicar_correcciones(tc, auto_publish),
@@ -743,8 +915,8 @@ class PublicadorApp(tk.Tk):
         self._set_status("Revisando correcciones…", ACCENT_PURPLE)
 
     def _verificacion_error(self, msg):
-        self.btn_verify.config(state=tk.NORMAL)
-        self.btn_publish.config(state=tk.NORMAL)
+        self._verifying = False
+        self._enable_edit_actions()
         self._set_status("Error en verificación.", ACCENT_RED)
         self._toast(msg, kind="error", duration=8000)
         self._auto_publish_pending = False
@@ -771,6 +943,8 @@ class PublicadorApp(tk.Tk):
     #  PASO 4 — Publicar
     # ══════════════════════════════════════════════════════════════
     def _publicar(self):
+        self._publishing = True
+        self.btn_regenerate.config(state=tk.DISABLED)
         self._show_step(self.STEP_PUBLISH)
         self.lbl_pub_icon.config(text="🚀", fg=ACCENT_BLUE)
         self.lbl_pub_title.config(text="Publicando…")
@@ -780,26 +954,14 @@ class PublicadorApp(tk.Tk):
         self._set_status("Publicando…", ACCENT_BLUE)
 
         news_data = {
-            "titulo": self.txt_titulo.text.get("1.0", tk.END).strip(),
-            "entradilla": self.txt_entradilla.text.get("1.0", tk.END).strip(),
-            "contenido": self._html_contenido,
-            "etiquetas": [t.strip() for t in
-                          self.txt_etiquetas.text.get("1.0", tk.END).split(",")
-                          if t.strip()],
+            **self._current_news_data(),
             "archivo_original": (
                 f"{os.path.splitext(self.original_filename)[0]}.mp4"
                 if self.original_filename else ""
             ),
         }
-        threading.Thread(target=self._hilo_publicacion, args=(news_data,),
-                         daemon=True).start()
-
-    def _hilo_publicacion(self, news_data):
-        try:
-            url = self.publisher_svr.publish(news_data)
-            self.after(0, self._publicacion_ok, url)
-        except Exception as e:
-            self.after(0, self._publicacion_error, str(e))
+        bridge_to_tk(self, self._bg_loop.submit(self.publisher_svr.publish(news_data)),
+                     self._publicacion_ok, lambda exc: self._publicacion_error(str(exc)))
 
     def _publicacion_ok(self, url):
         self._mover_a_papelera()
@@ -811,6 +973,7 @@ class PublicadorApp(tk.Tk):
         self._set_status("¡Noticia publicada!", ACCENT_GREEN)
         self._toast("Publicación exitosa.", kind="success", duration=6000)
         self.step_indicator.complete_step(self.STEP_PUBLISH)
+        self._publishing = False
         self._processing = False
         self._auto_publish_pending = False
 
@@ -819,6 +982,7 @@ class PublicadorApp(tk.Tk):
             self.after(4000, self._reset_flow)
 
     def _publicacion_error(self, msg):
+        self._publishing = False
         self._processing = False
         self._auto_publish_pending = False
         self.lbl_pub_icon.config(text="❌", fg=ACCENT_RED)
@@ -862,6 +1026,8 @@ class PublicadorApp(tk.Tk):
         SettingsDialog(self, on_save=self._on_settings_saved)
 
     def _on_settings_saved(self):
+        if hasattr(self, "transcription_svr"):
+            self.transcription_svr.settings = _load_settings()
         if self._watcher_active:
             self._stop_watcher()
             self._start_watcher()
@@ -875,6 +1041,11 @@ class PublicadorApp(tk.Tk):
                 self._observer.join(timeout=2)
             except Exception:
                 pass
+        if self._job is not None:
+            self._job.cancel()
+        self._bg_loop.stop(splash_loader.aclose_http_clients)
+        if splash_loader.close_http_clients:
+            splash_loader.close_http_clients()
         super().destroy()
 
 
@@ -0,0 +1,344 @@
+"""
+Banco de pruebas de la transcripción.
+
+Genera con ffmpeg audios sintéticos parecidos a la voz (WAV y MP4), mide
+`_prepare_for_whisper`, la ruta de Vosk y `transcribe` de principio a fin
+contra un servidor local que imita la API de transcripción, y guarda el
+RTF, el pico de memoria (RSS) y el pico de disco temporal en un JSON que se
+puede comparar entre commits.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.transcription_bench --minutos 5 30 120
+    python -m benchmarks.transcription_bench --comparar results/a.json results/b.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from core.audio import ffmpeg_bin, run_ffmpeg  # noqa: E402
+from core.model_registry import find_vosk_model_path, rss_mb  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+_CASES = ("preparar", "vosk", "transcribir")
+_KINDS = ("wav", "mp4")
+# Intervalo de muestreo de memoria y disco
+_SAMPLE_S = 0.05
+
+# Tono con entonación variable, envolvente silábica de ~4 Hz y una pausa de
+# 1,2 s cada 7 s: el recorte de silencios y los cortes de tramo actúan como
+# con una locución real.
+_SPEECH_EXPR = (
+    "0.25*sin(2*PI*(140+40*sin(2*PI*0.3*t))*t)"
+    "*(0.55+0.45*sin(2*PI*4.1*t))"
+    "*gt(mod(t\\,7)\\,1.2)"
+)
+
+
+# ── Fixtures ─────────────────────────────────────────────────────
+def make_fixture(minutes: float, kind: str) -> str:
+    """Crea (una vez) el audio sintético de `minutes` minutos en `kind` (wav/mp4)."""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    path = os.path.join(FIXTURES_DIR, f"voz_{minutes:g}min.{kind}")
+    if os.path.exists(path):
+        return path
+    seconds = minutes * 60
+    args = [
+        "-f", "lavfi", "-i", f"aevalsrc={_SPEECH_EXPR}:s=16000:d={seconds}",
+        "-f", "lavfi", "-i", f"anoisesrc=a=0.01:c=pink:r=16000:d={seconds}",
+    ]
+    if kind == "mp4":
+        args += ["-f", "lavfi", "-i", f"color=c=black:s=320x240:r=5:d={seconds}"]
+    args += ["-filter_complex", "[0:a][1:a]amix=inputs=2:normalize=0[a]", "-map", "[a]"]
+    if kind == "mp4":
+        args += ["-map", "2:v", "-c:v", "mpeg4", "-q:v", "10", "-c:a", "aac", "-b:a", "96k",
+                 "-ar", "44100"]
+    else:
+        args += ["-c:a", "pcm_s16le", "-ar", "44100", "-ac", "2"]
+    part = path + ".part"
+    print(f"Generando {os.path.basename(path)}…", flush=True)
+    run_ffmpeg(args + ["-f", kind, "-y", part])
+    os.replace(part, path)
+    return path
+
+
+# ── Servidor que imita la API de transcripción ───────────────────
+class _FakeTranscriptionHandler(BaseHTTPRequestHandler):
+    latency_s = 0.2
+    bandwidth_mbps = 20.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        remaining = length
+        while remaining > 0:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 20)))
+        # Latencia fija más el tiempo de subida al ancho de banda simulado
+        time.sleep(self.latency_s + length * 8 / (self.bandwidth_mbps * 1_000_000))
+
+        words = [{"word": f"palabra{i}", "start": i * 0.4, "end": i * 0.4 + 0.3} for i in range(50)]
+        body = json.dumps({
+            "text": " ".join(w["word"] for w in words),
+            "language": "spanish",
+            "duration": 20.0,
+            "words": words,
+            "segments": [{"id": 0, "seek": 0, "start": 0.0, "end": 20.0, "text": "",
+                          "tokens": [], "temperature": 0.0, "avg_logprob": -0.2,
+                          "compression_ratio": 1.0, "no_speech_prob": 0.0}],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_api(latency_s: float, bandwidth_mbps: float) -> ThreadingHTTPServer:
+    handler = type("Handler", (_FakeTranscriptionHandler,),
+                   {"latency_s": latency_s, "bandwidth_mbps": bandwidth_mbps})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ── Medición ─────────────────────────────────────────────────────
+def _dir_mb(path: str) -> float:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total / (1024 * 1024)
+
+
+def _rss_with_children() -> float | None:
+    """RSS del proceso y sus hijos (pool de Vosk) si psutil está disponible."""
+    try:
+        import psutil
+    except ImportError:
+        return rss_mb()
+    proc = psutil.Process()
+    total = proc.memory_info().rss
+    for child in proc.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+class _PeakSampler:
+    """Muestrea en segundo plano la memoria y el disco usado en `watch_dir`."""
+
+    def __init__(self, watch_dir: str):
+        self.watch_dir = watch_dir
+        self.peak_rss = 0.0
+        self.peak_disk = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = _rss_with_children()
+        if rss:
+            self.peak_rss = max(self.peak_rss, rss)
+        self.peak_disk = max(self.peak_disk, _dir_mb(self.watch_dir))
+
+    def _run(self):
+        while not self._stop.wait(_SAMPLE_S):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def _duration(path: str) -> float:
+    from core.audio import scan_energy
+    from core.media_probe import try_probe
+
+    info = try_probe(path)
+    return info.duration if info else len(scan_energy(path, 30)) * 0.03
+
+
+def run_case(case: str, fixture: str, duration_s: float, settings: dict, api_url: str,
+             work_dir: str) -> dict:
+    """Ejecuta un caso con temporales y cachés aislados en `work_dir`."""
+    import core.disk_cache as disk_cache
+    import core.audio_cache as audio_cache
+    from openai import OpenAI
+    from core.transcription import TranscriptionService
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    tempfile.tempdir = work_dir
+    disk_cache.CACHE_DIR = os.path.join(work_dir, "cache")
+    audio_cache._shared = None  # la caché de audio canónico arranca vacía en cada caso
+
+    svc = TranscriptionService(dict(settings))
+    svc.api_key = "benchmark"
+    svc.client = OpenAI(api_key="benchmark", base_url=api_url, max_retries=0)
+
+    result = {"caso": case, "fixture": os.path.basename(fixture), "duracion_s": round(duration_s, 1)}
+    with _PeakSampler(work_dir) as sampler:
+        t0 = time.perf_counter()
+        try:
+            if case == "preparar":
+                from core.media_probe import try_probe
+
+                with svc._prepare_for_whisper(fixture, try_probe(fixture)) as prepared:
+                    result["subida_mb"] = round(prepared.size_mb, 2)
+            elif case == "vosk":
+                result["palabras"] = len(svc.transcribe_with_vosk(fixture))
+            else:
+                transcript, motor = svc.transcribe_detailed(fixture)
+                result["motor"] = motor
+                result["palabras"] = len(transcript)
+            result["ok"] = True
+        except Exception as exc:
+            result["ok"] = False
+            result["error"] = f"{type(exc).__name__}: {exc}"[:300]
+        elapsed = time.perf_counter() - t0
+    result.update(
+        segundos=round(elapsed, 3),
+        rtf=round(elapsed / duration_s, 5) if duration_s else None,
+        pico_rss_mb=round(sampler.peak_rss, 1),
+        pico_disco_mb=round(sampler.peak_disk, 1),
+    )
+    tempfile.tempdir = None
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ffmpeg_version() -> str | None:
+    try:
+        out = subprocess.run([ffmpeg_bin(), "-version"], capture_output=True, text=True).stdout
+    except OSError:
+        return None
+    return out.splitlines()[0] if out else None
+
+
+def compare(old_path: str, new_path: str):
+    """Imprime la variación de tiempo, memoria y disco entre dos resultados."""
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["caso"], r["fixture"]): r for r in json.load(f)["resultados"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["resultados"]
+    print(f"{'caso':<12} {'fixture':<18} {'segundos':>18} {'RSS MB':>16} {'disco MB':>16}")
+    for r in new:
+        o = old.get((r["caso"], r["fixture"]))
+        if not o or not (o.get("ok") and r.get("ok")):
+            continue
+
+        def _fmt(key):
+            a, b = o[key], r[key]
+            delta = (b - a) / a * 100 if a else 0.0
+            return f"{a:>6.1f}→{b:<6.1f}{delta:+5.0f}%"
+
+        print(f"{r['caso']:<12} {r['fixture']:<18} {_fmt('segundos')} "
+              f"{_fmt('pico_rss_mb')} {_fmt('pico_disco_mb')}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--minutos", type=float, nargs="+", default=[5, 30, 120])
+    parser.add_argument("--formatos", nargs="+", choices=_KINDS, default=list(_KINDS))
+    parser.add_argument("--casos", nargs="+", choices=_CASES, default=list(_CASES))
+    parser.add_argument("--latencia", type=float, default=0.2,
+                        help="Latencia simulada de la API por petición (s)")
+    parser.add_argument("--ancho-banda", type=float, default=20.0,
+                        help="Ancho de banda de subida simulado (Mbit/s)")
+    parser.add_argument("--ajustes", help="JSON con ajustes para TranscriptionService")
+    parser.add_argument("--salida", help="Ruta del JSON de resultados")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DESPUES"))
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        compare(*args.comparar)
+        return
+
+    settings = {}
+    if args.ajustes:
+        with open(args.ajustes, encoding="utf-8") as f:
+            settings = json.load(f)
+    # Cada caso debe medir el trabajo real, no un acierto de caché
+    settings["cache_transcripciones"] = False
+
+    cases = list(args.casos)
+    if "vosk" in cases and not find_vosk_model_path():
+        print("Modelo Vosk no encontrado: se omite el caso 'vosk'.")
+        cases.remove("vosk")
+
+    server = start_fake_api(args.latencia, args.ancho_banda)
+    api_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    work_dir = os.path.join(tempfile.gettempdir(), "htv_bench")
+
+    results = []
+    try:
+        for minutes in args.minutos:
+            for kind in args.formatos:
+                fixture = make_fixture(minutes, kind)
+                duration_s = _duration(fixture)
+                for case in cases:
+                    r = run_case(case, fixture, duration_s, settings, api_url, work_dir)
+                    results.append(r)
+                    status = "ok" if r["ok"] else r["error"]
+                    print(f"{case:<12} {r['fixture']:<18} {r['segundos']:>8.2f}s  RTF {r['rtf']:.4f}  "
+                          f"RSS {r['pico_rss_mb']:.0f} MB  disco {r['pico_disco_mb']:.1f} MB  {status}",
+                          flush=True)
+    finally:
+        server.shutdown()
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ffmpeg": _ffmpeg_version(),
+        "api_simulada": {"latencia_s": args.latencia, "ancho_banda_mbps": args.ancho_banda},
+        "ajustes": settings,
+        "resultados": results,
+    }
+    out = args.salida or os.path.join(RESULTS_DIR, f"transcripcion_{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {out}")
+
+
+if __name__ == "__main__":
+    main()
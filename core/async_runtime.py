@@ -0,0 +1,71 @@
+"""
+Bucle asyncio único en un hilo de fondo.
+Las etapas de la aplicación (transcripción, redacción, verificación y
+publicación) se envían aquí como corrutinas: las esperas de red de varios
+trabajos se solapan sin un hilo del sistema por petición. Tk se actualiza
+siempre con `after`, desde el hilo de la interfaz.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+_STOP_TIMEOUT_S = 3.0
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+class BackgroundLoop:
+    def __init__(self, name: str = "asyncio"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Programa `coro` en el bucle; se puede llamar desde cualquier hilo."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, on_shutdown=None):
+        """Ejecuta `on_shutdown()` (corrutina) en el bucle y lo detiene."""
+        if not self.loop.is_running():
+            return
+        if on_shutdown is not None:
+            try:
+                self.submit(on_shutdown()).result(timeout=_STOP_TIMEOUT_S)
+            except Exception as exc:
+                log.warning("Cierre del bucle asíncrono incompleto: %s", exc)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=_STOP_TIMEOUT_S)
+
+
+def get_background_loop() -> BackgroundLoop:
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BackgroundLoop()
+        return _shared
+
+
+def bridge_to_tk(widget, future: concurrent.futures.Future, on_ok, on_error=None):
+    """Entrega el resultado de `future` a la interfaz (`on_ok(resultado)` o `on_error(exc)`)."""
+    def _done(fut):
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is None:
+            widget.after(0, on_ok, fut.result())
+        elif on_error is not None:
+            widget.after(0, on_error, exc)
+        else:
+            log.error("Tarea asíncrona fallida: %s", exc)
+
+    future.add_done_callback(_done)
+    return future
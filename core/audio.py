@@ -0,0 +1,330 @@
+"""
+Utilidades de audio basadas en ffmpeg.
+Decodifican cualquier medio a PCM 16 kHz mono s16le sin pasar por disco.
+"""
+
+import math
+import operator
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+# Formato canónico para reconocimiento de voz
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+BYTES_PER_SECOND = SAMPLE_RATE * SAMPLE_WIDTH
+
+# Directorio raíz del proyecto (donde está app.py)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Directorio hermano con herramientas externas (puede no existir)
+_TOOLS_DIR = os.path.join(os.path.dirname(PROJECT_DIR), "Herramientas_Htv")
+
+# Evita que cada llamada a ffmpeg abra una consola en Windows (pythonw)
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def _ensure_ffmpeg_in_path():
+    """Garantiza que ffmpeg esté en PATH antes de lanzar subprocesos."""
+    if shutil.which("ffmpeg"):
+        return
+    _candidate = os.path.join(_TOOLS_DIR, "ffmpeg-master-latest-win64-gpl", "bin")
+    if os.path.isdir(_candidate):
+        os.environ["PATH"] = _candidate + os.pathsep + os.environ.get("PATH", "")
+        log.info("ffmpeg añadido desde ruta externa: %s", _candidate)
+    else:
+        log.warning("ffmpeg no encontrado en el PATH ni en la ruta externa. "
+                    "Las transcripciones de audio pueden fallar.")
+
+
+_ensure_ffmpeg_in_path()
+
+
+def ffmpeg_bin() -> str:
+    return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def iter_pcm(input_file: str, chunk_bytes: int = 8000,
+             start: float | None = None, duration: float | None = None):
+    """
+    Genera bloques de PCM 16 kHz mono s16le leídos de la salida de ffmpeg.
+    La memoria usada es constante sea cual sea la duración del archivo.
+    `start` y `duration` (segundos) permiten decodificar solo un tramo.
+    """
+    cmd = [ffmpeg_bin(), "-nostdin", "-hide_banner", "-loglevel", "error"]
+    if start:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += ["-i", input_file]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    cmd += [
+        "-vn",
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "-f", "s16le",
+        "pipe:1",
+    ]
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        creationflags=_NO_WINDOW,
+    )
+    # stderr se vacía en un hilo: con un medio dañado ffmpeg puede llenar el
+    # pipe de errores y bloquearse sin cerrar nunca stdout
+    errors = []
+    reader = threading.Thread(target=lambda: errors.append(proc.stderr.read()), daemon=True)
+    reader.start()
+    finished = False
+    try:
+        while True:
+            data = proc.stdout.read(chunk_bytes)
+            if not data:
+                break
+            yield data
+        finished = True
+    finally:
+        if not finished:
+            proc.kill()
+        proc.stdout.close()
+        returncode = proc.wait()
+        reader.join()
+        proc.stderr.close()
+        if finished and returncode != 0:
+            raise RuntimeError(
+                f"No se pudo decodificar el audio de '{input_file}': "
+                f"{b''.join(errors).decode(errors='replace')}"
+            )
+
+
+def run_ffmpeg(args: list[str], stdin_chunks=None, stdout=None) -> int:
+    """
+    Ejecuta ffmpeg con `args`. `stdin_chunks` (iterable de bytes) alimenta
+    pipe:0 y `stdout` (archivo binario) recibe lo que ffmpeg escriba en pipe:1.
+    Devuelve los bytes escritos en `stdout`; lanza CalledProcessError si falla.
+    """
+    cmd = [ffmpeg_bin(), "-hide_banner", "-loglevel", "error"]
+    if stdin_chunks is None:
+        cmd.append("-nostdin")
+    cmd += args
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if stdin_chunks is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE if stdout is not None else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        creationflags=_NO_WINDOW,
+    )
+    # stdout y stderr se vacían en hilos para que ffmpeg no se bloquee
+    # mientras se le escribe por stdin
+    written = 0
+    errors = []
+
+    def _drain_stdout():
+        nonlocal written
+        for data in iter(lambda: proc.stdout.read(65536), b""):
+            stdout.write(data)
+            written += len(data)
+
+    readers = [threading.Thread(target=lambda: errors.append(proc.stderr.read()), daemon=True)]
+    if stdout is not None:
+        readers.append(threading.Thread(target=_drain_stdout, daemon=True))
+    for t in readers:
+        t.start()
+    try:
+        if stdin_chunks is not None:
+            try:
+                for data in stdin_chunks:
+                    proc.stdin.write(data)
+            except BrokenPipeError:
+                pass  # ffmpeg terminó antes de tiempo: lo dirá su código de salida
+            finally:
+                proc.stdin.close()
+                if hasattr(stdin_chunks, "close"):
+                    stdin_chunks.close()
+        for t in readers:
+            t.join()
+        returncode = proc.wait()
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for pipe in (proc.stdout, proc.stderr):
+            if pipe:
+                pipe.close()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=b"".join(errors))
+    return written
+
+
+def _samples(data: bytes) -> array:
+    """Muestras s16le como array de enteros (en el orden de bytes de la máquina)."""
+    samples = array("h")
+    samples.frombytes(data)
+    if sys.byteorder != "little":
+        samples.byteswap()
+    return samples
+
+
+def rms(samples: array) -> int:
+    """Energía RMS entera de unas muestras (lo que daba audioop.rms, retirado en Python 3.13)."""
+    if not samples:
+        return 0
+    return int(math.sqrt(sum(map(operator.mul, samples, samples)) / len(samples)))
+
+
+def scan_energy(input_file: str, frame_ms: int = 30) -> array:
+    """
+    Devuelve la energía RMS de cada trama de `frame_ms` ms del audio.
+    Una sola pasada en streaming; la duración es len(result) * frame_ms / 1000.
+    """
+    frame_bytes = BYTES_PER_SECOND * frame_ms // 1000
+    frame_samples = frame_bytes // SAMPLE_WIDTH
+    energies = array("H")
+    pending = b""
+    for data in iter_pcm(input_file, chunk_bytes=frame_bytes * 200):
+        if pending:
+            data = pending + data
+        usable = len(data) - len(data) % frame_bytes
+        samples = _samples(data[:usable])
+        for off in range(0, len(samples), frame_samples):
+            energies.append(rms(samples[off:off + frame_samples]))
+        pending = data[usable:]
+    if pending:
+        energies.append(rms(_samples(pending[: len(pending) - len(pending) % SAMPLE_WIDTH])))
+    return energies
+
+
+def find_split_points(energies: array, frame_ms: int, target_s: float,
+                      search_s: float = 10.0, smooth_ms: int = 300) -> list[float]:
+    """
+    Elige puntos de corte (segundos) cada ~`target_s` segundos, desplazados
+    dentro de ±`search_s` al instante más silencioso para no partir palabras.
+    """
+    n = len(energies)
+    target = int(target_s * 1000 / frame_ms)
+    if target <= 0 or n <= target:
+        return []
+
+    # Media móvil de la energía: un silencio real dura varias tramas seguidas
+    win = max(1, smooth_ms // frame_ms)
+    acc = 0
+    smoothed = array("L")
+    for i, e in enumerate(energies):
+        acc += e
+        if i >= win:
+            acc -= energies[i - win]
+        smoothed.append(acc)
+
+    search = int(search_s * 1000 / frame_ms)
+    points = []
+    last = 0
+    pos = target
+    while pos < n - target // 4:
+        lo = max(last + 1, pos - search)
+        hi = min(n - 1, pos + search)
+        best = min(range(lo, hi + 1), key=smoothed.__getitem__)
+        # Centro de la ventana suavizada que acaba en `best`
+        cut = max(last + 1, best - win // 2)
+        points.append(cut * frame_ms / 1000)
+        last = cut
+        pos = cut + target
+    return points
+
+
+def speech_spans(energies: array, frame_ms: int, min_silence_s: float = 1.5,
+                 pad_s: float = 0.3) -> list[tuple[float, float]]:
+    """
+    Tramos con voz (inicio, fin) en segundos. Solo se descartan los silencios
+    de más de `min_silence_s`; se dejan `pad_s` de margen a cada lado.
+    El umbral se adapta al ruido de fondo de la grabación.
+    """
+    n = len(energies)
+    if n == 0:
+        return []
+    # Suelo de ruido: percentil 10 de la energía, con un mínimo absoluto
+    ordered = sorted(energies)
+    floor = ordered[n // 10]
+    threshold = max(60, floor * 2.5)
+
+    min_gap = int(min_silence_s * 1000 / frame_ms)
+    pad = int(pad_s * 1000 / frame_ms)
+
+    spans = []
+    run_start = None
+    last_voice = None
+    for i, e in enumerate(energies):
+        if e < threshold:
+            continue
+        if run_start is None:
+            run_start = i
+        elif i - last_voice > min_gap:
+            spans.append((run_start, last_voice + 1))
+            run_start = i
+        last_voice = i
+    if run_start is not None:
+        spans.append((run_start, last_voice + 1))
+
+    to_s = frame_ms / 1000
+    return [(max(0, a - pad) * to_s, min(n, b + pad) * to_s) for a, b in spans]
+
+
+class OffsetMap:
+    """Convierte tiempos del audio recortado a tiempos del original."""
+
+    def __init__(self, spans: list[tuple[float, float]]):
+        self.spans = list(spans)
+        self._trimmed_starts = []
+        acc = 0.0
+        for start, end in self.spans:
+            self._trimmed_starts.append(acc)
+            acc += end - start
+        self.kept_seconds = acc
+
+    def to_original(self, t: float) -> float:
+        if not self.spans:
+            return t
+        i = max(0, bisect_right(self._trimmed_starts, t) - 1)
+        return self.spans[i][0] + (t - self._trimmed_starts[i])
+
+    def clip(self, start: float, end: float) -> "OffsetMap":
+        """Mapa relativo a la ventana [start, end) del original."""
+        return OffsetMap([
+            (max(a, start) - start, min(b, end) - start)
+            for a, b in self.spans
+            if b > start and a < end
+        ])
+
+
+def iter_pcm_spans(input_file: str, spans: list[tuple[float, float]], chunk_bytes: int = 8000,
+                   start: float | None = None, duration: float | None = None):
+    """
+    Como `iter_pcm`, pero solo entrega el audio dentro de `spans`
+    (segundos relativos a `start`). El resto se descarta sin acumularlo.
+    """
+    ranges = [
+        (int(a * SAMPLE_RATE) * SAMPLE_WIDTH, int(b * SAMPLE_RATE) * SAMPLE_WIDTH)
+        for a, b in spans
+    ]
+    idx = 0
+    pos = 0
+    for data in iter_pcm(input_file, chunk_bytes, start=start, duration=duration):
+        end = pos + len(data)
+        while idx < len(ranges) and ranges[idx][1] <= pos:
+            idx += 1
+        j = idx
+        while j < len(ranges) and ranges[j][0] < end:
+            a = max(ranges[j][0], pos) - pos
+            b = min(ranges[j][1], end) - pos
+            if b > a:
+                yield data[a:b]
+            j += 1
+        pos = end
+        if idx >= len(ranges):
+            break
@@ -0,0 +1,146 @@
+"""
+Caché de audio canónico (WAV 16 kHz mono s16le).
+Cada medio se decodifica una sola vez; Whisper (al recodificar o trocear),
+Vosk y cualquier reproceso leen después el WAV, que ffmpeg lee sin coste de
+decodificación. Se expulsan los menos usados cuando se supera el tamaño total.
+"""
+
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+import core.disk_cache as disk_cache
+from core.audio import SAMPLE_RATE, run_ffmpeg
+from core.logger import get_logger
+from core.transcription_cache import content_hash
+
+log = get_logger(__name__)
+
+_DEFAULT_MAX_MB = 2048
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+class CanonicalAudioCache:
+    def __init__(self, max_mb: float = _DEFAULT_MAX_MB, directory: str | None = None):
+        self.directory = directory or os.path.join(disk_cache.CACHE_DIR, "audio")
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        # Un cerrojo por archivo: el vigilante y los motores pueden pedir el mismo a la vez.
+        # Se guarda con cuántos hilos lo usan para soltarlo al terminar el último.
+        self._key_locks: dict[str, list] = {}
+        # WAV que algún trabajo está leyendo (ruta → número de trabajos): no se expulsan
+        self._pins: dict[str, int] = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.wav")
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    @contextmanager
+    def pinned(self, source: str):
+        """Protege el WAV canónico de `source` de la expulsión mientras dure el bloque."""
+        path = self._path(content_hash(source))
+        with self._lock:
+            self._pins[path] = self._pins.get(path, 0) + 1
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._pins[path] -= 1
+                if not self._pins[path]:
+                    del self._pins[path]
+
+    def ensure(self, source: str) -> str:
+        """Devuelve el WAV canónico de `source`, decodificándolo si hace falta."""
+        key = content_hash(source)
+        path = self._path(key)
+        with self._key_lock(key):
+            try:
+                os.utime(path)
+                log.info("Audio canónico reutilizado: %s", os.path.basename(source))
+                return path
+            except OSError:
+                pass
+
+            t0 = time.perf_counter()
+            part = f"{path}.{threading.get_ident()}.part"
+            try:
+                run_ffmpeg(["-i", source, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+                            "-c:a", "pcm_s16le", "-f", "wav", "-y", part])
+                os.replace(part, path)  # atómico: nadie ve un WAV a medias
+            except BaseException:
+                if os.path.exists(part):
+                    os.unlink(part)
+                raise
+            log.info("Audio canónico creado en %.2fs: %s (%.1f MB)", time.perf_counter() - t0,
+                     os.path.basename(source), os.path.getsize(path) / (1024 * 1024))
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str | None = None):
+        """Borra los WAV menos usados hasta quedar por debajo del tamaño máximo."""
+        with self._lock:
+            in_use = set(self._pins)
+        if keep:
+            in_use.add(keep)
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".wav"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in in_use:
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue  # en uso (Windows): se intentará en la próxima expulsión
+            total -= size
+            log.info("Audio canónico expulsado: %s (%.1f MB)", os.path.basename(path),
+                     size / (1024 * 1024))
+
+
+def get_audio_cache(max_mb: float | None = None) -> CanonicalAudioCache:
+    """Instancia compartida; `max_mb` actualiza el tamaño máximo si se indica."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = CanonicalAudioCache(max_mb or _DEFAULT_MAX_MB)
+        elif max_mb:
+            _shared.max_bytes = int(max_mb * 1024 * 1024)
+        return _shared
+
+
+def ingest_async(source: str, max_mb: float | None = None) -> threading.Thread:
+    """Decodifica `source` en segundo plano (p. ej. al detectarlo el vigilante)."""
+    def _run():
+        try:
+            get_audio_cache(max_mb).ensure(source)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            log.warning("No se pudo preparar el audio canónico de '%s': %s", source, exc)
+
+    thread = threading.Thread(target=_run, name="ingesta-audio", daemon=True)
+    thread.start()
+    return thread
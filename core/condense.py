@@ -0,0 +1,102 @@
+"""
+Condensación previa (map-reduce) de transcripciones muy largas.
+Si la transcripción supera el umbral de `prompts.json` ("condensacion"), se
+trocea en fragmentos acotados en tokens, cada fragmento se resume en paralelo
+con un modelo rápido y la redacción recibe los hechos extraídos, en orden,
+en lugar del texto en bruto.
+"""
+
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+# Estimación sin tokenizador: en español ~4 caracteres por token
+_CHARS_PER_TOKEN = 4
+_DEFAULT_THRESHOLD_TOKENS = 6000
+_DEFAULT_CHUNK_TOKENS = 3000
+_DEFAULT_CONCURRENCY = 4
+
+# Vosk no puntúa: si no hay frases, se trocea por palabras
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+")
+
+_HEADER = ("HECHOS EXTRAÍDOS DE UNA TRANSCRIPCIÓN LARGA "
+           "(resumen por fragmentos, en orden cronológico):")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def needs_condensing(text: str, cfg: dict | None) -> bool:
+    if not cfg:
+        return False
+    return estimate_tokens(text) > int(cfg.get("umbral_tokens", _DEFAULT_THRESHOLD_TOKENS))
+
+
+def split_transcript(text: str, max_tokens: int) -> list[str]:
+    """Fragmentos de como mucho `max_tokens` (estimados), cortados en frases o palabras."""
+    max_chars = max(1, max_tokens * _CHARS_PER_TOKEN)
+    pieces = []
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+        else:
+            pieces.extend(sentence.split())
+
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        if current and size + 1 + len(piece) > max_chars:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + (1 if size else 0)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _plan(text: str, cfg: dict) -> tuple[list[str], int]:
+    chunks = split_transcript(text, int(cfg.get("tramo_tokens", _DEFAULT_CHUNK_TOKENS)))
+    workers = max(1, min(len(chunks), int(cfg.get("concurrencia", _DEFAULT_CONCURRENCY))))
+    return chunks, workers
+
+
+def _assemble(text: str, summaries: list[str], workers: int, t0: float) -> str:
+    parts = [f"[Fragmento {i}/{len(summaries)}]\n{summary.strip()}"
+             for i, summary in enumerate(summaries, start=1)]
+    condensed = f"{_HEADER}\n\n" + "\n\n".join(parts)
+    log.info("Transcripción condensada: ~%d → ~%d tokens en %d fragmentos (%.2fs, %d en paralelo)",
+             estimate_tokens(text), estimate_tokens(condensed), len(summaries),
+             time.perf_counter() - t0, workers)
+    return condensed
+
+
+def condense(text: str, cfg: dict, summarize) -> str:
+    """
+    Resume `text` por fragmentos. `summarize(indice, total, fragmento) -> str`
+    hace la llamada al modelo; se ejecuta en paralelo y se une en orden.
+    """
+    chunks, workers = _plan(text, cfg)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="condensar") as pool:
+        summaries = list(pool.map(lambda item: summarize(item[0], len(chunks), item[1]),
+                                  enumerate(chunks, start=1)))
+    return _assemble(text, summaries, workers, t0)
+
+
+async def condense_async(text: str, cfg: dict, summarize) -> str:
+    """Como `condense`, con `summarize` asíncrona y como mucho `concurrencia` a la vez."""
+    chunks, workers = _plan(text, cfg)
+    limit = asyncio.Semaphore(workers)
+    t0 = time.perf_counter()
+
+    async def _one(index: int, fragment: str) -> str:
+        async with limit:
+            return await summarize(index, len(chunks), fragment)
+
+    summaries = await asyncio.gather(*(_one(i, c) for i, c in enumerate(chunks, start=1)))
+    return _assemble(text, list(summaries), workers, t0)
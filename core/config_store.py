@@ -0,0 +1,191 @@
+"""
+Almacén de configuración (settings.json y prompts.json) en memoria.
+Cada archivo se lee y valida una vez; después solo se vuelve a leer si
+cambia su mtime (comprobado como mucho cada _CHECK_INTERVAL_S) o si se
+guarda desde la aplicación. Los servicios nunca leen disco por petición.
+"""
+
+import copy
+import json
+import os
+import string
+import threading
+import time
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_DIR = os.path.join(PROJECT_DIR, "config")
+PROMPTS_PATH = os.path.join(CONFIG_DIR, "prompts.json")
+SETTINGS_PATH = os.path.join(CONFIG_DIR, "settings.json")
+
+# Cada cuánto se mira el mtime como máximo (una llamada a stat, sin leer el archivo)
+_CHECK_INTERVAL_S = 2.0
+
+# Campos que cada plantilla puede usar en `user_prompt_template`
+PROMPT_FIELDS = {
+    "redaccion": {"transcription", "original_filename"},
+    "verificacion": {"titulo", "entradilla", "contenido", "etiquetas"},
+    "condensacion": {"fragmento", "indice", "total", "original_filename"},
+}
+# Secciones que pueden faltar en prompts.json (la función queda desactivada)
+_OPTIONAL_SECTIONS = {"condensacion"}
+# Claves numéricas opcionales de cada sección: si están, enteros positivos
+_POSITIVE_INT_KEYS = {"condensacion": ("umbral_tokens", "tramo_tokens", "concurrencia")}
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def validate_prompts(data) -> None:
+    """Comprueba secciones, claves y marcadores {campo} de las plantillas."""
+    if not isinstance(data, dict):
+        raise ConfigError("prompts.json debe contener un objeto JSON.")
+    for section, allowed in PROMPT_FIELDS.items():
+        cfg = data.get(section)
+        if cfg is None and section in _OPTIONAL_SECTIONS:
+            continue
+        if not isinstance(cfg, dict):
+            raise ConfigError(f"prompts.json: falta la sección '{section}'.")
+        for key in ("system_prompt", "user_prompt_template"):
+            if not isinstance(cfg.get(key), str) or not cfg[key].strip():
+                raise ConfigError(f"prompts.json: '{section}.{key}' está vacío o no es texto.")
+        try:
+            used = {name for _, name, _, _ in string.Formatter().parse(cfg["user_prompt_template"])
+                    if name is not None}
+        except ValueError as e:
+            raise ConfigError(f"prompts.json: plantilla '{section}' mal formada ({e}). "
+                              "Las llaves literales se escriben {{ y }}.") from e
+        unknown = {name.split(".")[0].split("[")[0] for name in used} - allowed
+        if unknown:
+            raise ConfigError(
+                f"prompts.json: la plantilla '{section}' usa {sorted(unknown)}; "
+                f"campos disponibles: {sorted(allowed)}."
+            )
+        for key in _POSITIVE_INT_KEYS.get(section, ()):
+            value = cfg.get(key)
+            if value is not None and (type(value) is not int or value <= 0):
+                raise ConfigError(
+                    f"prompts.json: '{section}.{key}' debe ser un entero positivo (vale {value!r})."
+                )
+
+
+def _validate_settings(data) -> None:
+    if not isinstance(data, dict):
+        raise ConfigError("settings.json debe contener un objeto JSON.")
+
+
+class JsonConfigFile:
+    """Un archivo JSON de configuración cacheado e invalidado por mtime."""
+
+    def __init__(self, path: str, default=None, validate=None):
+        self.path = path
+        self._default = default
+        self._validate = validate
+        self._lock = threading.Lock()
+        self._data = None
+        self._stamp = None
+        self._checked = 0.0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def get(self):
+        """Datos en caché; no se deben modificar (usar `copy()` para editar)."""
+        now = time.monotonic()
+        if self._data is not None and now - self._checked < _CHECK_INTERVAL_S:
+            return self._data
+        with self._lock:
+            stamp = self._stat()
+            self._checked = now
+            if self._data is not None and stamp == self._stamp:
+                return self._data
+            self._reload(stamp)
+            return self._data
+
+    def copy(self):
+        return copy.deepcopy(self.get())
+
+    def _reload(self, stamp):
+        if stamp is None:
+            if self._default is None:
+                raise ConfigError(f"No existe {os.path.basename(self.path)}.")
+            data = copy.deepcopy(self._default)
+        else:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if self._validate:
+                    self._validate(data)
+            except (OSError, ValueError) as e:
+                name = os.path.basename(self.path)
+                error = e if isinstance(e, ConfigError) else ConfigError(f"{name} ilegible: {e}")
+                if self._data is not None:
+                    # Edición manual a medias o errónea: se mantiene la última válida
+                    log.error("%s Se mantiene la versión anterior.", error)
+                    self._stamp = stamp
+                    return
+                if self._default is None:
+                    raise error from e
+                log.error("%s Se usan valores por defecto.", error)
+                data = copy.deepcopy(self._default)
+            log.info("Configuración cargada: %s", os.path.basename(self.path))
+        self._data = data
+        self._stamp = stamp
+
+    def save(self, data):
+        """Valida, escribe de forma atómica y actualiza la caché sin releer."""
+        if self._validate:
+            self._validate(data)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        os.replace(tmp, self.path)
+        with self._lock:
+            self._data = copy.deepcopy(data)
+            self._stamp = self._stat()
+            self._checked = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._checked = 0.0
+            self._stamp = None
+
+
+settings_file = JsonConfigFile(SETTINGS_PATH, default={"watch_folder": ""}, validate=_validate_settings)
+prompts_file = JsonConfigFile(PROMPTS_PATH, validate=validate_prompts)
+
+
+def load_settings() -> dict:
+    """Copia de los ajustes (el llamador puede modificarla)."""
+    return dict(settings_file.get())
+
+
+def save_settings(data: dict):
+    settings_file.save(data)
+
+
+def prompt(section: str) -> dict | None:
+    """Configuración de una sección de prompts (solo lectura); None si es opcional y falta."""
+    return prompts_file.get().get(section)
+
+
+def load_prompts() -> dict:
+    """Copia editable de todos los prompts."""
+    return prompts_file.copy()
+
+
+def save_prompts(data: dict):
+    prompts_file.save(data)
+
+
+def invalidate():
+    settings_file.invalidate()
+    prompts_file.invalidate()
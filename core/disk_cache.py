@@ -0,0 +1,114 @@
+"""
+Caché persistente clave → valor sobre SQLite.
+Expulsa entradas por antigüedad y, si se supera el tamaño máximo,
+las menos usadas recientemente (LRU).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+# Directorio raíz del proyecto (donde está app.py)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(PROJECT_DIR, "cache")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key      TEXT PRIMARY KEY,
+    value    TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    created  REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+
+class DiskCache:
+    def __init__(self, filename: str, max_mb: float, max_age_days: float, name: str = "cache"):
+        self.path = os.path.join(CACHE_DIR, filename)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:  # commit/rollback automático
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.max_age and now - row[1] > self.max_age:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+            else:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+        log.info("[%s] %s (aciertos %d, fallos %d)",
+                 self.name, "acierto" if row else "fallo", self.hits, self.misses)
+        return row[0] if row else None
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(conn, now)
+
+    def delete(self, key: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def items(self) -> list[tuple[str, str]]:
+        """Todas las entradas vigentes (sin contar aciertos ni actualizar el uso)."""
+        with self._lock, self._connect() as conn:
+            if self.max_age:
+                return conn.execute(
+                    "SELECT key, value FROM entries WHERE created >= ?",
+                    (time.time() - self.max_age,),
+                ).fetchall()
+            return conn.execute("SELECT key, value FROM entries").fetchall()
+
+    def _evict(self, conn, now: float):
+        removed = 0
+        if self.max_age:
+            removed += conn.execute(
+                "DELETE FROM entries WHERE created < ?", (now - self.max_age,)
+            ).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if self.max_bytes and total > self.max_bytes:
+            for key, size in conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed ASC"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+        if removed:
+            log.info("[%s] %d entradas expulsadas (%.1f MB en uso)",
+                     self.name, removed, total / (1024 * 1024))
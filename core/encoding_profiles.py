@@ -0,0 +1,51 @@
+"""
+Perfiles de codificación para subir audio a Whisper.
+El bitrate se elige según la duración para que la subida quepa en el límite
+de la API con el menor tamaño posible; Opus rinde mejor que MP3 con voz.
+"""
+
+from dataclasses import dataclass
+
+# Margen para cabeceras del contenedor y variaciones del bitrate real
+_SAFETY = 0.92
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    codec: str
+    bitrate_kbps: int
+    extension: str
+
+    def ffmpeg_args(self) -> list[str]:
+        if self.codec == "opus":
+            # "voip" optimiza el códec para voz
+            return ["-c:a", "libopus", "-b:a", f"{self.bitrate_kbps}k", "-application", "voip"]
+        return ["-c:a", "libmp3lame", "-b:a", f"{self.bitrate_kbps}k"]
+
+    @property
+    def muxer(self) -> str:
+        """Formato de ffmpeg (-f) para escribir en una tubería."""
+        return "ogg" if self.codec == "opus" else "mp3"
+
+    def estimated_mb(self, duration_s: float) -> float:
+        return self.bitrate_kbps * 1000 * duration_s / 8 / (1024 * 1024)
+
+
+# (códec, extensión, bitrate preferido, bitrate mínimo aceptable) en kbps
+_CODECS = {
+    "opus": ("opus", ".ogg", 24, 12),
+    "mp3": ("mp3", ".mp3", 64, 32),
+}
+
+
+def select_profile(duration_s: float | None, preference: str = "auto",
+                   max_mb: float = 24) -> EncodingProfile:
+    """
+    Devuelve el perfil para `duration_s` segundos. "auto" usa Opus; con
+    duración desconocida se usa el bitrate preferido del códec.
+    """
+    codec, ext, preferred, minimum = _CODECS.get(preference, _CODECS["opus"])
+    if not duration_s:
+        return EncodingProfile(codec, preferred, ext)
+    fit_kbps = int(max_mb * 1024 * 1024 * 8 * _SAFETY / duration_s / 1000)
+    return EncodingProfile(codec, max(minimum, min(preferred, fit_kbps)), ext)
@@ -0,0 +1,135 @@
+"""
+Caché persistente de datos ya verificados (nombres, cargos, instituciones).
+Cada verificación deja aquí los `datos_confirmados` con fuente y las
+grafías corregidas de nombres propios. En la siguiente noticia que los
+mencione se anotan en el prompt como ya verificados, para que el modelo de
+búsqueda no vuelva a buscarlos. Caducan tras `cache_verificacion_dias`: los
+cargos cambian y el dato debe volver a comprobarse.
+"""
+
+import json
+import re
+import unicodedata
+from core.disk_cache import DiskCache
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+# Fragmentos más cortos o más largos no son una entidad reconocible
+_MIN_TERM_CHARS = 4
+_MAX_TERM_CHARS = 80
+_MAX_FACTS_IN_PROMPT = 25
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\w+")
+# Enlaces que pueden ir en minúscula dentro de un nombre propio («Diputación de Huelva»)
+_NAME_LINKS = {"de", "del", "la", "las", "los", "el", "y", "e", "i"}
+
+_HEADER = ("DATOS YA VERIFICADOS EN NOTICIAS ANTERIORES (dalos por buenos y no vuelvas "
+           "a buscarlos, salvo que el texto los contradiga o escriba el nombre de otra forma):")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin tildes, sin HTML ni puntuación: «José  Pérez,» → «jose perez»."""
+    text = unicodedata.normalize("NFKD", _TAG_RE.sub(" ", text).casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_WORD_RE.findall(text))
+
+
+def _term(text: str) -> str | None:
+    term = normalize(text or "")
+    return term if _MIN_TERM_CHARS <= len(term) <= _MAX_TERM_CHARS else None
+
+
+def _is_proper_name(text: str) -> bool:
+    """«Pilar Miranda» o «Diputación de Huelva» sí; «el lunes» o «3.000 euros» no."""
+    words = _WORD_RE.findall(text)
+    if not words or not words[0][0].isupper() or not words[-1][0].isupper():
+        return False
+    return all(w[0].isupper() or w in _NAME_LINKS for w in words)
+
+
+def extract_facts(result: dict, skip=()) -> dict[str, dict]:
+    """
+    Datos con fuente de una verificación, indexados por su forma normalizada.
+    Los `datos_confirmados` de `skip` (ya anotados en el prompt) se omiten:
+    repetirlos sin haberlos buscado no debe renovar su caducidad. De las
+    correcciones solo se aprende la grafía de nombres propios (con la forma
+    errónea como alias), nunca su explicación: fechas, cifras o frases
+    corregidas solo valen para esa noticia. Se guardan siempre, porque
+    desmienten lo que hubiera.
+    """
+    fuentes = result.get("fuentes_consultadas") or []
+    # Sin fuente propia, solo se atribuye la consultada si es la única
+    default_source = fuentes[0] if len(fuentes) == 1 else ""
+    facts = {}
+
+    for item in result.get("correcciones") or []:
+        corregido = (item.get("corregido") or "").strip()
+        fuente = item.get("fuente") or default_source
+        term = _term(corregido)
+        if not term or not fuente or not _is_proper_name(corregido):
+            continue
+        fact = {"entidad": corregido, "dato": "",
+                "fuente": fuente, "fecha": item.get("fecha_referencia", "")}
+        facts[term] = fact
+        original = (item.get("original") or "").strip()
+        wrong = _term(original)
+        if wrong and wrong != term and _is_proper_name(original):
+            facts[wrong] = {**fact, "forma_erronea": original}
+
+    for item in result.get("datos_confirmados") or []:
+        entidad = (item.get("entidad") or "").strip()
+        fuente = item.get("fuente") or default_source
+        term = _term(entidad)
+        if term and fuente and term not in skip:
+            facts.setdefault(term, {"entidad": entidad, "dato": item.get("dato", ""),
+                                    "fuente": fuente, "fecha": ""})
+    return facts
+
+
+def annotation(facts: list[dict]) -> str:
+    """Bloque para el prompt de verificación con los datos ya confirmados."""
+    lines = []
+    for fact in facts:
+        line = f"- «{fact['entidad']}»"
+        if fact.get("dato"):
+            line += f": {fact['dato']}"
+        if fact.get("forma_erronea"):
+            line += f" (no «{fact['forma_erronea']}»)"
+        source = ", ".join(part for part in (fact.get("fuente"), fact.get("fecha")) if part)
+        lines.append(f"{line} [fuente: {source}]")
+    return f"{_HEADER}\n" + "\n".join(lines)
+
+
+class FactCache:
+    def __init__(self, ttl_days: float = 30, max_mb: float = 5):
+        self._store = DiskCache("facts.sqlite3", max_mb, ttl_days, name="Caché datos verificados")
+
+    def known(self, news_data: dict) -> dict[str, dict]:
+        """Datos vigentes que aparecen en el borrador, por su forma normalizada."""
+        parts = [news_data.get(k, "") for k in ("titulo", "entradilla", "contenido")]
+        parts.extend(news_data.get("etiquetas", []))
+        text = f" {normalize(' '.join(parts))} "
+        found = {}
+        for term, raw in self._store.items():
+            if f" {term} " not in text:
+                continue
+            try:
+                found[term] = json.loads(raw)
+            except ValueError:
+                self._store.delete(term)
+            if len(found) >= _MAX_FACTS_IN_PROMPT:
+                break
+        if found:
+            log.info("[Caché datos verificados] %d datos del borrador ya confirmados", len(found))
+        return found
+
+    def remember(self, result: dict, skip=()) -> int:
+        """Guarda los datos confirmados en `result` (ver `extract_facts`)."""
+        facts = extract_facts(result, skip)
+        for term, fact in facts.items():
+            self._store.put(term, json.dumps(fact, ensure_ascii=False, separators=(",", ":")))
+        if facts:
+            log.info("[Caché datos verificados] %d datos nuevos o renovados", len(facts))
+        return len(facts)
@@ -0,0 +1,182 @@
+"""
+Clientes HTTP compartidos con conexiones persistentes (keep-alive).
+Transcripción, redacción y verificación usan un único cliente de OpenAI y el
+publicador una requests.Session por host, de modo que cada llamada reutiliza
+una conexión TCP+TLS ya abierta en lugar de negociar otra. En nivel DEBUG se
+registra si cada petición abrió conexión nueva o reutilizó una del pool.
+Las variantes asíncronas (AsyncOpenAI, httpx.AsyncClient) viven en el bucle
+de fondo de core.async_runtime y se cierran con `aclose_all()`.
+"""
+
+import threading
+from urllib.parse import urlsplit
+import requests
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from requests.adapters import HTTPAdapter
+from core.config_store import load_settings
+from core.logger import get_logger
+
+try:
+    import httpx
+except ImportError:  # las versiones recientes de openai se apoyan en httpx2
+    import httpx2 as httpx
+
+log = get_logger(__name__)
+
+_DEFAULT_POOL = 10
+_DEFAULT_TIMEOUT_S = 600    # igual que el cliente de OpenAI por defecto
+_CONNECT_TIMEOUT_S = 10
+_KEEPALIVE_S = 60
+
+_lock = threading.Lock()
+_openai_clients: dict[str, OpenAI] = {}
+_sessions: dict[str, requests.Session] = {}
+_async_openai_clients: dict[str, AsyncOpenAI] = {}
+_async_sessions: dict[str, "httpx.AsyncClient"] = {}
+
+# Errores de red de httpx que se consideran transitorios
+ASYNC_TRANSPORT_ERRORS = (httpx.TransportError,)
+
+
+def _pool_settings() -> tuple[int, float]:
+    settings = load_settings()
+    return (int(settings.get("http_conexiones", _DEFAULT_POOL)),
+            float(settings.get("http_timeout_segundos", _DEFAULT_TIMEOUT_S)))
+
+
+class _ReuseTracker:
+    """Cuenta conexiones abiertas y peticiones atendidas por un cliente httpx."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._streams = set()
+        self.requests = 0
+
+    def __call__(self, response):
+        stream = response.extensions.get("network_stream")
+        with self._lock:
+            self.requests += 1
+            new = id(stream) not in self._streams
+            self._streams.add(id(stream))
+            opened = len(self._streams)
+        log.debug("[HTTP] %s %s %s → %s (conexión %s; %d abiertas, %d peticiones)",
+                  self.name, response.request.method, response.request.url.host,
+                  response.status_code, "nueva" if new else "reutilizada", opened, self.requests)
+
+
+def _limits(pool: int):
+    return httpx.Limits(max_connections=pool, max_keepalive_connections=pool,
+                        keepalive_expiry=_KEEPALIVE_S)
+
+
+def _async_hook(tracker: _ReuseTracker):
+    async def _hook(response):
+        tracker(response)
+    return _hook
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """Cliente de OpenAI compartido por todos los servicios (uno por clave)."""
+    with _lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            pool, timeout = _pool_settings()
+            http_client = DefaultHttpxClient(
+                limits=_limits(pool),
+                timeout=httpx.Timeout(timeout, connect=_CONNECT_TIMEOUT_S),
+                event_hooks={"response": [_ReuseTracker("openai")]},
+            )
+            client = OpenAI(api_key=api_key, http_client=http_client)
+            _openai_clients[api_key] = client
+            log.info("Cliente OpenAI compartido creado (pool %d, timeout %.0fs)", pool, timeout)
+        return client
+
+
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """Cliente AsyncOpenAI compartido (uno por clave) para el bucle de fondo."""
+    with _lock:
+        client = _async_openai_clients.get(api_key)
+        if client is None:
+            pool, timeout = _pool_settings()
+            http_client = DefaultAsyncHttpxClient(
+                limits=_limits(pool),
+                timeout=httpx.Timeout(timeout, connect=_CONNECT_TIMEOUT_S),
+                event_hooks={"response": [_async_hook(_ReuseTracker("openai async"))]},
+            )
+            client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+            _async_openai_clients[api_key] = client
+            log.info("Cliente AsyncOpenAI compartido creado (pool %d, timeout %.0fs)", pool, timeout)
+        return client
+
+
+def _log_session_reuse(session: requests.Session):
+    def _hook(response, *args, **kwargs):
+        host = urlsplit(response.url).hostname
+        pools = session.get_adapter(response.url).poolmanager.pools
+        opened = served = 0
+        for key in pools.keys():
+            if key.key_host == host:
+                pool = pools[key]
+                opened += pool.num_connections
+                served += pool.num_requests
+        log.debug("[HTTP] %s %s → %s (%d conexiones abiertas, %d peticiones)",
+                  response.request.method, host, response.status_code, opened, served)
+    return _hook
+
+
+def get_session(url: str) -> requests.Session:
+    """requests.Session compartida para el host de `url`."""
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    with _lock:
+        session = _sessions.get(origin)
+        if session is None:
+            pool, _timeout = _pool_settings()
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.hooks["response"].append(_log_session_reuse(session))
+            _sessions[origin] = session
+            log.info("Sesión HTTP compartida creada para %s (pool %d)", origin, pool)
+        return session
+
+
+def get_async_session(url: str) -> "httpx.AsyncClient":
+    """httpx.AsyncClient compartido para el host de `url`."""
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    with _lock:
+        client = _async_sessions.get(origin)
+        if client is None:
+            pool, timeout = _pool_settings()
+            client = httpx.AsyncClient(
+                limits=_limits(pool),
+                timeout=httpx.Timeout(timeout, connect=_CONNECT_TIMEOUT_S),
+                event_hooks={"response": [_async_hook(_ReuseTracker(parts.hostname or origin))]},
+            )
+            _async_sessions[origin] = client
+            log.info("Sesión HTTP asíncrona compartida creada para %s (pool %d)", origin, pool)
+        return client
+
+
+async def aclose_all():
+    """Cierra los clientes asíncronos; se ejecuta en el bucle que los usó."""
+    with _lock:
+        clients = list(_async_openai_clients.values()) + list(_async_sessions.values())
+        _async_openai_clients.clear()
+        _async_sessions.clear()
+    for client in clients:
+        await (client.close() if isinstance(client, AsyncOpenAI) else client.aclose())
+
+
+def close_all():
+    """Cierra las conexiones abiertas (al salir de la aplicación)."""
+    with _lock:
+        for client in _openai_clients.values():
+            client.close()
+        for session in _sessions.values():
+            session.close()
+        _openai_clients.clear()
+        _sessions.clear()
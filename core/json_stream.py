@@ -0,0 +1,126 @@
+"""
+Análisis incremental de un objeto JSON que llega por trozos (streaming).
+Entrega cada campo de primer nivel en cuanto su valor está completo, sin
+esperar al cierre del objeto.
+"""
+
+import json
+
+# Estados del analizador a nivel del objeto raíz
+_BEFORE_OBJECT = 0
+_EXPECT_KEY = 1
+_IN_KEY = 2
+_EXPECT_COLON = 3
+_EXPECT_VALUE = 4
+_IN_VALUE = 5
+_DONE = 6
+
+
+class JsonFieldStream:
+    """
+    `feed(trozo)` devuelve la lista de (clave, valor) completados con ese trozo.
+    Solo se interpreta la estructura del objeto raíz; cada valor se decodifica
+    con `json.loads` cuando termina.
+    """
+
+    def __init__(self):
+        self._buf = []
+        self._state = _BEFORE_OBJECT
+        self._key_chars = []
+        self._key = None
+        self._value = []
+        self._depth = 0          # anidamiento dentro del valor actual
+        self._in_string = False  # dentro de una cadena del valor actual
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def text(self) -> str:
+        """Todo lo recibido hasta ahora."""
+        return "".join(self._buf)
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        self._buf.append(chunk)
+        fields = []
+        for ch in chunk:
+            field = self._step(ch)
+            if field is not None:
+                fields.append(field)
+        return fields
+
+    def _finish_value(self):
+        raw = "".join(self._value).strip()
+        self._value = []
+        self._state = _EXPECT_KEY
+        return self._key, json.loads(raw)
+
+    def _step(self, ch: str):
+        state = self._state
+        if state == _IN_VALUE:
+            return self._step_value(ch)
+        if state == _IN_KEY:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._key = json.loads('"' + "".join(self._key_chars) + '"')
+                self._key_chars = []
+                self._state = _EXPECT_COLON
+                return None
+            self._key_chars.append(ch)
+            return None
+        if ch.isspace():
+            return None
+        if state == _BEFORE_OBJECT:
+            if ch == "{":
+                self._state = _EXPECT_KEY
+        elif state == _EXPECT_KEY:
+            if ch == '"':
+                self._state = _IN_KEY
+            elif ch == "}":
+                self._state = _DONE
+        elif state == _EXPECT_COLON:
+            if ch == ":":
+                self._state = _EXPECT_VALUE
+        elif state == _EXPECT_VALUE:
+            self._state = _IN_VALUE
+            self._depth = 0
+            self._in_string = False
+            return self._step_value(ch)
+        return None
+
+    def _step_value(self, ch: str):
+        if self._in_string:
+            self._value.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if self._depth == 0:
+                    return self._finish_value()  # cadena de primer nivel completa
+            return None
+
+        if self._depth == 0 and ch in ",}":
+            # Fin de un número, true/false/null (o separador tras un valor ya entregado)
+            field = self._finish_value() if "".join(self._value).strip() else None
+            if ch == "}":
+                self._state = _DONE
+            return field
+        if self._depth == 0 and not self._value and ch.isspace():
+            return None
+
+        self._value.append(ch)
+        if ch == '"':
+            self._in_string = True
+        elif ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            self._depth -= 1
+            if self._depth == 0:
+                return self._finish_value()
+        return None
@@ -0,0 +1,42 @@
+"""
+Caché persistente de respuestas del modelo de lenguaje.
+La clave es el hash de (modelo, mensajes ya renderizados, formato de
+respuesta): reprocesar un archivo o relanzar la redacción tras un cierre
+devuelve el mismo borrador al instante y sin coste.
+"""
+
+import hashlib
+import json
+from core.disk_cache import DiskCache
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class LLMCache:
+    def __init__(self, max_mb: float = 20, max_age_days: float = 7):
+        self._store = DiskCache("llm.sqlite3", max_mb, max_age_days, name="Caché redacción")
+
+    @staticmethod
+    def key(model: str, messages: list[dict], response_format: dict | None = None) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "response_format": response_format},
+            sort_keys=True, ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        raw = self._store.get(key)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            self._store.delete(key)
+            return None
+
+    def put(self, key: str, response: dict):
+        self._store.put(key, json.dumps(response, ensure_ascii=False, separators=(",", ":")))
+
+    def delete(self, key: str):
+        self._store.delete(key)
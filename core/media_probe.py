@@ -0,0 +1,170 @@
+"""
+Sondeo de archivos multimedia con ffprobe.
+Cada archivo se sondea una sola vez por (ruta, tamaño, mtime); el resultado
+guía las decisiones de extracción, troceado y codificación.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from core.audio import ffmpeg_bin
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+_PROBE_TIMEOUT_S = 60
+# Sondeos recordados como máximo (los menos usados recientemente se olvidan)
+_MAX_CACHED = 256
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+_unavailable_logged = False
+
+
+class ProbeError(RuntimeError):
+    pass
+
+
+class ProbeUnavailable(ProbeError):
+    """ffprobe no está instalado o no se puede ejecutar."""
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    path: str
+    size: int
+    duration: float
+    format_name: str
+    audio_codec: str | None
+    sample_rate: int | None
+    channels: int | None
+    audio_bitrate: int | None
+    video_codec: str | None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_codec is not None
+
+    @property
+    def size_mb(self) -> float:
+        return self.size / (1024 * 1024)
+
+
+def ffprobe_bin() -> str:
+    found = shutil.which("ffprobe")
+    if found:
+        return found
+    # Suele venir junto a ffmpeg en la misma carpeta
+    ffmpeg = shutil.which(ffmpeg_bin())
+    if ffmpeg:
+        sibling = os.path.join(os.path.dirname(ffmpeg), "ffprobe" + os.path.splitext(ffmpeg)[1])
+        if os.path.exists(sibling):
+            return sibling
+    return "ffprobe"
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _run_ffprobe(path: str, size: int, timeout: float) -> MediaInfo:
+    try:
+        proc = subprocess.run(
+            [ffprobe_bin(), "-v", "error", "-print_format", "json",
+             "-show_format", "-show_streams", path],
+            capture_output=True,
+            creationflags=_NO_WINDOW,
+            timeout=timeout,
+        )
+    except OSError as e:
+        raise ProbeUnavailable(f"No se pudo ejecutar ffprobe: {e}") from e
+    except subprocess.TimeoutExpired as e:
+        raise ProbeError("ffprobe no respondió a tiempo") from e
+    if proc.returncode != 0:
+        raise ProbeError(proc.stderr.decode(errors="replace").strip() or "ffprobe falló")
+
+    data = json.loads(proc.stdout or b"{}")
+    fmt = data.get("format", {})
+    audio = next((s for s in data.get("streams", []) if s.get("codec_type") == "audio"), None)
+    video = next(
+        (s for s in data.get("streams", [])
+         if s.get("codec_type") == "video"
+         and not s.get("disposition", {}).get("attached_pic")),  # carátulas de MP3
+        None,
+    )
+
+    duration = _to_float(fmt.get("duration"))
+    if duration is None and audio:
+        duration = _to_float(audio.get("duration"))
+    if not duration:
+        raise ProbeError("Duración desconocida (¿archivo incompleto?)")
+
+    return MediaInfo(
+        path=path,
+        size=size,
+        duration=duration,
+        format_name=fmt.get("format_name", ""),
+        audio_codec=audio.get("codec_name") if audio else None,
+        sample_rate=_to_int(audio.get("sample_rate")) if audio else None,
+        channels=_to_int(audio.get("channels")) if audio else None,
+        audio_bitrate=_to_int(audio.get("bit_rate")) if audio else None,
+        video_codec=video.get("codec_name") if video else None,
+    )
+
+
+def probe(path: str, timeout: float = _PROBE_TIMEOUT_S) -> MediaInfo:
+    """Devuelve la información del medio. Lanza ProbeError si no es legible."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _cache_lock:
+        info = _cache.get(key)
+        if info is not None:
+            _cache.move_to_end(key)
+    if info is not None:
+        return info
+
+    info = _run_ffprobe(path, st.st_size, timeout)
+    with _cache_lock:
+        _cache[key] = info
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_CACHED:
+            _cache.popitem(last=False)
+    log.info("Sondeo %s: %.1fs, %s, audio=%s %s Hz %s can., vídeo=%s (%.1f MB)",
+             os.path.basename(path), info.duration, info.format_name, info.audio_codec,
+             info.sample_rate, info.channels, info.video_codec, info.size_mb)
+    return info
+
+
+def try_probe(path: str) -> MediaInfo | None:
+    """Como `probe`, pero devuelve None (y lo registra) si falla."""
+    global _unavailable_logged
+    try:
+        return probe(path)
+    except ProbeUnavailable as e:
+        if not _unavailable_logged:
+            log.warning("%s. Se usarán extensión y tamaño para decidir.", e)
+            _unavailable_logged = True
+        return None
+    except (OSError, ProbeError, ValueError) as e:
+        log.warning("No se pudo sondear '%s': %s", path, e)
+        return None
@@ -0,0 +1,126 @@
+"""
+Registro de modelos Vosk residentes en memoria.
+El modelo se carga una sola vez por proceso y se comparte entre transcripciones.
+"""
+
+import os
+import sys
+import threading
+import time
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+# Directorio raíz del proyecto (donde está app.py)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Directorio hermano con herramientas externas (puede no existir)
+_TOOLS_DIR = os.path.join(os.path.dirname(PROJECT_DIR), "Herramientas_Htv")
+
+_lock = threading.Lock()
+_models = {}
+
+
+def find_vosk_model_path() -> str | None:
+    """Busca el modelo primero dentro del proyecto y luego en la ruta externa."""
+    for candidate in (os.path.join(PROJECT_DIR, "model"), os.path.join(_TOOLS_DIR, "model")):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def rss_mb() -> float | None:
+    """Memoria residente del proceso en MB (None si no se puede medir)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _Counters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = _Counters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize / (1024 * 1024)
+        except Exception:
+            return None
+        return None
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def get_vosk_model(model_path: str | None = None):
+    """
+    Devuelve el modelo Vosk de `model_path` (o el encontrado por defecto),
+    cargándolo la primera vez. Las llamadas concurrentes esperan a la misma carga.
+    """
+    model_path = model_path or find_vosk_model_path()
+    if not model_path:
+        raise Exception("Modelo local de Vosk no encontrado.")
+
+    model = _models.get(model_path)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(model_path)
+        if model is not None:
+            return model
+
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+
+        mem_before = rss_mb()
+        t0 = time.perf_counter()
+        model = Model(model_path)
+        elapsed = time.perf_counter() - t0
+        mem_after = rss_mb()
+
+        if mem_before is not None and mem_after is not None:
+            log.info("Modelo Vosk cargado en %.2fs (+%.0f MB, RSS %.0f MB): %s",
+                     elapsed, mem_after - mem_before, mem_after, model_path)
+        else:
+            log.info("Modelo Vosk cargado en %.2fs: %s", elapsed, model_path)
+        _models[model_path] = model
+        return model
+
+
+def warm_up_vosk() -> threading.Thread | None:
+    """Precarga el modelo Vosk en segundo plano. No hace nada si no está instalado."""
+    model_path = find_vosk_model_path()
+    if not model_path:
+        log.info("Precarga de Vosk omitida: modelo no encontrado.")
+        return None
+    if model_path in _models:
+        return None
+
+    def _run():
+        try:
+            get_vosk_model(model_path)
+        except Exception as exc:
+            log.warning("No se pudo precargar el modelo Vosk: %s", exc)
+
+    t = threading.Thread(target=_run, name="vosk-warmup", daemon=True)
+    t.start()
+    return t
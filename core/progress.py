@@ -0,0 +1,54 @@
+"""
+Progreso y cancelación de transcripciones en curso.
+"""
+
+import threading
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+# Caracteres del texto parcial que se envían a la interfaz
+_PARTIAL_TAIL = 300
+
+
+class TranscriptionCancelled(Exception):
+    """El operador canceló la transcripción en curso."""
+
+
+class TranscriptionProgress:
+    """
+    Canal entre el motor y quien lo lanzó: informa del porcentaje de audio
+    consumido y del texto parcial, y transmite la petición de cancelar.
+    `callback(porcentaje | None, texto_parcial)`; None = progreso indeterminado.
+    """
+
+    def __init__(self, callback=None, cancel_event: threading.Event | None = None,
+                 parent: "TranscriptionProgress | None" = None):
+        self._callback = callback
+        self.cancel_event = cancel_event or threading.Event()
+        self._parent = parent
+
+    def child(self) -> "TranscriptionProgress":
+        """
+        Canal propio para un motor: se cancela por separado (p. ej. el perdedor
+        de una carrera) y también cuando se cancela el padre.
+        """
+        return TranscriptionProgress(self.report, parent=self)
+
+    def report(self, percent: float | None, partial: str = ""):
+        if self._callback is None:
+            return
+        if percent is not None:
+            percent = max(0.0, min(100.0, percent))
+        try:
+            self._callback(percent, partial[-_PARTIAL_TAIL:])
+        except Exception as exc:  # un fallo de la UI no debe abortar la transcripción
+            log.debug("Callback de progreso falló: %s", exc)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set() or (self._parent is not None and self._parent.cancelled)
+
+    def check(self):
+        if self.cancelled:
+            raise TranscriptionCancelled("Transcripción cancelada.")
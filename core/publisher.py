@@ -1,20 +1,30 @@
+import asyncio
 import os
-import time
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from requests.auth import HTTPBasicAuth
 from datetime import datetime
-from urllib.parse import quote
+from urllib.parse import quote, urlsplit
+from core.http_clients import ASYNC_TRANSPORT_ERRORS, get_async_session, get_session
 from core.logger import get_logger
+from core.resilience import (
+    RETRY_STATUS,
+    RetryPolicy,
+    TransientError,
+    parse_retry_after,
+    retry_call,
+    retry_call_async,
+)
 
 load_dotenv()
 
 log = get_logger(__name__)
 
-_RETRY_STATUS = {429, 500, 502, 503, 504}
-_MAX_RETRIES  = 3
-_BASE_DELAY   = 2
+# Las etiquetas son prescindibles: poco margen antes de publicar sin ellas
+_TAG_POLICY = RetryPolicy(attempts=3, base_delay=1, deadline=15)
+_POST_POLICY = RetryPolicy(attempts=3, base_delay=2, deadline=90)
+
 
 class PublisherService:
     def __init__(self):
@@ -22,6 +32,8 @@ class PublisherService:
         self.user = os.getenv("WP_USER")
         self.password = os.getenv("WP_PASSWORD")
         self.auth = HTTPBasicAuth(self.user, str(self.password).replace(" ", "")) if self.password else None
+        self.session = get_session(self.site_url)
+        self._host = urlsplit(self.site_url).hostname or self.site_url
 
         self.meses = {
             "01": "ENERO", "02": "FEBRERO", "03": "MARZO", "04": "ABRIL",
@@ -29,28 +41,34 @@ class PublisherService:
             "09": "SEPTIEMBRE", "10": "OCTUBRE", "11": "NOVIEMBRE", "12": "DICIEMBRE"
         }
 
+    def _request(self, method: str, url: str, policy: RetryPolicy, **kwargs):
+        """Petición con reintentos: los códigos transitorios se reintentan, el resto se devuelve."""
+        def _call():
+            res = self.session.request(method, url, auth=self.auth, **kwargs)
+            if res.status_code in RETRY_STATUS:
+                raise TransientError(f"HTTP {res.status_code}", status_code=res.status_code,
+                                     retry_after=parse_retry_after(res.headers))
+            return res
+
+        return retry_call(_call, name="Publisher", host=self._host, policy=policy,
+                          transient=(requests.RequestException,))
+
     def _fetch_tag_id(self, tag: str):
         """Resuelve el ID de una etiqueta. Devuelve None si no existe."""
-        for attempt in range(1, _MAX_RETRIES + 1):
-            try:
-                res = requests.get(
-                    f"{self.site_url}/tags",
-                    params={"search": tag, "per_page": 1},
-                    auth=self.auth,
-                    timeout=10,
-                )
-                if res.status_code == 200:
-                    data = res.json()
-                    return data[0]["id"] if data else None
-                if res.status_code in _RETRY_STATUS and attempt < _MAX_RETRIES:
-                    time.sleep(_BASE_DELAY * (2 ** (attempt - 1)))
-                    continue
-                log.warning("[Publisher] tag '%s' HTTP %s", tag, res.status_code)
-                return None
-            except Exception as exc:
-                log.warning("[Publisher] tag '%s' error: %s", tag, exc)
-                if attempt < _MAX_RETRIES:
-                    time.sleep(_BASE_DELAY * (2 ** (attempt - 1)))
+        try:
+            res = self._request("GET", f"{self.site_url}/tags", _TAG_POLICY,
+                                params={"search": tag, "per_page": 1}, timeout=10)
+        except Exception as exc:
+            log.warning("[Publisher] tag '%s' error: %s", tag, exc)
+            return None
+        return self._tag_id_from(tag, res)
+
+    @staticmethod
+    def _tag_id_from(tag: str, res):
+        if res.status_code == 200:
+            data = res.json()
+            return data[0]["id"] if data else None
+        log.warning("[Publisher] tag '%s' HTTP %s", tag, res.status_code)
         return None
 
     def _get_tag_ids(self, tags_list):
@@ -80,17 +98,12 @@ class PublisherService:
         video_url = f"https://videos.huelvatv.com/{year}/NOTICIAS/{month_str}/{date_str}/{video_filename}"
         return f'<figure class="wp-block-video"><video src="{video_url}" autoplay="autoplay" muted="" controls="controls" width="100%" height="auto"></video></figure>'
 
-    def publish(self, news_data):
-        if not self.auth:
-            raise Exception("Credenciales de WordPress no configuradas.")
-
+    def _post_data(self, news_data: dict, tags_ids: list) -> dict:
         titulo = news_data.get("titulo", "")
         entradilla = news_data.get("entradilla", "")
         contenido_crudo = news_data.get("contenido", "")
-        etiquetas = news_data.get("etiquetas", [])
         archivo_original = news_data.get("archivo_original", "")
 
-        tags_ids = self._get_tag_ids(etiquetas)
         bloque_video = self._generate_video_embed(archivo_original)
         separador_html = '<hr class="wp-block-separator has-alpha-channel-opacity"/>'
         
@@ -103,34 +116,73 @@ class PublisherService:
             "status": "pending", 
             "tags": tags_ids
         }
+        return post_data
+
+    @staticmethod
+    def _created_link(response):
+        if response.status_code == 201:
+            link = response.json().get("link")
+            log.info("[Publisher] Post creado: %s", link)
+            return link
+        raise Exception(f"HTTP {response.status_code}: {response.text}")
+
+    def publish(self, news_data):
+        if not self.auth:
+            raise Exception("Credenciales de WordPress no configuradas.")
+
+        tags_ids = self._get_tag_ids(news_data.get("etiquetas", []))
+        post_data = self._post_data(news_data, tags_ids)
+
+        log.info("[Publisher] Publicando post")
+        response = self._request("POST", f"{self.site_url}/posts", _POST_POLICY,
+                                 json=post_data, allow_redirects=False, timeout=30)
+        return self._created_link(response)
+
+
+class AsyncPublisherService(PublisherService):
+    """Publicación sobre httpx.AsyncClient, para el bucle de core.async_runtime."""
+
+    def __init__(self):
+        super().__init__()
+        self.aclient = get_async_session(self.site_url)
+        self._async_auth = (self.user or "", str(self.password).replace(" ", "")) if self.password else None
+
+    async def _request_async(self, method: str, url: str, policy: RetryPolicy, **kwargs):
+        async def _call():
+            res = await self.aclient.request(method, url, auth=self._async_auth, **kwargs)
+            if res.status_code in RETRY_STATUS:
+                raise TransientError(f"HTTP {res.status_code}", status_code=res.status_code,
+                                     retry_after=parse_retry_after(res.headers))
+            return res
+
+        return await retry_call_async(_call, name="Publisher", host=self._host, policy=policy,
+                                      transient=ASYNC_TRANSPORT_ERRORS)
+
+    async def _fetch_tag_id_async(self, tag: str):
+        try:
+            res = await self._request_async("GET", f"{self.site_url}/tags", _TAG_POLICY,
+                                            params={"search": tag, "per_page": 1}, timeout=10)
+        except Exception as exc:
+            log.warning("[Publisher] tag '%s' error: %s", tag, exc)
+            return None
+        return self._tag_id_from(tag, res)
+
+    async def _get_tag_ids_async(self, tags_list):
+        if not tags_list or not self._async_auth:
+            return []
+        results = await asyncio.gather(*(self._fetch_tag_id_async(tag) for tag in tags_list))
+        ids = [tag_id for tag_id in results if tag_id is not None]
+        log.info("[Publisher] %d/%d etiquetas resueltas", len(ids), len(tags_list))
+        return ids
+
+    async def publish(self, news_data):
+        if not self._async_auth:
+            raise Exception("Credenciales de WordPress no configuradas.")
+
+        tags_ids = await self._get_tag_ids_async(news_data.get("etiquetas", []))
+        post_data = self._post_data(news_data, tags_ids)
 
-        last_exc = None
-        for attempt in range(1, _MAX_RETRIES + 1):
-            try:
-                log.info("[Publisher] Publicando post - intento %d/%d", attempt, _MAX_RETRIES)
-                response = requests.post(
-                    f"{self.site_url}/posts",
-                    auth=self.auth,
-                    json=post_data,
-                    allow_redirects=False,
-                    timeout=30,
-                )
-                if response.status_code == 201:
-                    link = response.json().get("link")
-                    log.info("[Publisher] Post creado: %s", link)
-                    return link
-                if response.status_code in _RETRY_STATUS and attempt < _MAX_RETRIES:
-                    delay = _BASE_DELAY * (2 ** (attempt - 1))
-                    log.warning("[Publisher] HTTP %s, reintentando en %ss...", response.status_code, delay)
-                    time.sleep(delay)
-                    continue
-                raise Exception(f"HTTP {response.status_code}: {response.text}")
-            except requests.RequestException as exc:
-                last_exc = exc
-                if attempt < _MAX_RETRIES:
-                    delay = _BASE_DELAY * (2 ** (attempt - 1))
-                    log.warning("[Publisher] Error de red, reintentando en %ss...", delay)
-                    time.sleep(delay)
-                else:
-                    raise
-        raise last_exc
+        log.info("[Publisher] Publicando post")
+        response = await self._request_async("POST", f"{self.site_url}/posts", _POST_POLICY,
+                                             json=post_data, timeout=30)
+        return self._created_link(response)
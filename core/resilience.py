@@ -0,0 +1,224 @@
+"""
+Reintentos y cortacircuitos comunes a todos los servicios remotos.
+Espera exponencial con jitter, respeto de `Retry-After`, plazo total por
+llamada y un cortacircuitos por host: durante una caída, los trabajos en
+cola fallan al instante en lugar de encadenar esperas.
+"""
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Fallos transitorios seguidos que abren el circuito y tiempo hasta la prueba
+_FAILURE_THRESHOLD = 4
+_RESET_TIMEOUT_S = 30.0
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 1.0    # segundos; se dobla en cada intento (con jitter)
+    max_delay: float = 30.0
+    deadline: float = 120.0    # no se empieza un intento que no quepa en el plazo
+
+
+class TransientError(Exception):
+    """Fallo transitorio señalado por el llamador (p. ej. una respuesta HTTP 503)."""
+
+    def __init__(self, message: str, status_code: int | None = None,
+                 retry_after: float | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Servicio {host} no disponible (circuito abierto, "
+                         f"nuevo intento en {retry_in:.0f}s).")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Cerrado → abierto tras varios fallos → semiabierto (una prueba) → cerrado."""
+
+    CLOSED, OPEN, HALF_OPEN = "cerrado", "abierto", "semiabierto"
+
+    def __init__(self, host: str, failure_threshold: int = _FAILURE_THRESHOLD,
+                 reset_timeout: float = _RESET_TIMEOUT_S):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            waited = time.monotonic() - self._opened_at
+            if self.state == self.OPEN and waited >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+                log.warning("[Circuito %s] semiabierto: se permite una llamada de prueba", self.host)
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(self.host, max(0.0, self.reset_timeout - waited))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info("[Circuito %s] cerrado: el servicio responde de nuevo", self.host)
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release_probe(self):
+        """La prueba terminó sin respuesta (cancelada o interrumpida): otra llamada puede probar."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or (
+                    self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                log.error("[Circuito %s] abierto tras %d fallos seguidos; se rechazan llamadas "
+                          "durante %.0fs", self.host, self._failures, self.reset_timeout)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def parse_retry_after(headers) -> float | None:
+    """Segundos indicados por `retry-after-ms` o `Retry-After` (segundos o fecha HTTP)."""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _classify(exc: Exception, transient: tuple) -> tuple[bool, float | None]:
+    """(¿reintentable?, Retry-After) de una excepción."""
+    if isinstance(exc, TransientError):
+        return True, exc.retry_after
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        response = getattr(exc, "response", None)
+        return status in RETRY_STATUS, parse_retry_after(getattr(response, "headers", None))
+    return isinstance(exc, transient), None
+
+
+def _retry_delay(exc: Exception, attempt: int, start: float, policy: RetryPolicy,
+                 breaker: CircuitBreaker, transient: tuple, name: str) -> float | None:
+    """Espera antes del siguiente intento, o None si hay que propagar `exc`."""
+    retryable, retry_after = _classify(exc, transient)
+    if not retryable:
+        breaker.record_success()  # el servicio respondió: el error es de la petición
+        return None
+    breaker.record_failure()
+    if attempt == policy.attempts or breaker.state == CircuitBreaker.OPEN:
+        return None
+    if retry_after is not None:
+        delay = retry_after
+    else:
+        delay = random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** attempt))
+    remaining = policy.deadline - (time.monotonic() - start)
+    if delay >= remaining:
+        log.warning("[%s] %s; la espera (%.1fs) no cabe en el plazo, se abandona",
+                    name, exc, delay)
+        return None
+    log.warning("[%s] %s; reintentando en %.1fs%s", name, exc, delay,
+                " (Retry-After)" if retry_after is not None else "")
+    return delay
+
+
+def retry_call(func, *, name: str, host: str, policy: RetryPolicy = RetryPolicy(),
+               transient: tuple = ()):
+    """
+    Ejecuta `func()` con reintentos. Son reintentables `TransientError`, las
+    excepciones con `status_code` en RETRY_STATUS y las de tipo `transient`
+    (errores de conexión). Cualquier otra se propaga sin reintentar.
+    """
+    breaker = get_breaker(host)
+    start = time.monotonic()
+    for attempt in range(1, policy.attempts + 1):
+        breaker.before_call()
+        try:
+            log.info("[%s] Intento %d/%d (%s)", name, attempt, policy.attempts, host)
+            result = func()
+        except Exception as exc:
+            delay = _retry_delay(exc, attempt, start, policy, breaker, transient, name)
+            if delay is None:
+                raise
+            time.sleep(delay)
+        except BaseException:
+            breaker.release_probe()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+
+async def retry_call_async(func, *, name: str, host: str, policy: RetryPolicy = RetryPolicy(),
+                           transient: tuple = ()):
+    """Como `retry_call`, con `func` asíncrona; las esperas no bloquean ningún hilo."""
+    breaker = get_breaker(host)
+    start = time.monotonic()
+    for attempt in range(1, policy.attempts + 1):
+        breaker.before_call()
+        try:
+            log.info("[%s] Intento %d/%d (%s)", name, attempt, policy.attempts, host)
+            result = await func()
+        except Exception as exc:
+            delay = _retry_delay(exc, attempt, start, policy, breaker, transient, name)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+        except BaseException:
+            breaker.release_probe()  # p. ej. CancelledError: no dejar el circuito bloqueado
+            raise
+        else:
+            breaker.record_success()
+            return result
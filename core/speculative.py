@@ -0,0 +1,77 @@
+"""
+Verificación anticipada del borrador.
+La verificación (modelo con búsqueda web, lento) se lanza en segundo plano en
+cuanto el borrador está listo y se guarda junto a la huella de sus campos. Si
+el editor pulsa «Verificar» sin haber tocado nada, el resultado ya está (o
+está en camino); si ha editado el borrador, el resultado obsoleto se descarta.
+"""
+
+import hashlib
+import json
+import time
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+_FIELDS = ("titulo", "entradilla", "contenido", "etiquetas")
+
+
+def draft_fingerprint(news_data: dict) -> str:
+    """Hash de los campos que se verifican (no del nombre de archivo ni del estado)."""
+    payload = json.dumps({key: news_data.get(key) for key in _FIELDS},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SpeculativeVerifier:
+    """
+    `submit(news_data)` lanza la verificación y devuelve un
+    concurrent.futures.Future. Se guarda solo la de la última versión.
+    """
+
+    def __init__(self, submit):
+        self._submit = submit
+        self._fingerprint = None
+        self._future = None
+        self._started = 0.0
+
+    def _usable(self, fingerprint: str) -> bool:
+        fut = self._future
+        if fut is None or fingerprint != self._fingerprint:
+            return False
+        # Un fallo o una cancelación no se reutilizan: se vuelve a intentar
+        return not fut.done() or (not fut.cancelled() and fut.exception() is None)
+
+    def start(self, news_data: dict):
+        """Lanza la verificación anticipada de este borrador (si no está ya lanzada)."""
+        fingerprint = draft_fingerprint(news_data)
+        if self._usable(fingerprint):
+            return self._future
+        self.discard()
+        self._fingerprint = fingerprint
+        self._future = self._submit(news_data)
+        self._started = time.monotonic()
+        log.info("Verificación anticipada lanzada (borrador %s)", fingerprint[:8])
+        return self._future
+
+    def result_for(self, news_data: dict):
+        """Future con la verificación de `news_data`: la anticipada si sigue vigente."""
+        fingerprint = draft_fingerprint(news_data)
+        if self._usable(fingerprint):
+            elapsed = time.monotonic() - self._started
+            if self._future.done():
+                log.info("Verificación anticipada reutilizada al instante (lanzada hace %.1fs)",
+                         elapsed)
+            else:
+                log.info("Verificación anticipada en curso desde hace %.1fs: se espera a ella",
+                         elapsed)
+            return self._future
+        if self._future is not None:
+            log.info("Borrador editado desde la verificación anticipada: se descarta")
+        return self.start(news_data)
+
+    def discard(self):
+        if self._future is not None and not self._future.done():
+            self._future.cancel()
+        self._fingerprint = None
+        self._future = None
@@ -0,0 +1,112 @@
+"""
+Transcripción estructurada: texto más palabras con tiempos y confianza.
+Las palabras se guardan en arrays paralelos (no en listas de dicts) y el
+texto de cada palabra como índice a un vocabulario compartido, de modo que
+una hora de audio ocupa unos cientos de KB y se une o desplaza sin copiar
+diccionarios.
+"""
+
+from array import array
+
+# Confianza por defecto cuando el motor no la proporciona
+_DEFAULT_CONF = 1.0
+
+
+class Transcript:
+    __slots__ = ("text", "vocab", "tokens", "starts", "ends", "confs", "_index")
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.vocab: list[str] = []
+        self.tokens = array("I")
+        self.starts = array("f")
+        self.ends = array("f")
+        self.confs = array("f")
+        self._index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def _token(self, word: str) -> int:
+        idx = self._index.get(word)
+        if idx is None:
+            idx = self._index[word] = len(self.vocab)
+            self.vocab.append(word)
+        return idx
+
+    def add_word(self, word: str, start: float, end: float, conf: float = _DEFAULT_CONF):
+        self.tokens.append(self._token(word))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.confs.append(conf)
+
+    def word(self, i: int) -> str:
+        return self.vocab[self.tokens[i]]
+
+    def words(self):
+        """Itera (palabra, inicio, fin, confianza)."""
+        for i in range(len(self.tokens)):
+            yield self.vocab[self.tokens[i]], self.starts[i], self.ends[i], self.confs[i]
+
+    def extend(self, other: "Transcript", start_at: float | None = None,
+               stop_at: float | None = None):
+        """
+        Añade las palabras de `other` (re-indexando su vocabulario), opcionalmente
+        solo las que empiezan en [start_at, stop_at). No toca `text`.
+        """
+        remap = [self._token(w) for w in other.vocab]
+        for i in range(len(other.tokens)):
+            s = other.starts[i]
+            if (start_at is not None and s < start_at) or (stop_at is not None and s >= stop_at):
+                continue
+            self.tokens.append(remap[other.tokens[i]])
+            self.starts.append(s)
+            self.ends.append(other.ends[i])
+            self.confs.append(other.confs[i])
+
+    def map_times(self, fn) -> "Transcript":
+        """Copia con los tiempos transformados por `fn` (p. ej. desplazamiento o OffsetMap)."""
+        out = Transcript(self.text)
+        out.vocab = list(self.vocab)
+        out._index = dict(self._index)
+        out.tokens = array("I", self.tokens)
+        out.starts = array("f", (fn(t) for t in self.starts))
+        out.ends = array("f", (fn(t) for t in self.ends))
+        out.confs = array("f", self.confs)
+        return out
+
+    def low_confidence(self, threshold: float = 0.6) -> list[int]:
+        """Índices de las palabras con confianza inferior a `threshold`."""
+        return [i for i, c in enumerate(self.confs) if c < threshold]
+
+    @classmethod
+    def concat(cls, parts: list["Transcript"], sep: str = " ") -> "Transcript":
+        """Une transcripciones consecutivas sin solape (tiempos ya absolutos)."""
+        out = cls(sep.join(p.text for p in parts if p.text).strip())
+        for part in parts:
+            out.extend(part)
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "text": self.text,
+            "vocab": self.vocab,
+            "tokens": self.tokens.tolist(),
+            # Centésimas de segundo bastan y acortan el JSON
+            "starts": [round(t, 2) for t in self.starts],
+            "ends": [round(t, 2) for t in self.ends],
+            "confs": [round(c, 3) for c in self.confs],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Transcript":
+        out = cls(data.get("text", ""))
+        out.vocab = list(data.get("vocab", []))
+        out._index = {w: i for i, w in enumerate(out.vocab)}
+        out.tokens = array("I", data.get("tokens", []))
+        out.starts = array("f", data.get("starts", []))
+        out.ends = array("f", data.get("ends", []))
+        out.confs = array("f", data.get("confs", []))
+        if not (len(out.tokens) == len(out.starts) == len(out.ends) == len(out.confs)):
+            raise ValueError("Transcripción con arrays de distinta longitud")
+        return out
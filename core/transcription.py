@@ -1,151 +1,632 @@
+import asyncio
 import os
-import wave
 import json
-import shutil
+import math
 import subprocess
 import tempfile
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
-from openai import OpenAI
+from vosk import KaldiRecognizer
+from core.audio import (
+    BYTES_PER_SECOND,
+    SAMPLE_RATE,
+    OffsetMap,
+    iter_pcm,
+    iter_pcm_spans,
+    run_ffmpeg,
+    scan_energy,
+    speech_spans,
+)
+from core.audio_cache import get_audio_cache
+from core.encoding_profiles import EncodingProfile, select_profile
+from core.http_clients import get_openai_client
 from core.logger import get_logger
+from core.media_probe import MediaInfo, try_probe
+from core.model_registry import find_vosk_model_path, get_vosk_model
+from core.progress import TranscriptionCancelled, TranscriptionProgress
+from core.transcript import Transcript
+from core.transcription_cache import TranscriptionCache
+from core.upload_audio import DEFAULT_TEMP_MBPS, UploadAudio, record_memory_upload
+from core.vosk_parallel import collect_result, default_workers, transcribe_parallel
+from core.whisper_chunks import merge_transcripts, plan_windows
 
 # Extensiones de vídeo que requieren extracción de audio antes de enviar a Whisper
 _VIDEO_EXTENSIONS = {".mp4", ".mpeg", ".mpg", ".webm", ".mov", ".avi"}
+# Contenedores de solo audio que la API de Whisper acepta tal cual
+_WHISPER_AUDIO_EXTENSIONS = {".mp3", ".mpga", ".m4a", ".wav", ".ogg", ".oga", ".flac", ".webm"}
 # Umbral de tamaño (en MB) por debajo del cual se envía el audio directamente
 _WHISPER_MAX_MB = 24
+# Códecs que se pueden copiar sin recodificar a un contenedor que Whisper acepta
+_COPY_CONTAINERS = {"aac": ".m4a", "mp3": ".mp3", "opus": ".ogg", "vorbis": ".ogg", "flac": ".flac"}
+# Formato de ffmpeg para copiar a una tubería (M4A necesita salida con seek: va a disco)
+_COPY_MUXERS = {".mp3": "mp3", ".ogg": "ogg", ".flac": "flac"}
+# Tope del audio preparado en memoria; por encima se desborda a disco
+_WHISPER_MEMORY_MB = 32
+# Troceado de grabaciones largas: longitud de tramo, solape y subidas simultáneas
+_WHISPER_CHUNK_S = 600
+_WHISPER_OVERLAP_S = 2.0
+_WHISPER_CONCURRENCY = 4
+_FRAME_MS = 30
+# Cada cuántos bloques de PCM (0,25 s) se consulta el resultado parcial de Vosk
+_VOSK_PARTIAL_EVERY = 8
+# Por debajo de esta duración Vosk no reparte entre procesos
+_VOSK_MIN_PARALLEL_S = 60
+# Recorte de silencios: solo se aplica si elimina al menos esto
+_TRIM_MIN_REMOVED_S = 5.0
+_TRIM_MIN_REMOVED_RATIO = 0.05
+# Modo cobertura: si Whisper no ha respondido en este plazo se lanza Vosk en paralelo
+_HEDGE_DEADLINE_S = 120
 
 load_dotenv()
 
 log = get_logger(__name__)
 
-# Directorio raíz del proyecto (donde está app.py)
-PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-# Directorio hermano con herramientas externas (puede no existir)
-_TOOLS_DIR = os.path.join(os.path.dirname(PROJECT_DIR), "Herramientas_Htv")
 
-def _ensure_ffmpeg_in_path():
-    """Garantiza que ffmpeg esté en PATH antes de inicializar pydub."""
-    if shutil.which("ffmpeg"):
-        return
-    _candidate = os.path.join(_TOOLS_DIR, "ffmpeg-master-latest-win64-gpl", "bin")
-    if os.path.isdir(_candidate):
-        # Prepend para que pydub encuentre esta ruta al importar.
-        os.environ["PATH"] = _candidate + os.pathsep + os.environ.get("PATH", "")
-        log.info("ffmpeg añadido desde ruta externa: %s", _candidate)
-    else:
-        log.warning("ffmpeg no encontrado en el PATH ni en la ruta externa. "
-                    "Las transcripciones de audio pueden fallar.")
+class TranscriptionService:
+    def __init__(self, settings: dict | None = None):
+        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.client = get_openai_client(self.api_key) if self.api_key else None
+        self.settings = settings or {}
+        self._cache = None
 
+    def _vosk_workers(self) -> int:
+        """Procesos para Vosk: 1 = secuencial, 0 = automático (núcleos - 1)."""
+        try:
+            workers = int(self.settings.get("vosk_procesos", 1))
+        except (TypeError, ValueError):
+            workers = 1
+        return default_workers() if workers <= 0 else workers
 
-_ensure_ffmpeg_in_path()
+    def _int_setting(self, key: str, default: int) -> int:
+        try:
+            value = int(self.settings.get(key, default))
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
 
-from pydub import AudioSegment
-from vosk import Model, KaldiRecognizer, SetLogLevel
+    def _profile(self, duration_s: float | None) -> EncodingProfile:
+        """Perfil de subida según duración y la preferencia `perfil_whisper`."""
+        return select_profile(duration_s, self.settings.get("perfil_whisper", "auto"), _WHISPER_MAX_MB)
 
-class TranscriptionService:
-    def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=self.api_key) if self.api_key else None
+    def _fits_one_upload(self, duration_s: float) -> bool:
+        """¿Cabe `duration_s` en una sola subida, aun con el bitrate mínimo del perfil?"""
+        return self._profile(duration_s).estimated_mb(duration_s) <= _WHISPER_MAX_MB
+
+    def _new_upload(self, extension: str) -> UploadAudio:
+        """Destino de ffmpeg: búfer en memoria o, si está desactivado, temporal en disco."""
+        if self.settings.get("whisper_en_memoria", True):
+            return UploadAudio.memory(extension, self._int_setting("whisper_memoria_mb", _WHISPER_MEMORY_MB))
+        tmp = tempfile.NamedTemporaryFile(suffix=extension, delete=False)
+        tmp.close()
+        return UploadAudio.from_file(tmp.name, temporary=True)
+
+    def _temp_mbps(self) -> int:
+        """Velocidad supuesta del directorio temporal, para estimar la E/S evitada."""
+        return self._int_setting("disco_temporal_mbps", DEFAULT_TEMP_MBPS)
+
+    @staticmethod
+    def _run_to_upload(args: list[str], muxer: str, target: UploadAudio, stdin_chunks=None):
+        """Lanza ffmpeg con la salida en `target` (tubería o ruta)."""
+        if target.buffer is not None:
+            run_ffmpeg(args + ["-f", muxer, "pipe:1"], stdin_chunks, stdout=target.buffer)
+        else:
+            run_ffmpeg(args + ["-y", target.path], stdin_chunks)
 
-    def _prepare_for_whisper(self, input_file: str) -> tuple[str, bool]:
+    def _encode_audio(self, input_file: str, profile: EncodingProfile,
+                      start: float | None = None, duration: float | None = None,
+                      spans: list | None = None) -> UploadAudio:
         """
-        Devuelve (ruta_a_enviar, es_temporal).
-        Si el archivo es vídeo o pesa más de _WHISPER_MAX_MB MB,
-        extrae el audio a un MP3 comprimido con ffmpeg.
+        Codifica a 16 kHz mono con `profile`. Con `spans` (segundos relativos
+        a `start`) solo se codifica el audio con voz, que llega a ffmpeg por stdin.
+        """
+        stdin_chunks = None
+        if spans is not None:
+            args = ["-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "-i", "pipe:0"]
+            stdin_chunks = iter_pcm_spans(input_file, spans, 64000, start=start, duration=duration)
+        else:
+            args = []
+            if start:
+                args += ["-ss", f"{start:.3f}"]
+            args += ["-i", input_file]
+            if duration is not None:
+                args += ["-t", f"{duration:.3f}"]
+        args += [
+            "-vn",           # eliminar pista de vídeo
+            "-ar", "16000",  # 16 kHz es suficiente para voz
+            "-ac", "1",      # mono
+            *profile.ffmpeg_args(),
+        ]
+        target = self._new_upload(profile.extension)
+        t0 = time.perf_counter()
+        try:
+            self._run_to_upload(args, profile.muxer, target, stdin_chunks)
+        except subprocess.CalledProcessError as e:
+            target.close()
+            raise RuntimeError(
+                f"No se pudo extraer el audio de '{input_file}': {e.stderr.decode(errors='replace')}"
+            ) from e
+        if target.buffer is not None:
+            record_memory_upload(target, time.perf_counter() - t0, self._temp_mbps())
+        return target
+
+    def _trim_plan(self, energies) -> OffsetMap | None:
+        """
+        Etapa de recorte de silencios (VAD por energía). Devuelve el mapa de
+        tramos conservados, o None si el recorte no compensa o está desactivado.
+        """
+        if not self.settings.get("recorte_silencios", True):
+            return None
+        total_s = len(energies) * _FRAME_MS / 1000
+        try:
+            min_silence = float(self.settings.get("recorte_silencio_min_s", 1.5))
+        except (TypeError, ValueError):
+            min_silence = 1.5
+        spans = speech_spans(energies, _FRAME_MS, min_silence_s=min_silence)
+        if not spans:
+            # Grabación muda o muy baja: se transcribe entera antes que subir un audio vacío
+            log.info("Recorte de silencios omitido: no se detectó voz en %.1fs", total_s)
+            return None
+        offset_map = OffsetMap(spans)
+        removed = total_s - offset_map.kept_seconds
+        if removed < max(_TRIM_MIN_REMOVED_S, total_s * _TRIM_MIN_REMOVED_RATIO):
+            return None
+        log.info("Recorte de silencios: %.1fs de %.1fs eliminados (%.0f%%, %d tramos con voz)",
+                 removed, total_s, 100 * removed / total_s, len(offset_map.spans))
+        return offset_map
+
+    @staticmethod
+    def _needs_extraction(input_file: str, info: MediaInfo | None) -> bool:
+        """Con sondeo se decide por pistas reales; sin él, por extensión y tamaño."""
+        ext = os.path.splitext(input_file)[1].lower()
+        size_mb = info.size_mb if info else os.path.getsize(input_file) / (1024 * 1024)
+        if size_mb > _WHISPER_MAX_MB:
+            return True
+        if info is not None:
+            return info.has_video or ext not in _WHISPER_AUDIO_EXTENSIONS
+        return ext in _VIDEO_EXTENSIONS
+
+    def _decode_source(self, input_file: str) -> str:
+        """
+        Archivo del que se decodifica: el WAV canónico de la caché de audio
+        (se crea la primera vez) o el original si la caché está desactivada.
+        """
+        if not self.settings.get("cache_audio", True):
+            return input_file
+        try:
+            return get_audio_cache(self.settings.get("cache_audio_mb")).ensure(input_file)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            log.warning("Audio canónico no disponible, se decodifica el original: %s", exc)
+            return input_file
+
+    @contextmanager
+    def _pinned_audio(self, input_file: str):
+        """Mantiene el WAV canónico de `input_file` fuera de la expulsión mientras se transcribe."""
+        if not self.settings.get("cache_audio", True):
+            yield
+            return
+        with get_audio_cache(self.settings.get("cache_audio_mb")).pinned(input_file):
+            yield
+
+    def _prepare_for_whisper(self, input_file: str, info: MediaInfo | None = None) -> UploadAudio:
+        """
+        Devuelve el audio a enviar.
+        Si el archivo tiene vídeo, un formato no admitido o pesa más de
+        _WHISPER_MAX_MB MB, extrae el audio comprimido con ffmpeg.
         """
         ext = os.path.splitext(input_file)[1].lower()
         size_mb = os.path.getsize(input_file) / (1024 * 1024)
 
-        if ext not in _VIDEO_EXTENSIONS and size_mb <= _WHISPER_MAX_MB:
-            return input_file, False  # Se envía directamente
+        if not self._needs_extraction(input_file, info):
+            return UploadAudio.from_file(input_file)  # Se envía directamente
 
         log.info("Extrayendo audio para Whisper (%.1f MB, ext=%s): %s", size_mb, ext, input_file)
-        tmp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-        tmp.close()
-        ffmpeg_bin = shutil.which("ffmpeg") or "ffmpeg"
+        copied = self._extract_copy(input_file, info)
+        if copied:
+            return copied
+
+        t0 = time.perf_counter()
+        profile = self._profile(info.duration if info else None)
+        prepared = self._encode_audio(self._decode_source(input_file), profile)
+        log.info("Audio extraído (recodificado a %s %d kbps) en %.2fs: %s (%.1f MB)",
+                 profile.codec, profile.bitrate_kbps, time.perf_counter() - t0,
+                 "memoria" if prepared.in_memory else prepared.path or "temporal", prepared.size_mb)
+        return prepared
+
+    def _extract_copy(self, input_file: str, info: MediaInfo | None) -> UploadAudio | None:
+        """
+        Vía rápida: copia la pista de audio sin recodificar (-c:a copy) si su
+        códec cabe en un contenedor admitido y el resultado no supera el límite.
+        Devuelve el audio copiado, o None si hay que recodificar.
+        """
+        if info is None or info.audio_codec not in _COPY_CONTAINERS:
+            return None
+        if info.audio_bitrate:
+            estimated_mb = info.audio_bitrate * info.duration / 8 / (1024 * 1024)
+            if estimated_mb > _WHISPER_MAX_MB:
+                log.info("Copia de audio descartada: ~%.1f MB estimados (%s %d kbps)",
+                         estimated_mb, info.audio_codec, info.audio_bitrate // 1000)
+                return None
+
+        t0 = time.perf_counter()
+        extension = _COPY_CONTAINERS[info.audio_codec]
+        if extension in _COPY_MUXERS:
+            target = self._new_upload(extension)
+        else:
+            tmp = tempfile.NamedTemporaryFile(suffix=extension, delete=False)
+            tmp.close()
+            target = UploadAudio.from_file(tmp.name, temporary=True)
         try:
-            subprocess.run(
-                [
-                    ffmpeg_bin,
-                    "-i", input_file,
-                    "-vn",           # eliminar pista de vídeo
-                    "-ar", "16000",  # 16 kHz es suficiente para voz
-                    "-ac", "1",      # mono
-                    "-b:a", "64k",   # 64 kbps → ~28 MB/hora, muy por debajo del límite
-                    "-y",
-                    tmp.name,
-                ],
-                check=True,
-                capture_output=True,
-            )
+            self._run_to_upload(["-i", input_file, "-vn", "-map", "0:a:0", "-c:a", "copy"],
+                                _COPY_MUXERS.get(extension, ""), target)
         except subprocess.CalledProcessError as e:
-            os.unlink(tmp.name)
-            raise RuntimeError(
-                f"No se pudo extraer el audio de '{input_file}': {e.stderr.decode(errors='replace')}"
-            ) from e
+            target.close()
+            log.warning("Copia de audio fallida, se recodificará: %s",
+                        e.stderr.decode(errors="replace").strip()[-300:])
+            return None
 
-        out_mb = os.path.getsize(tmp.name) / (1024 * 1024)
-        log.info("Audio extraído: %s (%.1f MB)", tmp.name, out_mb)
-        return tmp.name, True
+        out_mb = target.size_mb
+        if out_mb > _WHISPER_MAX_MB:
+            target.close()
+            log.info("Copia de audio excede el límite (%.1f MB), se recodificará", out_mb)
+            return None
+        elapsed = time.perf_counter() - t0
+        if target.buffer is not None:
+            record_memory_upload(target, elapsed, self._temp_mbps())
+        log.info("Audio extraído (copia %s, sin recodificar) en %.2fs: %s (%.1f MB)",
+                 info.audio_codec, elapsed,
+                 "memoria" if target.in_memory else target.path or "temporal", out_mb)
+        return target
 
-    def transcribe_with_whisper(self, input_file):
-        prepared, is_temp = self._prepare_for_whisper(input_file)
+    def _upload_to_whisper(self, audio: UploadAudio) -> Transcript:
+        """Tiempos relativos al audio subido; confianza = exp(avg_logprob) del segmento."""
+        source = audio.open()
         try:
-            with open(prepared, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="es",
-                )
-            return transcript.text
+            response = self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=source,
+                language="es",
+                response_format="verbose_json",
+                timestamp_granularities=["word", "segment"],
+            )
         finally:
-            if is_temp and os.path.exists(prepared):
-                os.unlink(prepared)
-
-    def transcribe_with_vosk(self, input_file):
-        SetLogLevel(-1)
-        audio = AudioSegment.from_file(input_file)
-        audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-        temp_wav = "temp_vosk_audio.wav"
-        audio.export(temp_wav, format="wav")
-        
-        # Modelo Vosk: buscar primero dentro del proyecto, luego en ruta externa
-        _local_model = os.path.join(PROJECT_DIR, "model")
-        _extern_model = os.path.join(_TOOLS_DIR, "model")
-        model_path = _local_model if os.path.exists(_local_model) else _extern_model
-        
-        if not os.path.exists(model_path):
-            if os.path.exists(temp_wav): os.remove(temp_wav)
-            raise Exception("Modelo local de Vosk no encontrado.")
-
-        model = Model(model_path)
-        wf = wave.open(temp_wav, "rb")
-        rec = KaldiRecognizer(model, wf.getframerate())
+            if audio.buffer is None:
+                source.close()
+        transcript = Transcript(response.text)
+        segments = [(seg.end, min(1.0, math.exp(seg.avg_logprob)))
+                    for seg in (getattr(response, "segments", None) or [])]
+        seg_i = 0
+        for w in getattr(response, "words", None) or []:
+            while seg_i < len(segments) - 1 and w.start >= segments[seg_i][0]:
+                seg_i += 1
+            conf = segments[seg_i][1] if segments else 1.0
+            transcript.add_word(w.word, w.start, w.end, conf)
+        return transcript
+
+    def _whisper_window(self, input_file: str, index: int, start: float, duration: float,
+                        offset_map: OffsetMap | None, progress: TranscriptionProgress) -> Transcript:
+        progress.check()
+        spans = None
+        kept = duration
+        clipped = None
+        if offset_map is not None:
+            clipped = offset_map.clip(start, start + duration)
+            spans, kept = clipped.spans, clipped.kept_seconds
+            if not spans:
+                return Transcript()  # ventana sin voz: no se sube
+        profile = self._profile(kept)
+        with self._encode_audio(input_file, profile, start, duration, spans) as prepared:
+            progress.check()
+            t0 = time.perf_counter()
+            part = self._upload_to_whisper(prepared)
+            log.info("Tramo Whisper %d (%.0f-%.0fs) transcrito en %.1fs",
+                     index + 1, start, start + duration, time.perf_counter() - t0)
+            # Tiempos de la ventana (recortada) → tiempos del archivo original
+            if clipped is not None:
+                return part.map_times(lambda t: clipped.to_original(t) + start)
+            return part.map_times(lambda t: t + start)
+
+    def _transcribe_whisper_chunked(self, input_file: str, windows: list[tuple[float, float]],
+                                    offset_map: OffsetMap | None,
+                                    progress: TranscriptionProgress) -> Transcript:
+        """Sube los tramos en paralelo (con límite) y une los resultados en orden."""
+        concurrency = min(len(windows), self._int_setting("whisper_concurrencia", _WHISPER_CONCURRENCY))
+        log.info("Whisper troceado: %d tramos, %d subidas simultáneas", len(windows), concurrency)
+        t0 = time.perf_counter()
+        parts = [None] * len(windows)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            pending = {
+                pool.submit(self._whisper_window, input_file, i, start, dur, offset_map, progress): i
+                for i, (start, dur) in enumerate(windows)
+            }
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        parts[pending.pop(fut)] = fut.result()
+                    # Texto parcial: solo el prefijo de tramos ya completos y en orden
+                    ready = []
+                    for part in parts:
+                        if part is None:
+                            break
+                        ready.append(part)
+                    finished = sum(p is not None for p in parts)
+                    progress.report(100 * finished / len(windows),
+                                    merge_transcripts(ready, windows[:len(ready)]).text)
+            except BaseException:
+                # Los tramos aún en cola no llegan a codificarse ni a subirse
+                for fut in pending:
+                    fut.cancel()
+                raise
+        log.info("Whisper troceado completado en %.1fs", time.perf_counter() - t0)
+        return merge_transcripts(parts, windows)
+
+    def transcribe_with_whisper(self, input_file,
+                                progress: TranscriptionProgress | None = None) -> Transcript:
+        progress = progress or TranscriptionProgress()
+        info = try_probe(input_file)
+        chunking = self.settings.get("whisper_troceado", True)
+        chunk_s = self._int_setting("whisper_tramo_segundos", _WHISPER_CHUNK_S)
+        # Sin sondeo la duración es desconocida: se mide con el análisis de energía
+        long_audio = ((chunking and (info is None or info.duration > chunk_s * 1.5))
+                      or (info is not None and not self._fits_one_upload(info.duration)))
+
+        offset_map = None
+        if long_audio or self.settings.get("recorte_silencios", True):
+            # La copia directa usa el original; todo lo que decodifica, el WAV canónico
+            decoded = self._decode_source(input_file)
+            energies = scan_energy(decoded, _FRAME_MS)
+            offset_map = self._trim_plan(energies)
+
+            # Las grabaciones largas se trocean en silencios y se suben en paralelo
+            duration = len(energies) * _FRAME_MS / 1000
+            kept = offset_map.kept_seconds if offset_map is not None else duration
+            oversized = not self._fits_one_upload(kept)
+            if oversized and not chunking:
+                log.warning("%.0fs de audio no caben en una subida ni con el bitrate mínimo: "
+                            "se trocea aunque whisper_troceado esté desactivado", kept)
+            if (chunking and duration > chunk_s * 1.5) or oversized:
+                windows = plan_windows(energies, _FRAME_MS, chunk_s, _WHISPER_OVERLAP_S)
+                if len(windows) > 1:
+                    return self._transcribe_whisper_chunked(decoded, windows, offset_map, progress)
+
+        if offset_map is not None:
+            profile = self._profile(offset_map.kept_seconds)
+            prepared = self._encode_audio(decoded, profile, spans=offset_map.spans)
+            log.info("Audio recortado para Whisper (%s %d kbps): %.1f MB", profile.codec,
+                     profile.bitrate_kbps, prepared.size_mb)
+        else:
+            prepared = self._prepare_for_whisper(input_file, info)
+        with prepared:
+            progress.check()
+            progress.report(None, "")  # subida en curso: sin porcentaje fiable
+            transcript = self._upload_to_whisper(prepared)
+            progress.check()
+            progress.report(100, transcript.text)
+        if offset_map is not None:
+            return transcript.map_times(offset_map.to_original)
+        return transcript
+
+    def transcribe_with_vosk(self, input_file,
+                             progress: TranscriptionProgress | None = None) -> Transcript:
+        progress = progress or TranscriptionProgress()
+        info = None
+        workers = self._vosk_workers()
+        if workers > 1 or not self.settings.get("recorte_silencios", True):
+            info = try_probe(input_file)
+        input_file = self._decode_source(input_file)
+
+        offset_map = None
+        energies = None
+        if self.settings.get("recorte_silencios", True):
+            energies = scan_energy(input_file, _FRAME_MS)
+            offset_map = self._trim_plan(energies)
+
+        # Los clips cortos no compensan el reparto entre procesos
+        if workers > 1 and (info is None or info.duration > 2 * _VOSK_MIN_PARALLEL_S):
+            return transcribe_parallel(input_file, workers, energies, offset_map, progress)
+
+        # El modelo se carga una sola vez por proceso (ver core.model_registry)
+        model = get_vosk_model()
+        rec = KaldiRecognizer(model, SAMPLE_RATE)
         rec.SetWords(True)
 
-        results = []
-        while True:
-            data = wf.readframes(4000)
-            if len(data) == 0: break
-            if rec.AcceptWaveform(data):
-                part = json.loads(rec.Result())
-                results.append(part.get("text", ""))
-        
-        final_res = json.loads(rec.FinalResult())
-        results.append(final_res.get("text", ""))
-        
-        wf.close()
-        if os.path.exists(temp_wav): os.remove(temp_wav)
-            
-        return " ".join(results).strip()
-
-    def transcribe(self, file_path):
-        if self.api_key and not self.api_key.startswith("tu_clave"):
-            log.info("Transcribiendo con Whisper: %s", file_path)
-            result = self.transcribe_with_whisper(file_path), "Whisper"
-            log.info("Transcripción Whisper completada (%d chars)", len(result[0]))
-            return result
+        # Bytes de PCM esperados, para el porcentaje de progreso
+        if offset_map is not None:
+            expected = offset_map.kept_seconds * BYTES_PER_SECOND
+        elif energies is not None:
+            expected = len(energies) * _FRAME_MS / 1000 * BYTES_PER_SECOND
+        else:
+            expected = info.duration * BYTES_PER_SECOND if info else 0
+
+        # ffmpeg entrega el PCM por tubería: ni WAV temporal ni audio completo en RAM
+        if offset_map is not None:
+            pcm = iter_pcm_spans(input_file, offset_map.spans)
         else:
-            log.info("Transcribiendo con Vosk: %s", file_path)
-            result = self.transcribe_with_vosk(file_path), "Vosk"
-            log.info("Transcripción Vosk completada (%d chars)", len(result[0]))
-            return result
+            pcm = iter_pcm(input_file)
+        transcript = Transcript()
+        to_time = offset_map.to_original if offset_map is not None else None
+        results = []
+        consumed = 0
+        try:
+            for n, data in enumerate(pcm, 1):
+                consumed += len(data)
+                if rec.AcceptWaveform(data):
+                    collect_result(transcript, results, json.loads(rec.Result()), to_time)
+                elif n % _VOSK_PARTIAL_EVERY == 0:
+                    progress.check()
+                    partial = json.loads(rec.PartialResult()).get("partial", "")
+                    progress.report(100 * consumed / expected if expected else None,
+                                    " ".join(t for t in results[-5:] + [partial] if t))
+        finally:
+            pcm.close()  # si se cancela, ffmpeg se detiene en el acto
+
+        collect_result(transcript, results, json.loads(rec.FinalResult()), to_time)
+
+        transcript.text = " ".join(t for t in results if t).strip()
+        progress.report(100, transcript.text)
+        return transcript
+
+    def _cache_params(self, engine: str) -> dict:
+        """Parámetros que alteran el resultado y por tanto forman parte de la clave."""
+        if engine == "Whisper":
+            return {
+                "model": "whisper-1",
+                "language": "es",
+                "chunk_s": self._int_setting("whisper_tramo_segundos", _WHISPER_CHUNK_S),
+                "overlap_s": _WHISPER_OVERLAP_S,
+                "chunking": bool(self.settings.get("whisper_troceado", True)),
+                "profile": self.settings.get("perfil_whisper", "auto"),
+                "trim": self._trim_params(),
+            }
+        return {"model": find_vosk_model_path(), "workers": self._vosk_workers(),
+                "trim": self._trim_params()}
+
+    def _trim_params(self):
+        if not self.settings.get("recorte_silencios", True):
+            return None
+        return self.settings.get("recorte_silencio_min_s", 1.5)
+
+    def _get_cache(self) -> TranscriptionCache | None:
+        if not self.settings.get("cache_transcripciones", True):
+            return None
+        if self._cache is None:
+            self._cache = TranscriptionCache(
+                max_mb=self.settings.get("cache_transcripciones_mb", 200),
+                max_age_days=self.settings.get("cache_transcripciones_dias", 30),
+            )
+        return self._cache
+
+    def _hedging_enabled(self) -> bool:
+        return bool(self.settings.get("transcripcion_cobertura", True)) and bool(find_vosk_model_path())
+
+    def _transcribe_hedged(self, file_path: str,
+                           progress: TranscriptionProgress) -> tuple[Transcript, str]:
+        """
+        Carrera Whisper/Vosk: Whisper arranca solo; si falla o no responde en el
+        plazo se lanza Vosk. Gana el primero que termine bien y el otro se cancela.
+        """
+        deadline = self._int_setting("whisper_plazo_segundos", _HEDGE_DEADLINE_S)
+        engines = {"Whisper": self.transcribe_with_whisper, "Vosk": self.transcribe_with_vosk}
+        channels, started, errors = {}, {}, {}
+        running = {}
+        # Sin `with`: una subida HTTP en curso no se puede interrumpir y no debe
+        # retener el resultado del ganador.
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cobertura")
+
+        def launch(name):
+            channels[name] = progress.child()
+            started[name] = time.perf_counter()
+            running[pool.submit(engines[name], file_path, channels[name])] = name
+
+        log.info("Transcribiendo con cobertura (Vosk si Whisper tarda más de %ds): %s",
+                 deadline, file_path)
+        launch("Whisper")
+        hedge_at = time.perf_counter() + deadline
+        try:
+            while running:
+                wait_s = 0.5
+                if "Vosk" not in channels:
+                    wait_s = max(0.0, min(wait_s, hedge_at - time.perf_counter()))
+                done, _ = wait(running, timeout=wait_s, return_when=FIRST_COMPLETED)
+                progress.check()
+                for fut in done:
+                    name = running.pop(fut)
+                    elapsed = time.perf_counter() - started[name]
+                    try:
+                        transcript = fut.result()
+                    except TranscriptionCancelled:
+                        raise
+                    except Exception as exc:
+                        errors[name] = exc
+                        log.warning("%s falló tras %.1fs: %s", name, elapsed, exc)
+                        continue
+                    losers = []
+                    for other_fut, other in running.items():
+                        channels[other].cancel_event.set()
+                        other_fut.cancel()
+                        losers.append(f"{other} cancelado tras {time.perf_counter() - started[other]:.1f}s")
+                    losers += [f"{n} falló" for n in errors]
+                    log.info("Cobertura: gana %s en %.1fs (%s)", name, elapsed,
+                             ", ".join(losers) or "sin competencia")
+                    return transcript, name
+                if "Vosk" not in channels:
+                    if "Whisper" in errors:
+                        launch("Vosk")
+                    elif time.perf_counter() >= hedge_at:
+                        log.warning("Whisper sin respuesta tras %ds: se lanza Vosk en paralelo", deadline)
+                        launch("Vosk")
+            raise RuntimeError(
+                "Fallaron todos los motores: "
+                + "; ".join(f"{name}: {exc}" for name, exc in errors.items())
+            )
+        except BaseException:
+            for channel in channels.values():
+                channel.cancel_event.set()
+            for fut in running:
+                fut.cancel()
+            raise
+        finally:
+            pool.shutdown(wait=False)
+
+    def transcribe(self, file_path, on_progress=None, cancel_event=None):
+        """
+        Devuelve (texto, motor). `on_progress(porcentaje | None, texto_parcial)`
+        recibe el avance; si `cancel_event` se activa se lanza TranscriptionCancelled.
+        """
+        transcript, motor = self.transcribe_detailed(file_path, on_progress, cancel_event)
+        return transcript.text, motor
+
+    def transcribe_detailed(self, file_path, on_progress=None,
+                            cancel_event=None) -> tuple[Transcript, str]:
+        """Como `transcribe`, pero con las palabras, sus tiempos y su confianza."""
+        progress = TranscriptionProgress(on_progress, cancel_event)
+        use_whisper = bool(self.api_key and not self.api_key.startswith("tu_clave"))
+        hedged = use_whisper and self._hedging_enabled()
+        motor = "Whisper" if use_whisper else "Vosk"
+
+        cache = self._get_cache()
+        if cache:
+            try:
+                # Solo el motor preferido: lo que Vosk transcribió durante una caída
+                # de Whisper no debe servirse cuando Whisper vuelve a responder
+                cached = cache.get(cache.key(file_path, motor, self._cache_params(motor)))
+                if cached is not None:
+                    log.info("Transcripción %s recuperada de caché (%d chars, %d palabras): %s",
+                             motor, len(cached.text), len(cached), file_path)
+                    progress.report(100, cached.text)
+                    return cached, motor
+            except Exception as exc:
+                log.warning("Caché de transcripciones no disponible: %s", exc)
+                cache = None
+
+        with self._pinned_audio(file_path):
+            if hedged:
+                transcript, motor = self._transcribe_hedged(file_path, progress)
+            elif use_whisper:
+                log.info("Transcribiendo con Whisper: %s", file_path)
+                transcript = self.transcribe_with_whisper(file_path, progress)
+            else:
+                log.info("Transcribiendo con Vosk: %s", file_path)
+                transcript = self.transcribe_with_vosk(file_path, progress)
+        log.info("Transcripción %s completada (%d chars, %d palabras)",
+                 motor, len(transcript.text), len(transcript))
+
+        if cache:
+            try:
+                cache.put(cache.key(file_path, motor, self._cache_params(motor)), transcript)
+            except Exception as exc:
+                log.warning("No se pudo guardar la transcripción en caché: %s", exc)
+        return transcript, motor
+
+
+class AsyncTranscriptionService(TranscriptionService):
+    """
+    Fachada para el bucle de core.async_runtime. Decodificar, trocear y
+    reconocer es trabajo de ffmpeg y de CPU que ya se reparte en sus propios
+    hilos y procesos, así que se delega en un hilo sin bloquear el bucle.
+    """
+
+    async def transcribe(self, file_path, on_progress=None, cancel_event=None):
+        return await asyncio.to_thread(super().transcribe, file_path, on_progress, cancel_event)
@@ -0,0 +1,77 @@
+"""
+Caché de transcripciones direccionada por contenido.
+La clave combina el hash del medio con el motor y sus parámetros, de modo
+que reprocesar el mismo archivo no vuelve a pagar Whisper ni Vosk.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from core.disk_cache import DiskCache
+from core.logger import get_logger
+from core.transcript import Transcript
+
+log = get_logger(__name__)
+
+_HASH_BLOCK = 1024 * 1024
+# Hashes recordados como máximo (los menos usados recientemente se olvidan)
+_MAX_DIGESTS = 256
+
+# (ruta, tamaño, mtime) → hash, para no releer el archivo en la misma sesión
+_digests: OrderedDict = OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def content_hash(path: str) -> str:
+    """SHA-256 del contenido del archivo, memorizado por (ruta, tamaño, mtime)."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _digests_lock:
+        digest = _digests.get(memo_key)
+        if digest:
+            _digests.move_to_end(memo_key)
+    if digest:
+        return digest
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _digests_lock:
+        _digests[memo_key] = digest
+        _digests.move_to_end(memo_key)
+        while len(_digests) > _MAX_DIGESTS:
+            _digests.popitem(last=False)
+    return digest
+
+
+class TranscriptionCache:
+    def __init__(self, max_mb: float = 200, max_age_days: float = 30):
+        self._store = DiskCache("transcripciones.sqlite3", max_mb, max_age_days,
+                                name="Caché transcripciones")
+
+    @staticmethod
+    def key(path: str, engine: str, params: dict) -> str:
+        payload = json.dumps(
+            {"media": content_hash(path), "engine": engine, "params": params},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Transcript | None:
+        raw = self._store.get(key)
+        if raw is None:
+            return None
+        try:
+            # Las entradas antiguas solo guardan {"text": ...}: sin palabras
+            return Transcript.from_dict(json.loads(raw))
+        except (ValueError, KeyError, TypeError, OverflowError):
+            self._store.delete(key)
+            return None
+
+    def put(self, key: str, transcript: Transcript):
+        self._store.put(key, json.dumps(transcript.to_dict(), ensure_ascii=False,
+                                        separators=(",", ":")))
@@ -0,0 +1,104 @@
+"""
+Audio preparado para subir a Whisper, en memoria o en disco.
+ffmpeg escribe en una tubería y el resultado se guarda en un búfer que solo
+pasa a disco si supera el tope; así se evita el directorio temporal (lento y
+revisado por el antivirus en los equipos de redacción).
+"""
+
+import os
+import tempfile
+import threading
+from core.logger import get_logger
+
+log = get_logger(__name__)
+
+# Velocidad supuesta del directorio temporal (escritura + relectura) para
+# estimar el tiempo ahorrado; medirla costaría justo la E/S que se evita
+DEFAULT_TEMP_MBPS = 50
+
+_stats_lock = threading.Lock()
+_bytes_saved = 0
+_seconds_saved = 0.0
+
+
+class UploadAudio:
+    """
+    Origen de una subida: un archivo existente, un temporal en disco o un
+    búfer en memoria. Se usa como gestor de contexto para liberar el temporal.
+    """
+
+    def __init__(self, filename: str, path: str | None = None, buffer=None,
+                 temporary: bool = False, max_bytes: int = 0):
+        self.filename = filename
+        self.path = path
+        self.buffer = buffer
+        self.temporary = temporary
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_file(cls, path: str, temporary: bool = False) -> "UploadAudio":
+        return cls(os.path.basename(path), path=path, temporary=temporary)
+
+    @classmethod
+    def memory(cls, extension: str, max_mb: float) -> "UploadAudio":
+        """Búfer que se desborda a un temporal si supera `max_mb`."""
+        max_bytes = int(max_mb * 1024 * 1024)
+        buffer = tempfile.SpooledTemporaryFile(max_size=max_bytes, suffix=extension)
+        return cls(f"audio{extension}", buffer=buffer, max_bytes=max_bytes)
+
+    @property
+    def in_memory(self) -> bool:
+        # SpooledTemporaryFile pasa a disco en cuanto lo escrito supera `max_size`
+        return self.buffer is not None and self.size <= self.max_bytes
+
+    @property
+    def size(self) -> int:
+        if self.buffer is not None:
+            pos = self.buffer.tell()
+            self.buffer.seek(0, os.SEEK_END)
+            size = self.buffer.tell()
+            self.buffer.seek(pos)
+            return size
+        return os.path.getsize(self.path)
+
+    @property
+    def size_mb(self) -> float:
+        return self.size / (1024 * 1024)
+
+    def open(self):
+        """Objeto que acepta el cliente de OpenAI en `file=`."""
+        if self.buffer is not None:
+            self.buffer.seek(0)
+            return self.filename, self.buffer
+        return open(self.path, "rb")
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+        elif self.temporary and self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_memory_upload(audio: UploadAudio, encode_s: float,
+                         temp_mbps: float = DEFAULT_TEMP_MBPS):
+    """Registra los bytes (y el tiempo estimado con `temp_mbps`) que no pasaron por disco."""
+    global _bytes_saved, _seconds_saved
+    if not audio.in_memory:
+        log.info("Audio para Whisper desbordado a disco (%.1f MB, supera el tope en memoria)",
+                 audio.size_mb)
+        return
+    size_mb = audio.size_mb
+    saved_s = size_mb / temp_mbps if temp_mbps > 0 else 0.0
+    with _stats_lock:
+        _bytes_saved += audio.size
+        _seconds_saved += saved_s
+        total_mb, total_s = _bytes_saved / (1024 * 1024), _seconds_saved
+    log.info("Audio para Whisper en memoria: %.1f MB en %.2fs sin pasar por disco "
+             "(~%.2fs de E/S evitados; sesión: %.1f MB, ~%.1fs)",
+             size_mb, encode_s, saved_s, total_mb, total_s)
@@ -1,37 +1,83 @@
 import os
 import json
 import time
-from openai import OpenAI, APIStatusError, APIConnectionError
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from openai import APIConnectionError
 from dotenv import load_dotenv
+from core.config_store import load_settings, prompt
+from core.fact_cache import FactCache, annotation
+from core.http_clients import get_async_openai_client, get_openai_client
 from core.logger import get_logger
+from core.resilience import RetryPolicy, retry_call, retry_call_async
+from core.verification_blocks import (LatencyBaseline, block_note, draft_chars,
+                                      merge_results, plan_blocks)
 
 load_dotenv()
 
 log = get_logger(__name__)
 
-CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
-PROMPTS_PATH = os.path.join(CONFIG_DIR, "prompts.json")
-
-_RETRY_CODES = {429, 500, 502, 503, 504}
-_MAX_RETRIES = 3
-_BASE_DELAY  = 2  # segundos
-
-
-def _load_prompts():
-    with open(PROMPTS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+_RETRY_POLICY = RetryPolicy(attempts=3, base_delay=2, deadline=180)
+_DEFAULT_BLOCK_CHARS = 3000
+_DEFAULT_CONCURRENCY = 3
 
 
 class VerificationService:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=self.api_key) if self.api_key else None
+        # Los reintentos los gestiona core.resilience, no el SDK
+        self.client = (get_openai_client(self.api_key).with_options(max_retries=0)
+                       if self.api_key else None)
+        self._facts = None
+        self._baseline = LatencyBaseline()
+
+    def _get_fact_cache(self) -> FactCache | None:
+        settings = load_settings()
+        if not settings.get("cache_verificacion", True):
+            return None
+        if self._facts is None:
+            self._facts = FactCache(
+                ttl_days=settings.get("cache_verificacion_dias", 30),
+                max_mb=settings.get("cache_verificacion_mb", 5),
+            )
+        return self._facts
+
+    def _known_facts(self, news_data: dict) -> dict:
+        cache = self._get_fact_cache()
+        return cache.known(news_data) if cache else {}
+
+    def _remember(self, result: dict, known: dict):
+        cache = self._get_fact_cache()
+        if cache:
+            cache.remember(result, skip=known)
+
+    def _plan(self, news_data: dict) -> tuple[list[dict], int]:
+        """Bloques a verificar y cuántos a la vez (uno solo si el modo está desactivado)."""
+        settings = load_settings()
+        if not settings.get("verificacion_bloques", True):
+            return [news_data], 1
+        blocks = plan_blocks(news_data, int(settings.get("verificacion_bloque_caracteres",
+                                                         _DEFAULT_BLOCK_CHARS)))
+        workers = int(settings.get("verificacion_concurrencia", _DEFAULT_CONCURRENCY))
+        return blocks, max(1, min(len(blocks), workers))
+
+    def _single(self, news_data: dict, result: dict, t0: float) -> dict:
+        elapsed = time.perf_counter() - t0
+        self._baseline.record(draft_chars(news_data), elapsed)
+        log.info("Verificación en una sola petición: %.1fs (%d caracteres)",
+                 elapsed, draft_chars(news_data))
+        return result
 
-    def verify(self, news_data: dict) -> dict:
-        if not self.client:
-            raise Exception("OpenAI API Key no configurada.")
+    def _merge(self, news_data: dict, blocks: list[dict], results: list[dict],
+               workers: int, t0: float) -> dict:
+        merged = merge_results(news_data, blocks, results)
+        log.info("Verificación por bloques: %d bloques en %.1fs (%d en paralelo; %s)",
+                 len(blocks), time.perf_counter() - t0, workers,
+                 self._baseline.describe(draft_chars(news_data)))
+        return merged
 
-        cfg = _load_prompts()["verificacion"]
+    def _messages(self, news_data: dict, known: dict | None = None, note: str | None = None):
+        cfg = prompt("verificacion")
         modelo = cfg.get("modelo", "gpt-4o-search-preview")
         system_prompt = cfg["system_prompt"]
 
@@ -46,41 +92,46 @@ class VerificationService:
             contenido=contenido,
             etiquetas=", ".join(etiquetas),
         )
+        if known:
+            # Lo ya confirmado no se vuelve a buscar: búsqueda más corta y barata
+            user_prompt += "\n\n" + annotation(list(known.values()))
+        if note:
+            user_prompt += "\n\n" + note
 
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
 
-        last_exc = None
-        response = None
-        for attempt in range(1, _MAX_RETRIES + 1):
-            try:
-                log.info("[Verification] Intento %d/%d - modelo %s", attempt, _MAX_RETRIES, modelo)
-                response = self.client.chat.completions.create(
-                    model=modelo,
-                    messages=messages,
-                )
-                break
-            except APIStatusError as e:
-                last_exc = e
-                if e.status_code in _RETRY_CODES and attempt < _MAX_RETRIES:
-                    delay = _BASE_DELAY * (2 ** (attempt - 1))
-                    log.warning("[Verification] HTTP %s, reintentando en %ss...", e.status_code, delay)
-                    time.sleep(delay)
-                else:
-                    raise
-            except APIConnectionError as e:
-                last_exc = e
-                if attempt < _MAX_RETRIES:
-                    delay = _BASE_DELAY * (2 ** (attempt - 1))
-                    log.warning("[Verification] Error de conexión, reintentando en %ss...", delay)
-                    time.sleep(delay)
-                else:
-                    raise
-        if response is None:
-            raise last_exc
+        return modelo, messages
+
+    def verify(self, news_data: dict) -> dict:
+        if not self.client:
+            raise Exception("OpenAI API Key no configurada.")
 
+        blocks, workers = self._plan(news_data)
+        t0 = time.perf_counter()
+        if len(blocks) == 1:
+            return self._single(news_data, self._verify_block(news_data, 1, 1), t0)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verificar") as pool:
+            results = list(pool.map(lambda item: self._verify_block(item[1], item[0], len(blocks)),
+                                    enumerate(blocks, start=1)))
+        return self._merge(news_data, blocks, results, workers, t0)
+
+    def _verify_block(self, block: dict, index: int, total: int) -> dict:
+        known = self._known_facts(block)
+        modelo, messages = self._messages(block, known, block_note(index, total))
+        response = retry_call(
+            lambda: self.client.chat.completions.create(model=modelo, messages=messages),
+            name=f"Verification {modelo}", host=self.client.base_url.host,
+            policy=_RETRY_POLICY, transient=(APIConnectionError,),
+        )
+        result = self._parse(response)
+        self._remember(result, known)
+        return result
+
+    @staticmethod
+    def _parse(response) -> dict:
         raw_text = response.choices[0].message.content or ""
 
         annotations = []
@@ -110,3 +161,41 @@ class VerificationService:
             result["fuentes_consultadas"] = annotations
 
         return result
+
+
+class AsyncVerificationService(VerificationService):
+    """Verificación sobre AsyncOpenAI, para el bucle de core.async_runtime."""
+
+    def __init__(self):
+        super().__init__()
+        self.aclient = (get_async_openai_client(self.api_key).with_options(max_retries=0)
+                        if self.api_key else None)
+
+    async def verify(self, news_data: dict) -> dict:
+        if not self.aclient:
+            raise Exception("OpenAI API Key no configurada.")
+
+        blocks, workers = self._plan(news_data)
+        t0 = time.perf_counter()
+        if len(blocks) == 1:
+            return self._single(news_data, await self._verify_block(news_data, 1, 1), t0)
+        limit = asyncio.Semaphore(workers)
+
+        async def _one(index: int, block: dict) -> dict:
+            async with limit:
+                return await self._verify_block(block, index, len(blocks))
+
+        results = await asyncio.gather(*(_one(i, b) for i, b in enumerate(blocks, start=1)))
+        return self._merge(news_data, blocks, list(results), workers, t0)
+
+    async def _verify_block(self, block: dict, index: int, total: int) -> dict:
+        known = self._known_facts(block)
+        modelo, messages = self._messages(block, known, block_note(index, total))
+        response = await retry_call_async(
+            lambda: self.aclient.chat.completions.create(model=modelo, messages=messages),
+            name=f"Verification {modelo}", host=self.aclient.base_url.host,
+            policy=_RETRY_POLICY, transient=(APIConnectionError,),
+        )
+        result = self._parse(response)
+        self._remember(result, known)
+        return result
@@ -0,0 +1,128 @@
+"""
+Verificación por bloques de párrafos para noticias largas.
+El cuerpo HTML se reparte en grupos de párrafos de tamaño acotado que se
+verifican en paralelo; el titular, la entradilla y las etiquetas viajan con
+el primer bloque. Después se unen los resultados como si fueran una sola
+verificación: correcciones renumeradas, fuentes sin duplicados y el
+`texto_corregido` recompuesto en el orden original.
+"""
+
+import re
+
+_PARAGRAPH_END_RE = re.compile(r"</p\s*>", re.IGNORECASE)
+
+_BLOCK_NOTE = ("FRAGMENTO {index}/{total} DEL CUERPO de una noticia más larga: verifica solo "
+               "este fragmento y deja vacíos titulo, entradilla y etiquetas en texto_corregido.")
+
+# Peso de la última medida en la media móvil de la referencia
+_BASELINE_WEIGHT = 0.3
+
+
+def split_paragraphs(html: str) -> list[str]:
+    """Párrafos del cuerpo, cortando tras cada </p>; lo que sobre va con el último."""
+    paragraphs, start = [], 0
+    for match in _PARAGRAPH_END_RE.finditer(html):
+        paragraphs.append(html[start:match.end()])
+        start = match.end()
+    tail = html[start:]
+    if tail.strip():
+        if paragraphs:
+            paragraphs[-1] += tail
+        else:
+            paragraphs.append(tail)
+    return [p for p in paragraphs if p.strip()]
+
+
+def plan_blocks(news_data: dict, max_chars: int) -> list[dict]:
+    """
+    Borradores parciales a verificar. Con un solo bloque se devuelve el
+    borrador tal cual (verificación de una sola petición).
+    """
+    groups, current, size = [], [], 0
+    for paragraph in split_paragraphs(news_data.get("contenido", "")):
+        if current and size + len(paragraph) > max_chars:
+            groups.append("".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph)
+    if current:
+        groups.append("".join(current))
+
+    if len(groups) <= 1:
+        return [news_data]
+    blocks = [{**news_data, "contenido": groups[0]}]
+    blocks.extend({"titulo": "", "entradilla": "", "contenido": group, "etiquetas": []}
+                  for group in groups[1:])
+    return blocks
+
+
+def block_note(index: int, total: int) -> str | None:
+    """Aviso para el prompt de los bloques que no son el primero."""
+    if index == 1:
+        return None
+    return _BLOCK_NOTE.format(index=index, total=total)
+
+
+def merge_results(news_data: dict, blocks: list[dict], results: list[dict]) -> dict:
+    """Une las verificaciones de los bloques en una sola, en el orden del texto."""
+    correcciones, fuentes, datos, avisos, contenido = [], [], [], [], []
+    for block, result in zip(blocks, results):
+        correcciones.extend(result.get("correcciones") or [])
+        datos.extend(result.get("datos_confirmados") or [])
+        for url in result.get("fuentes_consultadas") or []:
+            if url not in fuentes:
+                fuentes.append(url)
+        aviso = (result.get("aviso") or "").strip()
+        if aviso and aviso not in avisos:
+            avisos.append(aviso)
+        # Un bloque sin texto corregido conserva el original
+        corrected = result.get("texto_corregido") or {}
+        contenido.append(corrected.get("contenido") or block["contenido"])
+
+    for numero, correccion in enumerate(correcciones, start=1):
+        correccion["numero"] = numero
+
+    first = results[0].get("texto_corregido") or {}
+    return {
+        "correcciones": correcciones,
+        "texto_corregido": {
+            "titulo": first.get("titulo") or news_data.get("titulo", ""),
+            "entradilla": first.get("entradilla") or news_data.get("entradilla", ""),
+            "contenido": "".join(contenido),
+            "etiquetas": first.get("etiquetas") or news_data.get("etiquetas", []),
+        },
+        "datos_confirmados": datos,
+        "fuentes_consultadas": fuentes,
+        "aviso": "\n".join(avisos),
+    }
+
+
+def draft_chars(news_data: dict) -> int:
+    return sum(len(news_data.get(key, "")) for key in ("titulo", "entradilla", "contenido"))
+
+
+class LatencyBaseline:
+    """
+    Referencia de una verificación de una sola petición: media móvil de
+    segundos por carácter de las verificaciones completas ya hechas.
+    """
+
+    def __init__(self):
+        self.seconds_per_char = None
+        self.samples = 0
+
+    def record(self, chars: int, seconds: float):
+        if chars <= 0:
+            return
+        rate = seconds / chars
+        if self.seconds_per_char is None:
+            self.seconds_per_char = rate
+        else:
+            self.seconds_per_char += _BASELINE_WEIGHT * (rate - self.seconds_per_char)
+        self.samples += 1
+
+    def describe(self, chars: int) -> str:
+        if self.seconds_per_char is None:
+            return "sin referencia de una sola petición todavía"
+        return (f"una sola petición: ~{self.seconds_per_char * chars:.1f}s estimados "
+                f"con {self.samples} verificaciones previas")
@@ -0,0 +1,173 @@
+"""
+Transcripción Vosk en paralelo por tramos.
+El audio se parte en silencios y cada tramo se reconoce en un proceso
+del pool; cada proceso mantiene su propio modelo cargado.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from vosk import KaldiRecognizer
+from core.audio import (
+    SAMPLE_RATE,
+    OffsetMap,
+    find_split_points,
+    iter_pcm,
+    iter_pcm_spans,
+    scan_energy,
+)
+from core.logger import get_logger
+from core.model_registry import find_vosk_model_path, get_vosk_model
+from core.progress import TranscriptionProgress
+from core.transcript import Transcript
+
+log = get_logger(__name__)
+
+_FRAME_MS = 30
+# Límites de longitud de tramo: cortos desperdician arranques, largos desequilibran el pool
+_MIN_SEGMENT_S = 30
+_MAX_SEGMENT_S = 300
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+# Estado de cada proceso trabajador
+_worker_model_path = None
+
+
+def _init_worker(model_path):
+    global _worker_model_path
+    _worker_model_path = model_path
+    get_vosk_model(model_path)
+
+
+def collect_result(transcript: Transcript, texts: list[str], res: dict, to_time=None):
+    """Añade un resultado JSON de Vosk: el texto a `texts` y las palabras a `transcript`."""
+    texts.append(res.get("text", ""))
+    for w in res.get("result", []):
+        start, end = w.get("start", 0.0), w.get("end", 0.0)
+        if to_time:
+            start, end = to_time(start), to_time(end)
+        transcript.add_word(w.get("word", ""), start, end, w.get("conf", 1.0))
+
+
+def _recognize_segment(input_file, index, start, duration, spans=None):
+    """
+    Se ejecuta en el proceso trabajador. Tiempos de palabra absolutos.
+    `spans` (relativos al tramo) limita el reconocimiento a las zonas con voz.
+    """
+    transcript = Transcript()
+    if spans is not None and not spans:
+        return index, transcript
+    offset_map = OffsetMap(spans) if spans is not None else None
+    model = get_vosk_model(_worker_model_path)
+    rec = KaldiRecognizer(model, SAMPLE_RATE)
+    rec.SetWords(True)
+
+    texts = []
+
+    def _to_abs(t):
+        return (offset_map.to_original(t) if offset_map else t) + start
+
+    if spans is not None:
+        pcm = iter_pcm_spans(input_file, spans, start=start, duration=duration)
+    else:
+        pcm = iter_pcm(input_file, start=start, duration=duration)
+    for data in pcm:
+        if rec.AcceptWaveform(data):
+            collect_result(transcript, texts, json.loads(rec.Result()), _to_abs)
+    collect_result(transcript, texts, json.loads(rec.FinalResult()), _to_abs)
+
+    transcript.text = " ".join(t for t in texts if t)
+    return index, transcript
+
+
+def _get_pool(workers: int, model_path: str) -> ProcessPoolExecutor:
+    """El pool sobrevive entre archivos para no recargar el modelo en cada trabajo."""
+    global _pool, _pool_key
+    with _pool_lock:
+        key = (workers, model_path)
+        if _pool is not None and _pool_key == key:
+            return _pool
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(model_path,),
+        )
+        _pool_key = key
+        log.info("Pool Vosk creado con %d procesos", workers)
+        return _pool
+
+
+def plan_segments(energies, workers: int) -> list[tuple[float, float]]:
+    """Devuelve los tramos (inicio, duración) en segundos, cortados en silencios."""
+    total_s = len(energies) * _FRAME_MS / 1000
+    # Unos 3 tramos por proceso para repartir bien la carga
+    target = min(_MAX_SEGMENT_S, max(_MIN_SEGMENT_S, total_s / (workers * 3)))
+    cuts = [0.0] + find_split_points(energies, _FRAME_MS, target) + [total_s]
+    return [(a, b - a) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def transcribe_parallel(input_file: str, workers: int, energies=None,
+                        offset_map: OffsetMap | None = None,
+                        progress: TranscriptionProgress | None = None) -> Transcript:
+    """
+    Transcribe `input_file` repartiendo tramos entre `workers` procesos.
+    Devuelve la transcripción unida, con tiempos de palabra absolutos.
+    `energies` evita repetir el análisis si ya se hizo; con `offset_map`
+    solo se reconocen las zonas con voz.
+    """
+    progress = progress or TranscriptionProgress()
+    model_path = find_vosk_model_path()
+    if not model_path:
+        raise Exception("Modelo local de Vosk no encontrado.")
+
+    t0 = time.perf_counter()
+    if energies is None:
+        energies = scan_energy(input_file, _FRAME_MS)
+    total_s = len(energies) * _FRAME_MS / 1000
+    segments = plan_segments(energies, workers)
+    log.info("Vosk paralelo: %.1fs de audio en %d tramos, %d procesos (análisis %.2fs)",
+             total_s, len(segments), workers, time.perf_counter() - t0)
+
+    pool = _get_pool(workers, model_path)
+    pending = {
+        pool.submit(
+            _recognize_segment, input_file, i, start, dur,
+            offset_map.clip(start, start + dur).spans if offset_map else None,
+        )
+        for i, (start, dur) in enumerate(segments)
+    }
+    by_index = {}
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            progress.check()
+            for fut in done:
+                index, part = fut.result()
+                by_index[index] = part
+            if done:
+                # Texto parcial: prefijo de tramos consecutivos ya reconocidos
+                prefix = []
+                while len(prefix) in by_index:
+                    prefix.append(by_index[len(prefix)].text)
+                progress.report(100 * len(by_index) / len(segments), " ".join(t for t in prefix if t))
+    except BaseException:
+        for fut in pending:
+            fut.cancel()
+        raise
+    transcript = Transcript.concat([by_index[i] for i in range(len(segments))])
+
+    elapsed = time.perf_counter() - t0
+    log.info("Vosk paralelo completado en %.1fs (RTF %.3f, %d procesos)",
+             elapsed, elapsed / total_s if total_s else 0.0, workers)
+    return transcript
+
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 1) - 1)
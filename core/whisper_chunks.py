@@ -0,0 +1,92 @@
+"""
+Troceado de audio largo para Whisper y unión de los textos resultantes.
+Las ventanas se cortan en silencios y se solapan unos segundos; al unir,
+cada solape se corta por su centro según los tiempos de palabra, y el texto
+de cada tramo se recorta por las mismas palabras (conservando su puntuación).
+"""
+
+import re
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from core.audio import find_split_points
+from core.transcript import Transcript
+
+_NORMALIZE_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def plan_windows(energies, frame_ms: int, chunk_s: float,
+                 overlap_s: float) -> list[tuple[float, float]]:
+    """
+    Devuelve ventanas (inicio, duración) en segundos que cubren todo el audio.
+    Los cortes caen en silencios y cada ventana se amplía `overlap_s` por
+    ambos lados para no perder palabras en la frontera.
+    """
+    total_s = len(energies) * frame_ms / 1000
+    cuts = [0.0] + find_split_points(energies, frame_ms, chunk_s) + [total_s]
+    windows = []
+    for a, b in zip(cuts, cuts[1:]):
+        start = max(0.0, a - overlap_s)
+        end = min(total_s, b + overlap_s)
+        if end > start:
+            windows.append((start, end - start))
+    return windows
+
+
+def _norm(word: str) -> str:
+    return _NORMALIZE_RE.sub("", word.lower())
+
+
+def _text_bounds(part: Transcript, tokens: list[str]) -> list[int]:
+    """
+    Para cada palabra con tiempo de `part`, índice del token de `part.text`
+    desde el que empieza (el texto trae puntuación y mayúsculas que las
+    palabras no tienen). Una palabra sin pareja en el texto hereda el índice
+    de la siguiente emparejada.
+    """
+    words = [_norm(part.word(i)) for i in range(len(part))]
+    sm = SequenceMatcher(None, words, [_norm(t) for t in tokens], autojunk=False)
+    bounds = [None] * (len(words) + 1)
+    bounds[-1] = len(tokens)
+    for a, b, size in sm.get_matching_blocks():
+        for k in range(size):
+            bounds[a + k] = b + k
+    for i in range(len(words) - 1, -1, -1):
+        if bounds[i] is None:
+            bounds[i] = bounds[i + 1]
+    return bounds
+
+
+def _cut_text(part: Transcript, first: int, last: int) -> str:
+    """Texto de `part` que corresponde a sus palabras [first, last)."""
+    if not len(part) or (first == 0 and last == len(part)):
+        return part.text.strip()
+    tokens = part.text.split()
+    bounds = _text_bounds(part, tokens)
+    begin = 0 if first == 0 else bounds[first]
+    return " ".join(tokens[begin:bounds[last]])
+
+
+def merge_transcripts(parts: list[Transcript], windows: list[tuple[float, float]]) -> Transcript:
+    """
+    Une las transcripciones de ventanas solapadas. Cada solape se corta por
+    su centro: de cada ventana se quedan las palabras que empiezan entre los
+    centros de sus solapes, y el texto se recorta por esas mismas palabras,
+    de modo que `text` y las palabras siempre coinciden.
+    """
+    out = Transcript()
+    texts = []
+    for i, part in enumerate(parts):
+        start_at = stop_at = None
+        first, last = 0, len(part)
+        if i > 0:
+            prev_start, prev_dur = windows[i - 1]
+            start_at = (windows[i][0] + prev_start + prev_dur) / 2
+            first = bisect_left(part.starts, start_at)
+        if i + 1 < len(parts):
+            start, dur = windows[i]
+            stop_at = (windows[i + 1][0] + start + dur) / 2
+            last = max(first, bisect_left(part.starts, stop_at))
+        texts.append(_cut_text(part, first, last))
+        out.extend(part, start_at, stop_at)
+    out.text = " ".join(t for t in texts if t)
+    return out
@@ -1,76 +1,298 @@
 import os
 import json
 import time
-from openai import OpenAI, APIStatusError, APIConnectionError
+from openai import APIConnectionError
 from dotenv import load_dotenv
+from core.json_stream import JsonFieldStream
+from core.llm_cache import LLMCache
+from core.condense import condense, condense_async, needs_condensing
+from core.config_store import load_settings, prompt
+from core.http_clients import get_async_openai_client, get_openai_client
 from core.logger import get_logger
+from core.resilience import RetryPolicy, retry_call, retry_call_async
 
 load_dotenv()
 
 log = get_logger(__name__)
 
-CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
-PROMPTS_PATH = os.path.join(CONFIG_DIR, "prompts.json")
-
-_RETRY_CODES = {429, 500, 502, 503, 504}
-_MAX_RETRIES = 3
-_BASE_DELAY  = 2  # segundos
-
-
-def _load_prompts():
-    with open(PROMPTS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+# Una redacción puede tardar un minuto: el plazo solo limita empezar reintentos
+_RETRY_POLICY = RetryPolicy(attempts=3, base_delay=2, deadline=180)
+_RESPONSE_FORMAT = {"type": "json_object"}
 
 
 class WriterService:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=self.api_key) if self.api_key else None
-
-    def write_news(self, transcription: str, original_filename: str) -> dict:
-        if not self.client:
-            raise Exception("OpenAI API Key no configurada.")
+        # Los reintentos los gestiona core.resilience, no el SDK
+        self.client = (get_openai_client(self.api_key).with_options(max_retries=0)
+                       if self.api_key else None)
+        self._cache = None
 
-        cfg = _load_prompts()["redaccion"]
+    def _messages(self, transcription: str, original_filename: str):
+        cfg = prompt("redaccion")
         modelo = cfg.get("modelo", "gpt-4o")
-        system_prompt = cfg["system_prompt"]
         user_prompt = cfg["user_prompt_template"].format(
             transcription=transcription,
             original_filename=original_filename,
         )
-
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": cfg["system_prompt"]},
             {"role": "user", "content": user_prompt},
         ]
+        return modelo, messages
+
+    def _get_cache(self) -> LLMCache | None:
+        settings = load_settings()
+        if not settings.get("cache_redaccion", False):
+            return None
+        if self._cache is None:
+            self._cache = LLMCache(
+                max_mb=settings.get("cache_redaccion_mb", 20),
+                max_age_days=settings.get("cache_redaccion_dias", 7),
+            )
+        return self._cache
+
+    def _lookup(self, modelo: str, messages: list, force: bool):
+        """(caché, clave, borrador guardado o None). `force` ignora lo guardado."""
+        cache = self._get_cache()
+        if cache is None:
+            return None, None, None
+        key = LLMCache.key(modelo, messages, _RESPONSE_FORMAT)
+        if force:
+            log.info("[Writer] Regeneración forzada: se ignora la caché.")
+            return cache, key, None
+        cached = cache.get(key)
+        if cached is not None:
+            log.info("[Writer] Borrador servido desde la caché (sin llamada a la API).")
+        return cache, key, cached
+
+    def _condense_plan(self, transcription: str):
+        """(cfg, modelo, caché) si la transcripción hay que condensarla; si no, None."""
+        cfg = prompt("condensacion")
+        if not needs_condensing(transcription, cfg):
+            return None
+        return cfg, cfg.get("modelo", "gpt-4o-mini"), self._get_cache()
+
+    @staticmethod
+    def _summary_messages(cfg: dict, index: int, total: int, fragment: str,
+                          original_filename: str) -> list[dict]:
+        return [
+            {"role": "system", "content": cfg["system_prompt"]},
+            {"role": "user", "content": cfg["user_prompt_template"].format(
+                fragmento=fragment, indice=index, total=total,
+                original_filename=original_filename,
+            )},
+        ]
+
+    def _condense(self, transcription: str, original_filename: str, force: bool) -> str:
+        """Sustituye una transcripción muy larga por los hechos resumidos por fragmentos."""
+        plan = self._condense_plan(transcription)
+        if plan is None:
+            return transcription
+        cfg, modelo, cache = plan
+
+        def _summarize(index: int, total: int, fragment: str) -> str:
+            messages = self._summary_messages(cfg, index, total, fragment, original_filename)
+            key = LLMCache.key(modelo, messages) if cache else None
+            if cache and not force:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached["resumen"]
+            if not self.client:
+                raise Exception("OpenAI API Key no configurada.")
+
+            def _call():
+                response = self.client.chat.completions.create(model=modelo, messages=messages)
+                return response.choices[0].message.content or ""
+
+            summary = self._with_retries(modelo, _call)
+            if cache:
+                cache.put(key, {"resumen": summary})
+            return summary
+
+        return condense(transcription, cfg, _summarize)
+
+    def _with_retries(self, modelo: str, call):
+        """Ejecuta `call()` con la política común de reintentos y cortacircuitos."""
+        return retry_call(call, name=f"Writer {modelo}", host=self.client.base_url.host,
+                          policy=_RETRY_POLICY, transient=(APIConnectionError,))
+
+    @staticmethod
+    def _replay(cached: dict, original_filename: str, on_field=None) -> dict:
+        """Entrega un borrador de la caché como si llegara en streaming."""
+        if on_field:
+            for field, value in cached.items():
+                on_field(field, value)
+        return {**cached, "archivo_original": original_filename}
+
+    @staticmethod
+    def _finish(raw: str, cache, key, original_filename: str, shown: dict | None = None) -> dict:
+        noticia_json = json.loads(raw)
+        if shown:
+            noticia_json.update(shown)
+        if cache:
+            cache.put(key, noticia_json)
+        noticia_json["archivo_original"] = original_filename
+        return noticia_json
+
+    def write_news(self, transcription: str, original_filename: str,
+                   force: bool = False) -> dict:
+        transcription = self._condense(transcription, original_filename, force)
+        modelo, messages = self._messages(transcription, original_filename)
+        cache, key, cached = self._lookup(modelo, messages, force)
+        if cached is not None:
+            return self._replay(cached, original_filename)
+        if not self.client:
+            raise Exception("OpenAI API Key no configurada.")
+
+        def _call():
+            response = self.client.chat.completions.create(
+                model=modelo,
+                messages=messages,
+                response_format=_RESPONSE_FORMAT,
+            )
+            noticia_json = self._finish(response.choices[0].message.content, cache, key,
+                                        original_filename)
+            log.info("[Writer] Noticia generada correctamente.")
+            return noticia_json
+
+        return self._with_retries(modelo, _call)
+
+    def write_news_stream(self, transcription: str, original_filename: str,
+                          on_field=None, force: bool = False) -> dict:
+        """
+        Como `write_news`, pero en streaming: `on_field(clave, valor)` se llama
+        en cuanto cada campo de primer nivel (titulo, entradilla…) está completo.
+        """
+        transcription = self._condense(transcription, original_filename, force)
+        modelo, messages = self._messages(transcription, original_filename)
+        cache, key, cached = self._lookup(modelo, messages, force)
+        if cached is not None:
+            return self._replay(cached, original_filename, on_field)
+        if not self.client:
+            raise Exception("OpenAI API Key no configurada.")
+        shown = {}  # compartido entre reintentos
+
+        def _call():
+            draft = _StreamedDraft(on_field, shown)
+            stream = self.client.chat.completions.create(
+                model=modelo,
+                messages=messages,
+                response_format=_RESPONSE_FORMAT,
+                stream=True,
+            )
+            for chunk in stream:
+                draft.feed(chunk)
+            return draft.finish(cache, key, original_filename)
+
+        return self._with_retries(modelo, _call)
+
+
+class _StreamedDraft:
+    """
+    Acumula los trozos de una respuesta en streaming y entrega cada campo completo.
+    `shown` (campo → valor ya entregado) se comparte entre reintentos: si el
+    stream se corta y se repite la petición, los campos ya mostrados no se
+    vuelven a entregar (el editor puede estar retocándolos) y el borrador
+    final conserva esos valores.
+    """
+
+    def __init__(self, on_field=None, shown: dict | None = None):
+        self.on_field = on_field
+        self.shown = {} if shown is None else shown
+        self.parser = JsonFieldStream()
+        self.t0 = time.perf_counter()
+        self.first_field_s = None
+
+    def feed(self, chunk):
+        if not chunk.choices:
+            return
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            return
+        for field, value in self.parser.feed(delta):
+            if field in self.shown:
+                log.debug("[Writer] Campo '%s' ya mostrado en un intento anterior", field)
+                continue
+            self.shown[field] = value
+            if self.first_field_s is None:
+                self.first_field_s = time.perf_counter() - self.t0
+                log.info("[Writer] Primer campo ('%s') a los %.2fs", field, self.first_field_s)
+            if self.on_field:
+                self.on_field(field, value)
+
+    def finish(self, cache, key, original_filename: str) -> dict:
+        noticia_json = WriterService._finish(self.parser.text(), cache, key, original_filename,
+                                             self.shown)
+        log.info("[Writer] Noticia generada en streaming: primer campo %s, total %.2fs",
+                 f"{self.first_field_s:.2f}s" if self.first_field_s is not None else "-",
+                 time.perf_counter() - self.t0)
+        return noticia_json
+
+
+class AsyncWriterService(WriterService):
+    """Redacción sobre AsyncOpenAI, para el bucle de core.async_runtime."""
+
+    def __init__(self):
+        super().__init__()
+        self.aclient = (get_async_openai_client(self.api_key).with_options(max_retries=0)
+                        if self.api_key else None)
+
+    async def _with_retries_async(self, modelo: str, call):
+        return await retry_call_async(call, name=f"Writer {modelo}",
+                                      host=self.aclient.base_url.host,
+                                      policy=_RETRY_POLICY, transient=(APIConnectionError,))
+
+    async def _condense_async(self, transcription: str, original_filename: str,
+                              force: bool) -> str:
+        plan = self._condense_plan(transcription)
+        if plan is None:
+            return transcription
+        cfg, modelo, cache = plan
+
+        async def _summarize(index: int, total: int, fragment: str) -> str:
+            messages = self._summary_messages(cfg, index, total, fragment, original_filename)
+            key = LLMCache.key(modelo, messages) if cache else None
+            if cache and not force:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached["resumen"]
+            if not self.aclient:
+                raise Exception("OpenAI API Key no configurada.")
+
+            async def _call():
+                response = await self.aclient.chat.completions.create(model=modelo,
+                                                                      messages=messages)
+                return response.choices[0].message.content or ""
+
+            summary = await self._with_retries_async(modelo, _call)
+            if cache:
+                cache.put(key, {"resumen": summary})
+            return summary
+
+        return await condense_async(transcription, cfg, _summarize)
+
+    async def write_news_stream(self, transcription: str, original_filename: str,
+                                on_field=None, force: bool = False) -> dict:
+        transcription = await self._condense_async(transcription, original_filename, force)
+        modelo, messages = self._messages(transcription, original_filename)
+        cache, key, cached = self._lookup(modelo, messages, force)
+        if cached is not None:
+            return self._replay(cached, original_filename, on_field)
+        if not self.aclient:
+            raise Exception("OpenAI API Key no configurada.")
+        shown = {}  # compartido entre reintentos
+
+        async def _call():
+            draft = _StreamedDraft(on_field, shown)
+            stream = await self.aclient.chat.completions.create(
+                model=modelo,
+                messages=messages,
+                response_format=_RESPONSE_FORMAT,
+                stream=True,
+            )
+            async for chunk in stream:
+                draft.feed(chunk)
+            return draft.finish(cache, key, original_filename)
 
-        last_exc = None
-        for attempt in range(1, _MAX_RETRIES + 1):
-            try:
-                log.info("[Writer] Intento %d/%d - modelo %s", attempt, _MAX_RETRIES, modelo)
-                response = self.client.chat.completions.create(
-                    model=modelo,
-                    messages=messages,
-                    response_format={"type": "json_object"},
-                )
-                noticia_json = json.loads(response.choices[0].message.content)
-                noticia_json["archivo_original"] = original_filename
-                log.info("[Writer] Noticia generada correctamente.")
-                return noticia_json
-            except APIStatusError as e:
-                last_exc = e
-                if e.status_code in _RETRY_CODES and attempt < _MAX_RETRIES:
-                    delay = _BASE_DELAY * (2 ** (attempt - 1))
-                    log.warning("[Writer] HTTP %s, reintentando en %ss...", e.status_code, delay)
-                    time.sleep(delay)
-                else:
-                    raise
-            except APIConnectionError as e:
-                last_exc = e
-                if attempt < _MAX_RETRIES:
-                    delay = _BASE_DELAY * (2 ** (attempt - 1))
-                    log.warning("[Writer] Error de conexión, reintentando en %ss...", delay)
-                    time.sleep(delay)
-                else:
-                    raise
-        raise last_exc
+        return await self._with_retries_async(modelo, _call)
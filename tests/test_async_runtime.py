@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from core import resilience
+from core.async_runtime import BackgroundLoop, bridge_to_tk
+from core.resilience import TransientError, retry_call_async
+
+
+class _FakeWidget:
+    """Ejecuta `after` al momento y avisa de que hubo entrega."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+    def after(self, _ms, func, *args):
+        func(*args)
+        self.done.set()
+
+
+class BackgroundLoopTests(unittest.TestCase):
+    def setUp(self):
+        self.bg = BackgroundLoop(name="asyncio-prueba")
+        self.addCleanup(self.bg.stop)
+
+    def test_network_waits_overlap_on_one_thread(self):
+        threads = set()
+
+        async def job(i):
+            threads.add(threading.get_ident())
+            await asyncio.sleep(0.2)
+            return i
+
+        async def many():
+            return await asyncio.gather(*(job(i) for i in range(20)))
+
+        self.assertEqual(self.bg.submit(many()).result(timeout=2), list(range(20)))
+        self.assertEqual(len(threads), 1)
+
+    def test_bridge_delivers_result_and_error(self):
+        async def ok():
+            return "hecho"
+
+        async def fail():
+            raise ValueError("roto")
+
+        widget, results = _FakeWidget(), []
+        bridge_to_tk(widget, self.bg.submit(ok()), results.append)
+        self.assertTrue(widget.done.wait(2))
+        widget.done.clear()
+        bridge_to_tk(widget, self.bg.submit(fail()), results.append, results.append)
+        self.assertTrue(widget.done.wait(2))
+        self.assertEqual(results[0], "hecho")
+        self.assertIsInstance(results[1], ValueError)
+
+    def test_async_retries_do_not_block_the_loop(self):
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise TransientError("HTTP 503", status_code=503, retry_after=0.05)
+            return "ok"
+
+        with mock.patch.object(resilience, "_breakers", {}):
+            result = self.bg.submit(retry_call_async(flaky, name="t", host="h")).result(timeout=2)
+        self.assertEqual((result, len(calls)), ("ok", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from array import array
+from unittest import mock
+
+import core.audio as audio
+from core.audio import OffsetMap, _samples, find_split_points, rms, speech_spans
+
+# ffmpeg falso: llena stderr (más que el buffer del pipe) antes de escribir el PCM
+_NOISY_FFMPEG = """#!{python}
+import sys
+sys.stderr.write("[aac] error while decoding frame\\n" * 20000)
+sys.stderr.flush()
+sys.stdout.buffer.write(b"\\x00\\x01" * 4000)
+sys.exit({code})
+"""
+
+
+class FindSplitPointsTests(unittest.TestCase):
+    def test_short_audio_is_not_split(self):
+        energies = array("H", [1000] * 100)
+        self.assertEqual(find_split_points(energies, 30, target_s=10), [])
+
+    def test_cuts_land_on_silence(self):
+        # 60 s de "voz" con un silencio de 1 s alrededor del segundo 25
+        frames = [1000] * 2000
+        for i in range(820, 853):
+            frames[i] = 0
+        energies = array("H", frames)
+
+        points = find_split_points(energies, 30, target_s=30, search_s=10)
+
+        self.assertEqual(len(points), 1)
+        self.assertGreaterEqual(points[0], 24.6)
+        self.assertLessEqual(points[0], 25.6)
+
+
+class SpeechSpansTests(unittest.TestCase):
+    def test_long_silence_is_removed_and_short_pause_kept(self):
+        # 10 s voz, 0.6 s pausa, 10 s voz, 20 s silencio, 10 s voz (tramas de 30 ms)
+        frames = [2000] * 333 + [5] * 20 + [2000] * 333 + [5] * 667 + [2000] * 333
+        spans = speech_spans(array("H", frames), 30, min_silence_s=1.5, pad_s=0.3)
+
+        self.assertEqual(len(spans), 2)
+        self.assertAlmostEqual(spans[0][0], 0.0)
+        self.assertGreater(spans[1][0], 40)
+
+    def test_offset_map_restores_original_times(self):
+        offset_map = OffsetMap([(0.0, 10.0), (40.0, 50.0)])
+
+        self.assertEqual(offset_map.kept_seconds, 20.0)
+        self.assertAlmostEqual(offset_map.to_original(5.0), 5.0)
+        self.assertAlmostEqual(offset_map.to_original(12.5), 42.5)
+        self.assertEqual(offset_map.clip(5.0, 45.0).spans, [(0.0, 5.0), (35.0, 40.0)])
+
+
+class RmsTests(unittest.TestCase):
+    def test_rms_of_little_endian_pcm(self):
+        pcm = b"".join(v.to_bytes(2, "little", signed=True) for v in (3000, -3000, 4000, -4000))
+        self.assertEqual(rms(_samples(pcm)), 3535)
+        self.assertEqual(rms(array("h")), 0)
+
+
+@unittest.skipIf(sys.platform == "win32", "ffmpeg falso como script con shebang")
+class IterPcmTests(unittest.TestCase):
+    def _fake_ffmpeg(self, code):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "ffmpeg")
+        with open(path, "w") as f:
+            f.write(_NOISY_FFMPEG.format(python=sys.executable, code=code))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        patcher = mock.patch.object(audio, "ffmpeg_bin", return_value=path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _read_all(self):
+        result = {}
+
+        def run():
+            try:
+                result["pcm"] = b"".join(audio.iter_pcm("dañado.mp4"))
+            except RuntimeError as e:
+                result["error"] = str(e)
+
+        t = threading.Thread(target=run, daemon=True)
+        t.start()
+        t.join(10)
+        self.assertFalse(t.is_alive(), "iter_pcm se bloqueó con stderr lleno")
+        return result
+
+    def test_verbose_stderr_does_not_block_decoding(self):
+        self._fake_ffmpeg(0)
+        self.assertEqual(len(self._read_all()["pcm"]), 8000)
+
+    def test_failure_reports_ffmpeg_errors(self):
+        self._fake_ffmpeg(1)
+        self.assertIn("error while decoding frame", self._read_all()["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from core.audio_cache import CanonicalAudioCache
+
+
+class CanonicalAudioCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+
+    def _wav(self, name, size, mtime):
+        path = os.path.join(self._tmp.name, f"{name}.wav")
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_least_recently_used_are_evicted_first(self):
+        cache = CanonicalAudioCache(max_mb=1, directory=self._tmp.name)
+        old = self._wav("viejo", 600_000, 1000)
+        recent = self._wav("reciente", 600_000, 2000)
+        cache._evict()
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(recent))
+
+    def test_just_created_entry_is_kept(self):
+        cache = CanonicalAudioCache(max_mb=1, directory=self._tmp.name)
+        other = self._wav("otro", 600_000, 2000)
+        fresh = self._wav("nuevo", 1_200_000, 1000)
+        cache._evict(keep=fresh)
+        self.assertTrue(os.path.exists(fresh))
+        self.assertFalse(os.path.exists(other))
+
+    def test_pinned_entry_survives_eviction(self):
+        cache = CanonicalAudioCache(max_mb=1, directory=self._tmp.name)
+        source = os.path.join(self._tmp.name, "fuente.mp3")
+        with open(source, "wb") as f:
+            f.write(b"audio")
+        with cache.pinned(source) as wav:
+            with open(wav, "wb") as f:
+                f.write(b"\0" * 600_000)
+            os.utime(wav, (1000, 1000))
+            recent = self._wav("reciente", 600_000, 2000)
+            cache._evict()
+            self.assertTrue(os.path.exists(wav))
+            self.assertFalse(os.path.exists(recent))
+        self.assertEqual(cache._pins, {})
+
+    def test_key_locks_are_released_after_use(self):
+        cache = CanonicalAudioCache(max_mb=1, directory=self._tmp.name)
+        with cache._key_lock("k"):
+            self.assertIn("k", cache._key_locks)
+        self.assertEqual(cache._key_locks, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
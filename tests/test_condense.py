@@ -0,0 +1,43 @@
+import threading
+import time
+import unittest
+
+from core.condense import condense, needs_condensing, split_transcript
+
+
+class CondenseTests(unittest.TestCase):
+    def test_chunks_are_bounded_and_keep_every_word(self):
+        text = " ".join(f"Frase número {i} del pleno." for i in range(200))
+        chunks = split_transcript(text, max_tokens=50)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(c) <= 200 for c in chunks))
+        self.assertEqual(" ".join(chunks).split(), text.split())
+
+    def test_unpunctuated_text_is_split_by_words(self):
+        text = " ".join(["palabra"] * 1000)  # salida típica de Vosk
+        chunks = split_transcript(text, max_tokens=100)
+        self.assertTrue(all(len(c) <= 400 for c in chunks))
+        self.assertEqual(sum(len(c.split()) for c in chunks), 1000)
+
+    def test_threshold_and_order_of_summaries(self):
+        cfg = {"umbral_tokens": 100, "tramo_tokens": 50, "concurrencia": 3}
+        self.assertFalse(needs_condensing("corto", cfg))
+        self.assertFalse(needs_condensing("x" * 10_000, None))
+        text = " ".join(f"Hecho {i}." for i in range(300))
+        self.assertTrue(needs_condensing(text, cfg))
+
+        threads = set()
+
+        def summarize(index, total, fragment):
+            threads.add(threading.get_ident())
+            time.sleep(0.01 * (total - index))  # los primeros terminan los últimos
+            return f"- resumen {index}"
+
+        result = condense(text, cfg, summarize)
+        positions = [result.index(f"- resumen {i}") for i in range(1, 4)]
+        self.assertEqual(positions, sorted(positions))
+        self.assertGreater(len(threads), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+
+from core.config_store import ConfigError, JsonConfigFile, validate_prompts
+
+
+def _prompts(template="{transcription} {original_filename}"):
+    return {
+        "redaccion": {"system_prompt": "s", "user_prompt_template": template},
+        "verificacion": {"system_prompt": "s", "user_prompt_template": "{titulo} {contenido}"},
+    }
+
+
+class ConfigStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "prompts.json")
+
+    def _write(self, data, mtime):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+        os.utime(self.path, (mtime, mtime))
+
+    def test_unknown_placeholder_is_rejected(self):
+        with self.assertRaises(ConfigError):
+            validate_prompts(_prompts("{transcripcion}"))
+        with self.assertRaises(ConfigError):
+            validate_prompts(_prompts("{transcription"))
+        validate_prompts(_prompts("JSON literal: {{\"a\": 1}} {transcription}"))
+
+    def test_condensation_numbers_must_be_positive_ints(self):
+        data = _prompts()
+        data["condensacion"] = {"system_prompt": "s", "user_prompt_template": "{fragmento}",
+                                "umbral_tokens": 6000, "tramo_tokens": 3000}
+        validate_prompts(data)
+        for key, value in (("concurrencia", 0), ("tramo_tokens", "3000"),
+                           ("umbral_tokens", 1.5), ("concurrencia", True)):
+            bad = {**data, "condensacion": {**data["condensacion"], key: value}}
+            with self.assertRaises(ConfigError, msg=f"{key}={value!r}"):
+                validate_prompts(bad)
+
+    def test_reloads_only_when_file_changes(self):
+        self._write(_prompts(), 1000)
+        store = JsonConfigFile(self.path, validate=validate_prompts)
+        first = store.get()
+        self.assertIs(store.get(), first)
+
+        self._write(_prompts("{transcription}"), 2000)
+        store._checked = 0.0
+        self.assertEqual(store.get()["redaccion"]["user_prompt_template"], "{transcription}")
+
+    def test_invalid_edit_keeps_last_valid_version(self):
+        self._write(_prompts(), 1000)
+        store = JsonConfigFile(self.path, validate=validate_prompts)
+        good = store.get()
+
+        self._write("{ roto", 2000)
+        store._checked = 0.0
+        self.assertIs(store.get(), good)
+
+    def test_save_validates_and_updates_cache(self):
+        self._write(_prompts(), 1000)
+        store = JsonConfigFile(self.path, validate=validate_prompts)
+        with self.assertRaises(ConfigError):
+            store.save(_prompts("{nada}"))
+        store.save(_prompts("{original_filename}"))
+        self.assertEqual(store.get()["redaccion"]["user_prompt_template"], "{original_filename}")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), _prompts("{original_filename}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
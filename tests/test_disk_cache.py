@@ -0,0 +1,40 @@
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import core.disk_cache as disk_cache
+
+
+class DiskCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(disk_cache, "CACHE_DIR", self._tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+
+    def test_hit_and_miss_are_counted(self):
+        cache = disk_cache.DiskCache("t.sqlite3", max_mb=1, max_age_days=1)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "valor")
+        self.assertEqual(cache.get("a"), "valor")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = disk_cache.DiskCache("t.sqlite3", max_mb=0.001, max_age_days=0)
+        cache.put("viejo", "x" * 600)
+        time.sleep(0.01)
+        cache.put("nuevo", "y" * 600)
+        self.assertIsNone(cache.get("viejo"))
+        self.assertEqual(cache.get("nuevo"), "y" * 600)
+
+    def test_expired_entry_is_not_returned(self):
+        cache = disk_cache.DiskCache("t.sqlite3", max_mb=1, max_age_days=1)
+        cache.put("a", "valor")
+        with mock.patch.object(disk_cache.time, "time", return_value=time.time() + 2 * 86400):
+            self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
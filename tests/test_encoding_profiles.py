@@ -0,0 +1,22 @@
+import unittest
+
+from core.encoding_profiles import select_profile
+
+
+class SelectProfileTests(unittest.TestCase):
+    def test_short_speech_uses_preferred_opus_bitrate(self):
+        profile = select_profile(600, "auto")
+        self.assertEqual((profile.codec, profile.bitrate_kbps, profile.extension), ("opus", 24, ".ogg"))
+
+    def test_three_hours_fit_in_one_upload(self):
+        profile = select_profile(3 * 3600, "auto", max_mb=24)
+        self.assertLess(profile.bitrate_kbps, 24)
+        self.assertLessEqual(profile.estimated_mb(3 * 3600), 24)
+
+    def test_mp3_preference_and_unknown_duration(self):
+        profile = select_profile(None, "mp3")
+        self.assertEqual((profile.codec, profile.bitrate_kbps), ("mp3", 64))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import core.disk_cache as disk_cache
+import core.verification as verification
+from core.fact_cache import FactCache, extract_facts, normalize
+
+_RESULT = {
+    "correcciones": [{"original": "Pilar Mirada", "corregido": "Pilar Miranda",
+                      "explicacion": "alcaldesa de Huelva", "fuente": "https://a.es/1",
+                      "fecha_referencia": "3 de marzo de 2025"},
+                     {"original": "ayer", "corregido": "el lunes", "explicacion": "",
+                      "fuente": "https://a.es/1"},
+                     {"original": "3.000", "corregido": "30.000 euros", "explicacion": "dato del pleno",
+                      "fuente": "https://a.es/1"}],
+    "datos_confirmados": [{"entidad": "Diputación de Huelva", "dato": "institución provincial",
+                           "fuente": "https://b.es/2"}],
+    "fuentes_consultadas": ["https://a.es/1", "https://b.es/2"],
+}
+
+
+class FactCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = mock.patch.object(disk_cache, "CACHE_DIR", self._tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_sourced_facts_and_proper_name_corrections_are_extracted(self):
+        facts = extract_facts(_RESULT)
+        self.assertEqual(set(facts), {"pilar miranda", "pilar mirada", "diputacion de huelva"})
+        self.assertEqual(facts["pilar mirada"]["forma_erronea"], "Pilar Mirada")
+        self.assertEqual(facts["pilar miranda"]["dato"], "")  # la explicación no es un cargo
+        self.assertEqual(facts["diputacion de huelva"]["dato"], "institución provincial")
+
+    def test_cached_facts_match_regardless_of_accents_and_markup(self):
+        cache = FactCache()
+        cache.remember(_RESULT)
+        known = cache.known({"titulo": "La diputacion de HUELVA invierte",
+                             "contenido": "<p>Según <b>Pilar Miranda</b>, …</p>",
+                             "etiquetas": ["Huelva"]})
+        self.assertEqual(set(known), {"diputacion de huelva", "pilar miranda"})
+        self.assertEqual(normalize("José  Pérez,"), "jose perez")
+
+    def test_verification_annotates_known_facts_and_learns_new_ones(self):
+        with mock.patch.object(verification, "load_settings", return_value={}), \
+             mock.patch.object(verification, "prompt", return_value={
+                 "system_prompt": "s",
+                 "user_prompt_template": "{titulo} {entradilla} {contenido} {etiquetas}"}):
+            service = verification.VerificationService()
+            sent = []
+
+            def create(**kwargs):
+                sent.append(kwargs["messages"][1]["content"])
+                content = json.dumps(_RESULT if len(sent) == 1 else {"correcciones": []})
+                return SimpleNamespace(choices=[SimpleNamespace(
+                    message=SimpleNamespace(content=content, annotations=None))])
+
+            service.client = SimpleNamespace(
+                chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+                base_url=SimpleNamespace(host="api.prueba"))
+            news = {"titulo": "Pilar Mirada visita la Diputación de Huelva", "contenido": ""}
+            service.verify(news)
+            service.verify(news)
+
+        self.assertNotIn("DATOS YA VERIFICADOS", sent[0])
+        self.assertIn("«Pilar Miranda» (no «Pilar Mirada»)", sent[1])
+        self.assertIn("«Diputación de Huelva»", sent[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import core.disk_cache as disk_cache
+
+from core.progress import TranscriptionProgress
+from core.transcript import Transcript
+from core.transcription import TranscriptionService
+
+
+class _FakeService(TranscriptionService):
+    def __init__(self, whisper, vosk, deadline_s=1):
+        super().__init__({"whisper_plazo_segundos": deadline_s})
+        self._whisper = whisper
+        self._vosk = vosk
+        self.vosk_started = threading.Event()
+
+    def transcribe_with_whisper(self, input_file, progress=None):
+        return Transcript(self._whisper(progress))
+
+    def transcribe_with_vosk(self, input_file, progress=None):
+        self.vosk_started.set()
+        return Transcript(self._vosk(progress))
+
+
+def _wait_cancel(progress):
+    while not progress.cancelled:
+        time.sleep(0.01)
+    progress.check()
+
+
+def _run(svc):
+    transcript, motor = svc._transcribe_hedged("x.mp3", TranscriptionProgress())
+    return transcript.text, motor
+
+
+class HedgedTranscriptionTests(unittest.TestCase):
+    def test_fast_whisper_wins_without_starting_vosk(self):
+        svc = _FakeService(lambda p: "whisper", lambda p: "vosk", deadline_s=30)
+        self.assertEqual(_run(svc), ("whisper", "Whisper"))
+        self.assertFalse(svc.vosk_started.is_set())
+
+    def test_whisper_error_falls_back_to_vosk(self):
+        def failing(progress):
+            raise RuntimeError("503")
+
+        svc = _FakeService(failing, lambda p: "vosk", deadline_s=30)
+        self.assertEqual(_run(svc), ("vosk", "Vosk"))
+
+    def test_slow_whisper_loses_and_is_cancelled(self):
+        cancelled = threading.Event()
+
+        def slow(progress):
+            try:
+                _wait_cancel(progress)
+            finally:
+                cancelled.set()
+
+        svc = _FakeService(slow, lambda p: "vosk", deadline_s=1)
+        self.assertEqual(_run(svc), ("vosk", "Vosk"))
+        self.assertTrue(cancelled.wait(2))
+
+    def test_both_engines_failing_raises(self):
+        def failing(progress):
+            raise RuntimeError("caído")
+
+        svc = _FakeService(failing, failing)
+        with self.assertRaises(RuntimeError):
+            _run(svc)
+
+    def test_cached_vosk_fallback_is_not_served_once_whisper_is_back(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = os.path.join(tmp.name, "a.mp3")
+        with open(media, "wb") as f:
+            f.write(b"audio")
+        whisper_up = False
+
+        def whisper(progress):
+            if not whisper_up:
+                raise RuntimeError("503")
+            return "whisper"
+
+        with mock.patch.object(disk_cache, "CACHE_DIR", tmp.name):
+            svc = _FakeService(whisper, lambda p: "vosk", deadline_s=30)
+            svc.api_key = "sk-prueba"
+            svc._hedging_enabled = lambda: True
+            self.assertEqual(svc.transcribe(media), ("vosk", "Vosk"))
+            whisper_up = True
+            self.assertEqual(svc.transcribe(media), ("whisper", "Whisper"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import http.server
+import threading
+import unittest
+from unittest import mock
+
+from core import http_clients
+
+
+class _OkHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class SharedClientsTests(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(http_clients.close_all)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def test_one_session_per_host_reuses_its_connection(self):
+        session = http_clients.get_session(self.url + "wp-json/wp/v2")
+        self.assertIs(http_clients.get_session(self.url + "otra/ruta"), session)
+        for _ in range(3):
+            session.get(self.url, timeout=5)
+        pools = session.get_adapter(self.url).poolmanager.pools
+        pool = pools[next(iter(pools.keys()))]
+        self.assertEqual((pool.num_connections, pool.num_requests), (1, 3))
+
+    def test_openai_client_is_shared_per_key(self):
+        client = http_clients.get_openai_client("sk-prueba")
+        self.assertIs(http_clients.get_openai_client("sk-prueba"), client)
+        self.assertIsNot(http_clients.get_openai_client("sk-otra"), client)
+
+    def test_openai_client_is_built_once_per_key(self):
+        with mock.patch.object(http_clients, "OpenAI", side_effect=lambda **kw: mock.Mock()) as openai:
+            first = http_clients.get_openai_client("sk-a")
+            self.assertIs(http_clients.get_openai_client("sk-a"), first)
+            self.assertEqual(openai.call_count, 1)
+            self.assertIsNot(http_clients.get_openai_client("sk-b"), first)
+            self.assertEqual([c.kwargs["api_key"] for c in openai.call_args_list], ["sk-a", "sk-b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
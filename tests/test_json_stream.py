@@ -0,0 +1,39 @@
+import json
+import unittest
+
+from core.json_stream import JsonFieldStream
+
+
+class JsonFieldStreamTests(unittest.TestCase):
+    def test_fields_are_emitted_as_soon_as_they_complete(self):
+        doc = {
+            "titulo": "El \"pleno\" aprueba {todo}",
+            "entradilla": "Línea\ncon salto",
+            "contenido": "<p>Uno, dos</p>",
+            "etiquetas": ["Huelva", "pleno [extra]"],
+            "n": 3,
+            "ok": True,
+        }
+        raw = json.dumps(doc, ensure_ascii=False, indent=2)
+        keys = list(doc)
+        parser = JsonFieldStream()
+        seen = []
+        for ch in raw:
+            for key, value in parser.feed(ch):
+                seen.append(key)
+                self.assertEqual(value, doc[key])
+                # Las cadenas, listas y objetos se entregan antes de ver el separador
+                if len(seen) < len(keys) and key != "n":
+                    self.assertFalse(parser.text().rstrip().endswith(","))
+        self.assertEqual(seen, keys)
+        self.assertTrue(parser.done)
+        self.assertEqual(json.loads(parser.text()), doc)
+
+    def test_incomplete_value_is_not_emitted(self):
+        parser = JsonFieldStream()
+        self.assertEqual(parser.feed('{"titulo": "a medi'), [])
+        self.assertEqual(parser.feed('as", "etiq'), [("titulo", "a medias")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import core.disk_cache as disk_cache
+import core.writer as writer
+from core.resilience import RetryPolicy
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        content = json.dumps({"titulo": f"Título {self.calls}", "etiquetas": ["a"]})
+        if kwargs.get("stream"):
+            return iter(SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=ch))])
+                        for ch in content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class WriterCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        for patcher in (
+            mock.patch.object(disk_cache, "CACHE_DIR", self._tmp.name),
+            mock.patch.object(writer, "load_settings", return_value={"cache_redaccion": True}),
+            mock.patch.object(writer, "prompt", return_value={
+                "system_prompt": "s", "user_prompt_template": "{transcription} {original_filename}"}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.service = writer.WriterService()
+        self.completions = _FakeCompletions()
+        self.service.client = SimpleNamespace(chat=SimpleNamespace(completions=self.completions),
+                                              base_url=SimpleNamespace(host="api.prueba"))
+
+    def test_identical_request_is_served_from_cache(self):
+        first = self.service.write_news("texto", "a.mp4")
+        second = self.service.write_news("texto", "a.mp4")
+        self.assertEqual(first, second)
+        self.assertEqual(second["archivo_original"], "a.mp4")
+        self.assertEqual(self.completions.calls, 1)
+
+        self.service.write_news("otro texto", "a.mp4")
+        self.assertEqual(self.completions.calls, 2)
+
+    def test_force_bypasses_and_refreshes_cache(self):
+        self.service.write_news("texto", "a.mp4")
+        forced = self.service.write_news("texto", "a.mp4", force=True)
+        self.assertEqual(forced["titulo"], "Título 2")
+        fields = []
+        again = self.service.write_news_stream("texto", "a.mp4",
+                                               on_field=lambda k, v: fields.append(k))
+        self.assertEqual(again["titulo"], "Título 2")
+        self.assertEqual(fields, ["titulo", "etiquetas"])
+        self.assertEqual(self.completions.calls, 2)
+
+    def test_streamed_draft_is_cached_under_its_request(self):
+        streamed = self.service.write_news_stream("texto", "a.mp4")
+        self.assertEqual(self.service.write_news("texto", "a.mp4"), streamed)
+        self.assertEqual(self.completions.calls, 1)
+
+    def test_retry_after_cut_stream_does_not_reemit_shown_fields(self):
+        create = self.completions.create
+
+        def cut_first_stream(**kwargs):
+            chunks = create(**kwargs)
+            if self.completions.calls > 1:
+                return chunks
+            prefix = list(chunks)[:len('{"titulo": "Título 1", "etiq')]
+
+            def broken():
+                yield from prefix
+                raise writer.APIConnectionError(request=mock.Mock())
+            return broken()
+
+        self.completions.create = cut_first_stream
+        fields = []
+        with mock.patch.object(writer, "_RETRY_POLICY", RetryPolicy(attempts=2, base_delay=0)):
+            draft = self.service.write_news_stream("texto", "a.mp4",
+                                                   on_field=lambda k, v: fields.append((k, v)))
+        self.assertEqual(fields, [("titulo", "Título 1"), ("etiquetas", ["a"])])
+        self.assertEqual(draft["titulo"], "Título 1")  # lo que el editor ya tiene en pantalla
+        self.assertEqual(self.completions.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
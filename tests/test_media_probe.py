@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+import core.media_probe as media_probe
+
+_FFPROBE_OUTPUT = {
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "125.4"},
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264"},
+        {"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000",
+         "channels": 2, "bit_rate": "128000"},
+    ],
+}
+
+
+class ProbeTests(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".mp4")
+        os.write(fd, b"x" * 10)
+        os.close(fd)
+        self.addCleanup(os.unlink, self.path)
+
+    def _completed(self, payload):
+        return subprocess.CompletedProcess([], 0, stdout=json.dumps(payload).encode(), stderr=b"")
+
+    def test_probe_parses_streams_and_is_cached(self):
+        with mock.patch.object(media_probe.subprocess, "run",
+                               return_value=self._completed(_FFPROBE_OUTPUT)) as run:
+            info = media_probe.probe(self.path)
+            again = media_probe.probe(self.path)
+
+        self.assertIs(info, again)
+        self.assertEqual(run.call_count, 1)
+        self.assertAlmostEqual(info.duration, 125.4)
+        self.assertEqual(info.audio_codec, "aac")
+        self.assertEqual(info.sample_rate, 48000)
+        self.assertEqual(info.channels, 2)
+        self.assertTrue(info.has_video)
+
+    def test_cover_art_is_not_video(self):
+        payload = {
+            "format": {"format_name": "mp3", "duration": "60"},
+            "streams": [
+                {"codec_type": "audio", "codec_name": "mp3"},
+                {"codec_type": "video", "codec_name": "mjpeg", "disposition": {"attached_pic": 1}},
+            ],
+        }
+        with mock.patch.object(media_probe.subprocess, "run", return_value=self._completed(payload)):
+            info = media_probe.probe(self.path)
+        self.assertFalse(info.has_video)
+
+    def test_missing_duration_means_incomplete(self):
+        with mock.patch.object(media_probe.subprocess, "run",
+                               return_value=self._completed({"format": {}, "streams": []})):
+            with self.assertRaises(media_probe.ProbeError):
+                media_probe.probe(self.path)
+
+    def test_cache_keeps_only_the_most_recent_probes(self):
+        other = self.path + ".otro.mp4"
+        with open(other, "wb") as f:
+            f.write(b"y" * 20)
+        self.addCleanup(os.unlink, other)
+        with mock.patch.object(media_probe, "_cache", OrderedDict()), \
+             mock.patch.object(media_probe, "_MAX_CACHED", 1), \
+             mock.patch.object(media_probe.subprocess, "run",
+                               return_value=self._completed(_FFPROBE_OUTPUT)) as run:
+            media_probe.probe(self.path)
+            media_probe.probe(other)
+            self.assertEqual([key[0] for key in media_probe._cache], [os.path.abspath(other)])
+            media_probe.probe(self.path)  # olvidado: se vuelve a sondear
+        self.assertEqual(run.call_count, 3)
+
+    def test_timeout_is_passed_to_ffprobe(self):
+        with mock.patch.object(media_probe.subprocess, "run",
+                               side_effect=subprocess.TimeoutExpired("ffprobe", 5)) as run:
+            with self.assertRaises(media_probe.ProbeError):
+                media_probe.probe(self.path, timeout=5)
+        self.assertEqual(run.call_args.kwargs["timeout"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import threading
+import unittest
+from unittest import mock
+
+import vosk
+
+from core import model_registry
+
+
+class VoskModelRegistryTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(model_registry, "_models", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.model_cls = mock.patch.object(vosk, "Model", side_effect=lambda path: object()).start()
+        mock.patch.object(vosk, "SetLogLevel").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_model_is_loaded_once_and_shared(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(model_registry.get_vosk_model("/m/es")))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.model_cls.call_count, 1)
+        self.assertTrue(all(model is results[0] for model in results))
+
+    def test_another_model_path_loads_another_model(self):
+        first = model_registry.get_vosk_model("/m/es")
+        other = model_registry.get_vosk_model("/m/es-grande")
+        self.assertIsNot(first, other)
+        self.assertIs(model_registry.get_vosk_model("/m/es"), first)
+        self.assertEqual([c.args for c in self.model_cls.call_args_list], [("/m/es",), ("/m/es-grande",)])
+
+    def test_missing_model_is_reported(self):
+        with mock.patch.object(model_registry, "find_vosk_model_path", return_value=None):
+            with self.assertRaises(Exception):
+                model_registry.get_vosk_model()
+        self.model_cls.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
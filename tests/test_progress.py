@@ -0,0 +1,54 @@
+import threading
+import unittest
+
+from core.progress import TranscriptionCancelled, TranscriptionProgress
+
+
+class TranscriptionProgressTests(unittest.TestCase):
+    def test_cancelling_the_parent_stops_every_child(self):
+        parent = TranscriptionProgress(cancel_event=threading.Event())
+        whisper, vosk = parent.child(), parent.child()
+        whisper.check()
+        vosk.check()
+
+        parent.cancel_event.set()
+        for child in (whisper, vosk):
+            self.assertTrue(child.cancelled)
+            with self.assertRaises(TranscriptionCancelled):
+                child.check()
+
+    def test_cancelling_a_child_leaves_parent_and_siblings_running(self):
+        parent = TranscriptionProgress()
+        loser, winner = parent.child(), parent.child()
+        loser.cancel_event.set()
+
+        with self.assertRaises(TranscriptionCancelled):
+            loser.check()
+        winner.check()
+        parent.check()
+        self.assertFalse(parent.cancelled)
+
+    def test_percentages_are_clamped_and_reach_the_root_callback(self):
+        reports = []
+        root = TranscriptionProgress(lambda percent, partial: reports.append((percent, partial)))
+        grandchild = root.child().child()
+
+        grandchild.report(130.0, "de más")
+        grandchild.report(-5.0, "")
+        grandchild.report(None, "subiendo")
+        root.report(42.5, "x" * 1000)
+
+        self.assertEqual(reports[:3], [(100.0, "de más"), (0.0, ""), (None, "subiendo")])
+        self.assertEqual(reports[3][0], 42.5)
+        self.assertEqual(len(reports[3][1]), 300)  # solo la cola del texto parcial
+
+    def test_failing_callback_does_not_abort_the_transcription(self):
+        def broken(_percent, _partial):
+            raise RuntimeError("ventana cerrada")
+
+        TranscriptionProgress(broken).child().report(50, "texto")
+        TranscriptionProgress().report(50, "sin callback")
+
+
+if __name__ == "__main__":
+    unittest.main()
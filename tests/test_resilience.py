@@ -0,0 +1,109 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from core import resilience
+from core.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    TransientError,
+    parse_retry_after,
+    retry_call,
+    retry_call_async,
+)
+
+
+class _Flaky:
+    def __init__(self, failures, retry_after=None):
+        self.failures = failures
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TransientError("HTTP 503", status_code=503, retry_after=self.retry_after)
+        return "ok"
+
+
+class RetryTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(resilience, "_breakers", {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sleep = mock.patch.object(resilience.time, "sleep")
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_retry_after_is_honoured(self):
+        func = _Flaky(failures=1, retry_after=7)
+        self.assertEqual(retry_call(func, name="t", host="h"), "ok")
+        self.sleep.assert_called_once_with(7)
+        self.assertEqual(parse_retry_after({"retry-after": "3"}), 3.0)
+        self.assertEqual(parse_retry_after({"retry-after-ms": "250"}), 0.25)
+
+    def test_backoff_is_jittered_and_bounded(self):
+        retry_call(_Flaky(failures=2), name="t", host="h", policy=RetryPolicy(base_delay=1))
+        delays = [c.args[0] for c in self.sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0 <= delays[0] <= 2 and 0 <= delays[1] <= 4)
+
+    def test_wait_beyond_deadline_fails_fast(self):
+        func = _Flaky(failures=5, retry_after=60)
+        with self.assertRaises(TransientError):
+            retry_call(func, name="t", host="h", policy=RetryPolicy(deadline=10))
+        self.assertEqual(func.calls, 1)
+        self.sleep.assert_not_called()
+
+    def test_non_transient_errors_are_not_retried(self):
+        def bad_request():
+            raise ValueError("400")
+        with self.assertRaises(ValueError):
+            retry_call(bad_request, name="t", host="h")
+        self.assertEqual(resilience.get_breaker("h").state, CircuitBreaker.CLOSED)
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_opens_fails_fast_and_recovers_after_probe(self):
+        breaker = CircuitBreaker("h", failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        breaker.before_call()  # llamada de prueba
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()  # solo una prueba a la vez
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.before_call()
+
+    def test_cancelled_probe_does_not_block_later_calls(self):
+        breaker = CircuitBreaker("h", failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def probe_and_cancel():
+            task = asyncio.create_task(retry_call_async(hang, name="t", host="h"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with mock.patch.object(resilience, "_breakers", {"h": breaker}):
+            asyncio.run(probe_and_cancel())
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertEqual(retry_call(lambda: "ok", name="t", host="h"), "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
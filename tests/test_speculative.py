@@ -0,0 +1,45 @@
+import unittest
+from concurrent.futures import Future
+
+from core.speculative import SpeculativeVerifier, draft_fingerprint
+
+_DRAFT = {"titulo": "T", "entradilla": "E", "contenido": "<p>C</p>", "etiquetas": ["a"]}
+
+
+class SpeculativeVerifierTests(unittest.TestCase):
+    def setUp(self):
+        self.submitted = []
+
+        def submit(news_data):
+            fut = Future()
+            self.submitted.append((news_data, fut))
+            return fut
+
+        self.verifier = SpeculativeVerifier(submit)
+
+    def test_unchanged_draft_reuses_speculative_result(self):
+        fut = self.verifier.start(dict(_DRAFT))
+        fut.set_result({"correcciones": []})
+        same = {**_DRAFT, "archivo_original": "a.mp4"}  # campos no verificados no cuentan
+        self.assertIs(self.verifier.result_for(same), fut)
+        self.assertEqual(len(self.submitted), 1)
+
+    def test_edited_draft_discards_stale_result(self):
+        stale = self.verifier.start(dict(_DRAFT))
+        fresh = self.verifier.result_for({**_DRAFT, "titulo": "T editado"})
+        self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.cancelled())
+        self.assertEqual(len(self.submitted), 2)
+
+    def test_failed_speculation_is_retried(self):
+        self.verifier.start(dict(_DRAFT)).set_exception(RuntimeError("503"))
+        self.verifier.result_for(dict(_DRAFT))
+        self.assertEqual(len(self.submitted), 2)
+
+    def test_fingerprint_ignores_key_order(self):
+        reordered = dict(reversed(list(_DRAFT.items())))
+        self.assertEqual(draft_fingerprint(reordered), draft_fingerprint(_DRAFT))
+
+
+if __name__ == "__main__":
+    unittest.main()
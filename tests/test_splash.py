@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import ui.splash as splash
+from tests.test_smoke import _DummySplash
+
+
+class _Clock:
+    """Reloj falso: cada `sleep` avanza el tiempo sin esperar."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class WaitStableTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        if splash.Mp3Handler is None:
+            splash.load_resources(_DummySplash())
+        if splash.Mp3Handler is None:
+            raise unittest.SkipTest("watchdog no instalado")
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".mp4")
+        os.write(fd, b"x" * 10)
+        os.close(fd)
+        self.addCleanup(os.unlink, self.path)
+        self.accepted = []
+        self.handler = splash.Mp3Handler(self.accepted.append)
+        self.clock = _Clock()
+        for name in ("monotonic", "sleep"):
+            patcher = mock.patch.object(splash.time, name, getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(splash, "_start_ingest")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_probed_file_is_accepted_once_its_size_is_stable(self):
+        with mock.patch.object(splash, "_media_ready", return_value=True) as ready:
+            self.handler._wait_stable(self.path)
+        self.assertEqual(self.accepted, [self.path])
+        self.assertEqual(ready.call_count, 1)
+        self.assertLessEqual(self.clock.now, 2)
+
+    def test_probe_is_not_retried_after_it_fails(self):
+        with mock.patch.object(splash, "_media_ready", return_value=False) as ready:
+            self.handler._wait_stable(self.path)
+        self.assertEqual(self.accepted, [self.path])
+        self.assertEqual(ready.call_count, 1)
+        self.assertLessEqual(self.clock.now, 2 + splash._STABLE_WITHOUT_PROBE_S)
+
+    def test_growing_file_is_discarded_at_the_deadline(self):
+        def grow(_seconds):
+            self.clock.now += 1
+            with open(self.path, "ab") as f:
+                f.write(b"x")
+
+        with mock.patch.object(splash.time, "sleep", grow), \
+             mock.patch.object(splash, "_media_ready") as ready:
+            self.handler._wait_stable(self.path)
+        self.assertEqual(self.accepted, [])
+        ready.assert_not_called()
+        self.assertEqual(self.clock.now, splash._STABLE_WAIT_S)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import pickle
+import unittest
+
+from core.transcript import Transcript
+from core.whisper_chunks import merge_transcripts
+
+
+def _make(words, text=None):
+    t = Transcript(text if text is not None else " ".join(w for w, _, _ in words))
+    for w, start, end in words:
+        t.add_word(w, start, end, 0.5 if w == "pleno" else 0.9)
+    return t
+
+
+class TranscriptTests(unittest.TestCase):
+    def test_vocab_is_shared_between_repeated_words(self):
+        t = _make([("el", 0, 1), ("pleno", 1, 2), ("el", 2, 3)])
+        self.assertEqual(len(t), 3)
+        self.assertEqual(t.vocab, ["el", "pleno"])
+        self.assertEqual([w for w, *_ in t.words()], ["el", "pleno", "el"])
+        self.assertEqual(t.low_confidence(0.6), [1])
+
+    def test_roundtrip_through_json_and_pickle(self):
+        t = _make([("hola", 0.25, 0.5), ("mundo", 0.5, 1.0)])
+        for restored in (Transcript.from_dict(json.loads(json.dumps(t.to_dict()))),
+                         pickle.loads(pickle.dumps(t))):
+            self.assertEqual(restored.text, t.text)
+            self.assertEqual(list(restored.words()), list(t.words()))
+
+    def test_legacy_text_only_entry(self):
+        t = Transcript.from_dict({"text": "solo texto"})
+        self.assertEqual((t.text, len(t)), ("solo texto", 0))
+
+    def test_map_times_shifts_copy(self):
+        t = _make([("hola", 1.0, 2.0)])
+        shifted = t.map_times(lambda x: x + 10)
+        self.assertEqual((shifted.starts[0], shifted.ends[0]), (11.0, 12.0))
+        self.assertEqual(t.starts[0], 1.0)
+
+
+class MergeTranscriptsTests(unittest.TestCase):
+    def test_words_are_cut_at_overlap_midpoint(self):
+        windows = [(0.0, 12.0), (8.0, 12.0)]  # solape 8-12, corte en 10
+        a = _make([("uno", 1, 2), ("dos", 9, 9.5), ("tres", 10.5, 11)])
+        b = _make([("dos", 9.1, 9.6), ("tres", 10.4, 11), ("cuatro", 15, 16)])
+        merged = merge_transcripts([a, b], windows)
+        self.assertEqual([w for w, *_ in merged.words()], ["uno", "dos", "tres", "cuatro"])
+        self.assertEqual(merged.text, "uno dos tres cuatro")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import subprocess
+import unittest
+from array import array
+from unittest import mock
+
+import core.transcription as transcription
+from core.media_probe import MediaInfo
+from core.transcription import TranscriptionService
+
+
+def _info(codec="aac", bitrate=128000, duration=600.0, video="h264", size=50 * 1024 * 1024):
+    return MediaInfo(path="clip.mp4", size=size, duration=duration, format_name="mov,mp4",
+                     audio_codec=codec, sample_rate=48000, channels=2,
+                     audio_bitrate=bitrate, video_codec=video)
+
+
+class TrimPlanTests(unittest.TestCase):
+    def test_silent_recording_is_not_trimmed_to_nothing(self):
+        service = TranscriptionService({})
+        self.assertIsNone(service._trim_plan(array("H", [0] * 2000)))
+        self.assertIsNone(service._trim_plan(array("H", [40] * 2000)))
+
+    def test_long_silences_are_trimmed(self):
+        # 20 s de voz, 40 s de silencio, 20 s de voz (tramas de 30 ms)
+        energies = array("H", [2000] * 667 + [5] * 1333 + [2000] * 667)
+        offset_map = TranscriptionService({})._trim_plan(energies)
+        self.assertEqual(len(offset_map.spans), 2)
+        self.assertLess(offset_map.kept_seconds, 45)
+        self.assertIsNone(TranscriptionService({"recorte_silencios": False})._trim_plan(energies))
+
+
+class ExtractCopyTests(unittest.TestCase):
+    def setUp(self):
+        self.service = TranscriptionService({"cache_audio": False})
+        self.calls = []
+        self.output = b"a" * 1000
+        patcher = mock.patch.object(transcription, "run_ffmpeg", side_effect=self._fake_ffmpeg)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fake_ffmpeg(self, args, stdin_chunks=None, stdout=None):
+        self.calls.append(args)
+        if stdout is not None:
+            stdout.write(self.output)
+        else:
+            with open(args[-1], "wb") as f:
+                f.write(self.output)
+        return len(self.output)
+
+    def _copy(self, info):
+        copied = self.service._extract_copy("clip.mp4", info)
+        if copied is not None:
+            self.addCleanup(copied.close)
+        return copied
+
+    def test_without_probe_or_with_unsupported_codec_nothing_is_copied(self):
+        self.assertIsNone(self._copy(None))
+        self.assertIsNone(self._copy(_info(codec="pcm_s16le")))
+        self.assertIsNone(self._copy(_info(codec=None)))
+        self.assertEqual(self.calls, [])
+
+    def test_copy_estimated_over_the_limit_is_skipped(self):
+        # 320 kbps durante 20 min ≈ 45 MB
+        self.assertIsNone(self._copy(_info(codec="mp3", bitrate=320000, duration=1200)))
+        self.assertEqual(self.calls, [])
+
+    def test_mp3_track_is_copied_through_a_pipe_into_memory(self):
+        copied = self._copy(_info(codec="mp3"))
+        self.assertTrue(copied.in_memory)
+        self.assertEqual(copied.filename, "audio.mp3")
+        self.assertEqual(self.calls[0][:8],
+                         ["-i", "clip.mp4", "-vn", "-map", "0:a:0", "-c:a", "copy", "-f"])
+        self.assertEqual(self.calls[0][-2:], ["mp3", "pipe:1"])
+
+    def test_aac_track_is_copied_to_a_seekable_m4a_file(self):
+        copied = self._copy(_info(codec="aac"))
+        self.assertIsNone(copied.buffer)
+        self.assertTrue(copied.path.endswith(".m4a"))
+        self.assertEqual(self.calls[0][-2:], ["-y", copied.path])
+        path = copied.path
+        copied.close()
+        self.assertFalse(os.path.exists(path))
+
+    def test_failed_copy_falls_back_without_leaking_the_temp_file(self):
+        paths = []
+
+        def fail(args, stdin_chunks=None, stdout=None):
+            paths.append(args[-1])
+            raise subprocess.CalledProcessError(1, args, stderr=b"Invalid data")
+
+        with mock.patch.object(transcription, "run_ffmpeg", side_effect=fail):
+            self.assertIsNone(self._copy(_info(codec="aac")))
+        self.assertFalse(os.path.exists(paths[0]))
+
+    def test_copy_larger_than_the_limit_is_discarded(self):
+        self.output = b"a" * (2 * 1024 * 1024)
+        with mock.patch.object(transcription, "_WHISPER_MAX_MB", 1):
+            self.assertIsNone(self._copy(_info(codec="mp3", bitrate=None)))
+
+    def test_video_is_reencoded_when_the_copy_is_not_possible(self):
+        encoded = mock.Mock(size_mb=1.0, in_memory=True)
+        with mock.patch.object(self.service, "_extract_copy", return_value=None), \
+             mock.patch.object(self.service, "_encode_audio", return_value=encoded) as encode, \
+             mock.patch.object(transcription.os.path, "getsize", return_value=10 * 1024 * 1024):
+            prepared = self.service._prepare_for_whisper("clip.mp4", _info(codec="pcm_s16le"))
+        self.assertIs(prepared, encoded)
+        self.assertEqual(encode.call_args.args[0], "clip.mp4")
+
+    def test_supported_audio_is_uploaded_as_is(self):
+        info = _info(codec="mp3", video=None, size=5 * 1024 * 1024)
+        with mock.patch.object(self.service, "_extract_copy") as copy, \
+             mock.patch.object(transcription.os.path, "getsize", return_value=info.size):
+            prepared = self.service._prepare_for_whisper("nota.mp3", info)
+        self.assertEqual(prepared.path, "nota.mp3")
+        copy.assert_not_called()
+
+
+class UploadSizeTests(unittest.TestCase):
+    def test_profile_estimate_decides_if_one_upload_is_enough(self):
+        service = TranscriptionService({})
+        self.assertTrue(service._fits_one_upload(3 * 3600))
+        self.assertFalse(service._fits_one_upload(6 * 3600))  # ni a 12 kbps cabe en 24 MB
+
+    def test_audio_too_long_for_one_upload_is_chunked_even_if_disabled(self):
+        service = TranscriptionService({"whisper_troceado": False, "recorte_silencios": False,
+                                        "cache_audio": False})
+        hours = 6 * 3600
+        energies = array("H", [1000] * int(hours * 1000 / 30))
+        with mock.patch.object(transcription, "try_probe", return_value=_info(duration=hours)), \
+             mock.patch.object(transcription, "scan_energy", return_value=energies), \
+             mock.patch.object(service, "_transcribe_whisper_chunked",
+                               return_value="troceada") as chunked, \
+             mock.patch.object(service, "_prepare_for_whisper") as prepare:
+            self.assertEqual(service.transcribe_with_whisper("pleno.mp4"), "troceada")
+        prepare.assert_not_called()
+        windows = chunked.call_args.args[1]
+        self.assertGreater(len(windows), 1)
+        self.assertTrue(all(service._fits_one_upload(dur) for _, dur in windows))
+
+
+if __name__ == "__main__":
+    unittest.main()
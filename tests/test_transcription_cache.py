@@ -0,0 +1,48 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+import core.transcription_cache as transcription_cache
+from core.transcription_cache import content_hash
+
+
+class ContentHashTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = mock.patch.object(transcription_cache, "_digests", OrderedDict())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _file(self, name, data):
+        path = os.path.join(self._tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_digest_is_memoized_until_the_file_changes(self):
+        path = self._file("a.mp4", b"uno")
+        self.assertEqual(content_hash(path), hashlib.sha256(b"uno").hexdigest())
+        with mock.patch("builtins.open", side_effect=AssertionError("releído")):
+            content_hash(path)
+
+        with open(path, "wb") as f:
+            f.write(b"otro contenido")
+        self.assertEqual(content_hash(path), hashlib.sha256(b"otro contenido").hexdigest())
+
+    def test_memo_keeps_only_the_most_recently_used_digests(self):
+        paths = [self._file(f"{i}.mp4", bytes([i])) for i in range(3)]
+        with mock.patch.object(transcription_cache, "_MAX_DIGESTS", 2):
+            content_hash(paths[0])
+            content_hash(paths[1])
+            content_hash(paths[0])  # vuelve a ser el más reciente
+            content_hash(paths[2])
+        remembered = [key[0] for key in transcription_cache._digests]
+        self.assertEqual(remembered, [os.path.abspath(paths[0]), os.path.abspath(paths[2])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import core.upload_audio as upload_audio
+from core.upload_audio import UploadAudio, record_memory_upload
+
+
+class UploadAudioTests(unittest.TestCase):
+    def setUp(self):
+        for name, value in (("_bytes_saved", 0), ("_seconds_saved", 0.0)):
+            patcher = mock.patch.object(upload_audio, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _memory(self, data, max_mb=1):
+        audio = UploadAudio.memory(".ogg", max_mb)
+        self.addCleanup(audio.close)
+        audio.buffer.write(data)
+        return audio
+
+    def test_memory_buffer_stays_in_memory_up_to_the_limit(self):
+        audio = self._memory(b"a" * 1024 * 1024)
+        self.assertEqual(audio.filename, "audio.ogg")
+        self.assertEqual(audio.max_bytes, 1024 * 1024)
+        self.assertFalse(audio.buffer._rolled)
+        self.assertTrue(audio.in_memory)
+        self.assertEqual(audio.size, 1024 * 1024)
+
+    def test_buffer_spills_to_disk_past_the_limit(self):
+        audio = self._memory(b"a" * (1024 * 1024 + 1))
+        self.assertTrue(audio.buffer._rolled)
+        self.assertFalse(audio.in_memory)
+        self.assertEqual(audio.size, 1024 * 1024 + 1)
+
+    def test_open_rewinds_the_buffer_for_the_upload(self):
+        audio = self._memory(b"OggS...")
+        filename, source = audio.open()
+        self.assertEqual((filename, source.read()), ("audio.ogg", b"OggS..."))
+
+    def test_only_in_memory_uploads_count_as_saved_io(self):
+        record_memory_upload(self._memory(b"a" * 512 * 1024), 0.1, temp_mbps=50)
+        self.assertEqual(upload_audio._bytes_saved, 512 * 1024)
+        self.assertAlmostEqual(upload_audio._seconds_saved, 0.5 / 50)
+
+        record_memory_upload(self._memory(b"a" * (2 * 1024 * 1024)), 0.1, temp_mbps=50)
+        self.assertEqual(upload_audio._bytes_saved, 512 * 1024)
+
+    def test_temporary_file_is_removed_on_close(self):
+        fd, path = tempfile.mkstemp(suffix=".m4a")
+        os.close(fd)
+        with UploadAudio.from_file(path, temporary=True) as audio:
+            self.assertFalse(audio.in_memory)
+            self.assertEqual(audio.filename, os.path.basename(path))
+        self.assertFalse(os.path.exists(path))
+
+        fd, kept = tempfile.mkstemp(suffix=".mp3")
+        os.close(fd)
+        self.addCleanup(os.unlink, kept)
+        UploadAudio.from_file(kept).close()  # el original del usuario no se borra
+        self.assertTrue(os.path.exists(kept))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import core.verification as verification
+from core.verification_blocks import merge_results, plan_blocks, split_paragraphs
+
+_NEWS = {"titulo": "Titular", "entradilla": "Entradilla", "etiquetas": ["Huelva"],
+         "contenido": "<p>uno</p>\n<p>dos</p><p>tres</p>"}
+
+
+class BlockPlanTests(unittest.TestCase):
+    def test_paragraphs_are_grouped_and_headline_goes_with_first_block(self):
+        self.assertEqual(split_paragraphs("<p>a</p> <P>b</P>cola"), ["<p>a</p>", " <P>b</P>cola"])
+        blocks = plan_blocks(_NEWS, max_chars=22)
+        self.assertEqual([b["contenido"] for b in blocks],
+                         ["<p>uno</p>\n<p>dos</p>", "<p>tres</p>"])
+        self.assertEqual(blocks[0]["titulo"], "Titular")
+        self.assertEqual((blocks[1]["titulo"], blocks[1]["etiquetas"]), ("", []))
+        self.assertEqual(plan_blocks(_NEWS, max_chars=1000), [_NEWS])
+
+    def test_results_are_merged_in_text_order(self):
+        blocks = plan_blocks(_NEWS, max_chars=22)
+        merged = merge_results(_NEWS, blocks, [
+            {"correcciones": [{"numero": 1, "original": "a"}],
+             "texto_corregido": {"titulo": "Titular bien", "contenido": "<p>UNO</p>"},
+             "fuentes_consultadas": ["u1", "u2"]},
+            {"correcciones": [{"numero": 1, "original": "b"}],
+             "fuentes_consultadas": ["u2", "u3"], "aviso": "sin más"},
+        ])
+        self.assertEqual([(c["numero"], c["original"]) for c in merged["correcciones"]],
+                         [(1, "a"), (2, "b")])
+        self.assertEqual(merged["fuentes_consultadas"], ["u1", "u2", "u3"])
+        self.assertEqual(merged["texto_corregido"], {
+            "titulo": "Titular bien", "entradilla": "Entradilla",
+            "contenido": "<p>UNO</p><p>tres</p>", "etiquetas": ["Huelva"]})
+        self.assertEqual(merged["aviso"], "sin más")
+
+
+class BlockVerificationTests(unittest.TestCase):
+    def test_blocks_are_verified_concurrently(self):
+        settings = {"cache_verificacion": False, "verificacion_bloque_caracteres": 22}
+        with mock.patch.object(verification, "load_settings", return_value=settings), \
+             mock.patch.object(verification, "prompt", return_value={
+                 "system_prompt": "s",
+                 "user_prompt_template": "{titulo}|{entradilla}|{contenido}|{etiquetas}"}):
+            service = verification.VerificationService()
+            both_started = threading.Barrier(2, timeout=5)
+            prompts = []
+
+            def create(**kwargs):
+                prompts.append(kwargs["messages"][1]["content"])
+                both_started.wait()  # falla si los bloques no van en paralelo
+                return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(
+                    content=json.dumps({"correcciones": [{"numero": 1}]}), annotations=None))])
+
+            service.client = SimpleNamespace(
+                chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+                base_url=SimpleNamespace(host="api.prueba"))
+            result = service.verify(dict(_NEWS))
+
+        self.assertEqual([c["numero"] for c in result["correcciones"]], [1, 2])
+        self.assertEqual(result["texto_corregido"]["contenido"], _NEWS["contenido"])
+        first, second = sorted(prompts, key=lambda p: "FRAGMENTO" in p)
+        self.assertTrue(first.startswith("Titular|Entradilla|<p>uno</p>\n<p>dos</p>|Huelva"))
+        self.assertIn("FRAGMENTO 2/2", second)
+
+
+if __name__ == "__main__":
+    unittest.main()
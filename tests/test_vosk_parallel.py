@@ -0,0 +1,85 @@
+import time
+import unittest
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import core.vosk_parallel as vosk_parallel
+from core.progress import TranscriptionProgress
+from core.transcript import Transcript
+from core.vosk_parallel import plan_segments
+
+
+def _energies(seconds, silences=()):
+    """Voz constante de `seconds` s (tramas de 30 ms) con silencios de 1 s en `silences`."""
+    frames = [1000] * int(seconds * 1000 / 30)
+    for at in silences:
+        for i in range(int((at - 0.5) * 1000 / 30), int((at + 0.5) * 1000 / 30)):
+            frames[i] = 0
+    return array("H", frames)
+
+
+class PlanSegmentsTests(unittest.TestCase):
+    def _assert_tiles(self, segments, total_s):
+        """Tramos consecutivos, sin solape ni huecos, que cubren todo el audio."""
+        self.assertAlmostEqual(segments[0][0], 0.0)
+        for (start, dur), (next_start, _) in zip(segments, segments[1:]):
+            self.assertAlmostEqual(start + dur, next_start, places=6)
+        self.assertAlmostEqual(segments[-1][0] + segments[-1][1], total_s, places=6)
+
+    def test_short_audio_is_a_single_segment(self):
+        segments = plan_segments(_energies(20), workers=4)
+        self.assertEqual(len(segments), 1)
+        self._assert_tiles(segments, 19.98)
+
+    def test_cuts_land_on_silences(self):
+        segments = plan_segments(_energies(90, silences=(30, 60)), workers=1)
+        self.assertEqual(len(segments), 3)
+        for (start, _), silence in zip(segments[1:], (30, 60)):
+            self.assertLess(abs(start - silence), 0.6)
+        self._assert_tiles(segments, 90)
+
+    def test_final_segment_keeps_the_remainder(self):
+        # 65 s con tramos de 30 s: el resto no se convierte en un tramo diminuto
+        segments = plan_segments(_energies(65), workers=1)
+        self._assert_tiles(segments, 64.98)
+        self.assertGreaterEqual(segments[-1][1], 30 / 4)
+
+    def test_long_audio_spreads_bounded_segments_over_workers(self):
+        segments = plan_segments(_energies(3600), workers=2)
+        self._assert_tiles(segments, 3600)
+        self.assertGreaterEqual(len(segments), 6)
+        self.assertTrue(all(dur <= vosk_parallel._MAX_SEGMENT_S for _, dur in segments))
+
+
+class TranscribeParallelTests(unittest.TestCase):
+    def test_results_are_merged_in_order_whatever_finishes_first(self):
+        segments = [(0.0, 10.0), (10.0, 10.0), (20.0, 10.0)]
+
+        def recognize(input_file, index, start, duration, spans=None):
+            time.sleep(0.05 * (len(segments) - index))  # el último termina primero
+            part = Transcript(f"tramo{index}")
+            part.add_word(f"tramo{index}", start + 1, start + 2)
+            return index, part
+
+        reports = []
+        pool = ThreadPoolExecutor(max_workers=3)
+        self.addCleanup(pool.shutdown)
+        with mock.patch.object(vosk_parallel, "find_vosk_model_path", return_value="/m"), \
+             mock.patch.object(vosk_parallel, "_get_pool", return_value=pool), \
+             mock.patch.object(vosk_parallel, "plan_segments", return_value=segments), \
+             mock.patch.object(vosk_parallel, "_recognize_segment", recognize):
+            transcript = vosk_parallel.transcribe_parallel(
+                "a.wav", workers=3, energies=_energies(30),
+                progress=TranscriptionProgress(lambda p, text: reports.append((p, text))))
+
+        self.assertEqual(transcript.text, "tramo0 tramo1 tramo2")
+        self.assertEqual([w for w, *_ in transcript.words()], ["tramo0", "tramo1", "tramo2"])
+        self.assertEqual(list(transcript.starts), [1.0, 11.0, 21.0])
+        # El texto parcial solo muestra tramos consecutivos desde el principio
+        self.assertEqual(reports[0], (100 / 3, ""))
+        self.assertEqual(reports[-1], (100.0, "tramo0 tramo1 tramo2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from array import array
+
+from core.transcript import Transcript
+from core.whisper_chunks import merge_transcripts, plan_windows
+
+
+def _part(text, first_start, step=0.4):
+    """Transcripción de Whisper: texto con puntuación y palabras sin ella, cada `step` s."""
+    part = Transcript(text)
+    for i, token in enumerate(text.split()):
+        start = first_start + i * step
+        part.add_word(token.strip(".,;:"), start, start + step * 0.8)
+    return part
+
+
+class MergeTranscriptsTests(unittest.TestCase):
+    # Dos ventanas con solape 58-62 s: se cortan en el segundo 60
+    _WINDOWS = [(0.0, 62.0), (58.0, 62.0)]
+
+    def test_overlap_is_removed_once(self):
+        merged = merge_transcripts([
+            _part("El pleno aprobó el presupuesto de la ciudad,", 57.0),
+            _part("presupuesto de la ciudad, que entrará en vigor en enero.", 58.6),
+        ], self._WINDOWS)
+        self.assertEqual(
+            merged.text,
+            "El pleno aprobó el presupuesto de la ciudad, que entrará en vigor en enero.",
+        )
+
+    def test_without_overlap_texts_are_joined(self):
+        merged = merge_transcripts([_part("Buenos días.", 10.0), _part("Comienza la sesión.", 70.0)],
+                                   self._WINDOWS)
+        self.assertEqual(merged.text, "Buenos días. Comienza la sesión.")
+
+    def test_repeated_phrase_outside_the_overlap_is_kept(self):
+        first = ("Se presentó la red de autobuses urbanos del municipio. A continuación "
+                 "intervino el concejal sobre la inversión en la red de")
+        merged = merge_transcripts([
+            _part(first, 52.6),
+            _part("la red de autobuses y en los barrios.", 59.8),
+        ], self._WINDOWS)
+        self.assertEqual(merged.text, first[:first.rindex(" de")] + " de autobuses y en los barrios.")
+        self.assertIn("urbanos del municipio. A continuación intervino", merged.text)
+        # El texto y las palabras con tiempo cuentan lo mismo
+        self.assertEqual([w for w, *_ in merged.words()],
+                         [t.strip(".,;:") for t in merged.text.split()])
+
+
+class PlanWindowsTests(unittest.TestCase):
+    def test_windows_cover_audio_and_overlap(self):
+        energies = array("H", [1000] * 4000)  # 120 s
+        windows = plan_windows(energies, 30, chunk_s=40, overlap_s=2)
+
+        self.assertGreater(len(windows), 1)
+        self.assertEqual(windows[0][0], 0.0)
+        last_start, last_dur = windows[-1]
+        self.assertAlmostEqual(last_start + last_dur, 120.0)
+        for (a, da), (b, _) in zip(windows, windows[1:]):
+            self.assertGreater(a + da, b)  # hay solape
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,3 @@
-import json
 import os
 import shutil
 import tkinter as tk
@@ -6,7 +5,8 @@ import webbrowser
 from tkinter import filedialog, messagebox, ttk
 from tkinter.scrolledtext import ScrolledText
 
-from ui.settings import CONFIG_DIR, PROMPTS_PATH, center_on_parent, load_settings, save_settings
+from core.config_store import ConfigError, load_prompts, save_prompts
+from ui.settings import center_on_parent, load_settings, save_settings
 from ui.theme import (
     ACCENT_BLUE,
     ACCENT_CYAN,
@@ -25,6 +25,8 @@ from ui.theme import (
     FONT_FAMILY,
 )
 
+WHISPER_PROFILES = ("auto", "opus", "mp3")
+
 
 class SettingsDialog(tk.Toplevel):
     def __init__(self, parent, on_save=None):
@@ -37,11 +39,13 @@ class SettingsDialog(tk.Toplevel):
         self._on_save = on_save
 
         self.settings = load_settings()
+        # Si prompts.json no se pudo leer no se guarda: se sobrescribiría con pestañas vacías
+        self._prompts_error = None
         try:
-            with open(PROMPTS_PATH, "r", encoding="utf-8") as f:
-                self.prompts = json.load(f)
-        except Exception:
+            self.prompts = load_prompts()
+        except ConfigError as ex:
             self.prompts = {}
+            self._prompts_error = str(ex)
 
         hdr = tk.Frame(self, bg=BG_HEADER, height=50)
         hdr.pack(fill=tk.X)
@@ -118,6 +122,33 @@ class SettingsDialog(tk.Toplevel):
             justify=tk.LEFT,
         ).pack(anchor=tk.W, padx=12, pady=(4, 0))
 
+        tk.Label(
+            tab_gen,
+            text="Perfil de audio para Whisper:",
+            bg=BG_DARK,
+            fg=FG_SECONDARY,
+            font=(FONT_FAMILY, 9, "bold"),
+        ).pack(anchor=tk.W, padx=12, pady=(16, 4))
+        self.combo_profile = ttk.Combobox(
+            tab_gen,
+            values=list(WHISPER_PROFILES),
+            state="readonly",
+            width=12,
+            font=(FONT_FAMILY, 10),
+        )
+        self.combo_profile.pack(anchor=tk.W, padx=12)
+        perfil = self.settings.get("perfil_whisper", "auto")
+        self.combo_profile.set(perfil if perfil in WHISPER_PROFILES else "auto")
+        tk.Label(
+            tab_gen,
+            text="auto/opus: Opus 12–24 kbps según la duración (voz, subidas pequeñas).\n"
+            "mp3: MP3 32–64 kbps, por compatibilidad.",
+            bg=BG_DARK,
+            fg=FG_MUTED,
+            font=(FONT_FAMILY, 8),
+            justify=tk.LEFT,
+        ).pack(anchor=tk.W, padx=12, pady=(4, 0))
+
         tk.Frame(tab_gen, bg=BG_DARK, height=24).pack()
 
         trash_card = tk.Frame(tab_gen, bg=BG_CARD)
@@ -150,8 +181,11 @@ class SettingsDialog(tk.Toplevel):
         ).pack(anchor=tk.W, padx=14, pady=(0, 14))
 
         self.editors = {}
-        tab_labels = {"redaccion": "✍️  Redacción", "verificacion": "🔍 Verificación"}
-        for key in ["redaccion", "verificacion"]:
+        tab_labels = {"redaccion": "✍️  Redacción", "verificacion": "🔍 Verificación",
+                      "condensacion": "🧩 Condensación"}
+        # La condensación es opcional: solo se edita si prompts.json la define
+        keys = ["redaccion", "verificacion"] + (["condensacion"] if "condensacion" in self.prompts else [])
+        for key in keys:
             tab = tk.Frame(nb, bg=BG_DARK)
             nb.add(tab, text=tab_labels[key])
             cfg = self.prompts.get(key, {})
@@ -286,7 +320,27 @@ class SettingsDialog(tk.Toplevel):
 
     def _save(self):
         self.settings["watch_folder"] = self.entry_folder.get().strip()
-        save_settings(self.settings)
+        self.settings["perfil_whisper"] = self.combo_profile.get() or "auto"
+
+        # Cada archivo se valida y guarda por separado: un prompt erróneo no
+        # impide guardar los ajustes generales
+        try:
+            save_settings(self.settings)
+        except ConfigError as ex:
+            messagebox.showerror("Ajustes no válidos", str(ex), parent=self)
+            return
+        if self._on_save:
+            self._on_save()
+
+        if self._prompts_error:
+            messagebox.showwarning(
+                "Prompts no guardados",
+                f"Los ajustes se han guardado, pero los prompts no: {self._prompts_error}\n\n"
+                "Corrige config/prompts.json para poder editarlos aquí.",
+                parent=self,
+            )
+            self.destroy()
+            return
 
         for key, (em, ts, tu) in self.editors.items():
             if key not in self.prompts:
@@ -294,12 +348,12 @@ class SettingsDialog(tk.Toplevel):
             self.prompts[key]["modelo"] = em.get().strip()
             self.prompts[key]["system_prompt"] = ts.get("1.0", tk.END).strip()
             self.prompts[key]["user_prompt_template"] = tu.get("1.0", tk.END).strip()
-        os.makedirs(CONFIG_DIR, exist_ok=True)
-        with open(PROMPTS_PATH, "w", encoding="utf-8") as f:
-            json.dump(self.prompts, f, ensure_ascii=False, indent=4)
-
-        if self._on_save:
-            self._on_save()
+        try:
+            save_prompts(self.prompts)  # valida antes de escribir
+        except ConfigError as ex:
+            messagebox.showerror("Prompts no válidos",
+                                 f"{ex}\n\nLos ajustes generales sí se han guardado.", parent=self)
+            return
         self.destroy()
 
 
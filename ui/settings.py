@@ -1,26 +1,12 @@
-import json
-import os
-
-PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CONFIG_DIR = os.path.join(PROJECT_DIR, "config")
-PROMPTS_PATH = os.path.join(CONFIG_DIR, "prompts.json")
-SETTINGS_PATH = os.path.join(CONFIG_DIR, "settings.json")
-
-
-def load_settings():
-    if os.path.exists(SETTINGS_PATH):
-        try:
-            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {"watch_folder": ""}
-
-
-def save_settings(data):
-    os.makedirs(CONFIG_DIR, exist_ok=True)
-    with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+# La lectura y escritura de la configuración vive en core.config_store (en caché)
+from core.config_store import (  # noqa: F401
+    CONFIG_DIR,
+    PROJECT_DIR,
+    PROMPTS_PATH,
+    SETTINGS_PATH,
+    load_settings,
+    save_settings,
+)
 
 
 def center_on_parent(win, parent, w, h):
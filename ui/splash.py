@@ -3,12 +3,29 @@ import threading
 import time
 import tkinter as tk
 
+from core.logger import get_logger
 from ui.theme import ACCENT_CYAN, BG_CARD, BG_DARK, FG_SECONDARY, FONT_FAMILY
 
+log = get_logger(__name__)
+
+# Segundos que se espera a que un archivo nuevo termine de copiarse
+_STABLE_WAIT_S = 60
+# ffprobe sobre un archivo a medio copiar puede colgarse: plazo corto por sondeo
+_READY_PROBE_TIMEOUT_S = 5
+# Si ffprobe rechaza el archivo, segundos seguidos de tamaño estable para darlo por copiado
+_STABLE_WITHOUT_PROBE_S = 5
+
 TranscriptionService = None
 WriterService = None
 PublisherService = None
 VerificationService = None
+# Variantes asíncronas que usa la interfaz (bucle de fondo de core.async_runtime)
+AsyncTranscriptionService = None
+AsyncWriterService = None
+AsyncPublisherService = None
+AsyncVerificationService = None
+close_http_clients = None
+aclose_http_clients = None
 HAS_WATCHDOG = False
 Observer = None
 FileSystemEventHandler = object
@@ -91,16 +108,49 @@ class SplashScreen(tk.Toplevel):
         self.update()
 
 
+def _media_ready(path):
+    """El tamaño estable no basta: el contenedor debe poder sondearse entero."""
+    from core.media_probe import ProbeError, ProbeUnavailable, probe
+
+    try:
+        probe(path, timeout=_READY_PROBE_TIMEOUT_S)
+        return True
+    except ProbeUnavailable:
+        return True  # sin ffprobe, solo queda fiarse del tamaño
+    except (OSError, ProbeError, ValueError):
+        return False
+
+
+def _start_ingest(path):
+    """Decodifica ya el audio canónico, mientras la interfaz atiende la detección."""
+    from core.audio_cache import ingest_async
+    from ui.settings import load_settings
+
+    settings = load_settings()
+    if settings.get("cache_audio", True):
+        ingest_async(path, settings.get("cache_audio_mb"))
+
+
 def load_resources(splash):
     global TranscriptionService, WriterService, PublisherService, VerificationService
+    global AsyncTranscriptionService, AsyncWriterService, AsyncPublisherService
+    global AsyncVerificationService, close_http_clients, aclose_http_clients
     global HAS_WATCHDOG, Observer, FileSystemEventHandler, Mp3Handler
 
     try:
         splash.update_status("Cargando servicios de IA...")
-        from core.transcription import TranscriptionService
-        from core.writer import WriterService
-        from core.publisher import PublisherService
-        from core.verification import VerificationService
+        from core.transcription import AsyncTranscriptionService, TranscriptionService
+        from core.writer import AsyncWriterService, WriterService
+        from core.publisher import AsyncPublisherService, PublisherService
+        from core.verification import AsyncVerificationService, VerificationService
+        from core.http_clients import aclose_all as aclose_http_clients
+        from core.http_clients import close_all as close_http_clients
+
+        # El modelo Vosk tarda segundos en cargar: se precarga en segundo plano
+        # para que la primera transcripción local no pague ese coste.
+        from core.model_registry import warm_up_vosk
+
+        warm_up_vosk()
 
         splash.update_status("Iniciando vigilante de archivos...")
         try:
@@ -140,17 +190,37 @@ def load_resources(splash):
                         threading.Thread(target=self._wait_stable, args=(src,), daemon=True).start()
 
                 def _wait_stable(self, path):
+                    deadline = time.monotonic() + _STABLE_WAIT_S
                     prev = -1
-                    for _ in range(60):
+                    stable_s = 0
+                    probing = True
+                    while time.monotonic() < deadline:
                         try:
                             sz = os.path.getsize(path)
-                            if sz == prev and sz > 0:
-                                self._callback(path)
-                                return
-                            prev = sz
                         except OSError:
-                            pass
+                            sz = -1
+                        stable_s = stable_s + 1 if sz == prev and sz > 0 else 0
+                        prev = sz
+                        if stable_s and probing:
+                            if _media_ready(path):
+                                self._accept(path)
+                                return
+                            # ffprobe lo rechaza (o no da duración): no se vuelve a
+                            # sondear y, como sin ffprobe, basta el tamaño estable
+                            probing = False
+                            stable_s = 0
+                        elif stable_s >= _STABLE_WITHOUT_PROBE_S:
+                            log.warning("'%s' no se pudo sondear; se procesa por tamaño estable",
+                                        os.path.basename(path))
+                            self._accept(path)
+                            return
                         time.sleep(1)
+                    log.warning("'%s' descartado: su tamaño no se estabilizó en %d s",
+                                os.path.basename(path), _STABLE_WAIT_S)
+
+                def _accept(self, path):
+                    _start_ingest(path)
+                    self._callback(path)
 
             Mp3Handler = _Mp3Handler
         except ImportError: